@@ -1,25 +1,164 @@
+from collections.abc import MutableMapping
+from functools import cached_property
+
+import numpy as np
 import pandas as pd
+import frame_backends
+import kernels
+from decorators import log_call, TRACER
+from models import BasketballTeam
+from records import MatchBatch
+
+# Schematy DataFrame w BasketAnalysis:
+# - "default"   - typy jak po wczytaniu (tekst, int64/float64), daty rozpoznawane z dayfirst=True
+# - "optimized" - przeciwnik / wynik / miejsce jako category, punkty zmniejszone do int8/int16,
+#                 daty w formacie strony PZKosz parsowane bez zgadywania formatu (parse_match_dates)
+SCHEMAS = ("default", "optimized")
+CATEGORY_COLUMNS = ("Przeciwnik", "Wynik meczu", "Miejsce meczu")
+POINT_COLUMNS = ("Punkty Basket Hills", "Punkty przeciwnika")
+
+# układ tekstu "dd.mm.rrrr gg:mm" - pozycje cyfr i separatorów
+_DIGITS = np.array([0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15])
+_SEPARATORS = {2: ".", 5: ".", 10: " ", 13: ":"}
+
+
+# Szybkie parsowanie dat w formacie PZKosz ("dd.mm.rrrr gg:mm" lub "dd.mm.rrrr")
+# - cyfry odczytywane wektorowo z tablicy znaków, bez strptime dla każdego wiersza
+# - wartości w innym formacie (lub już sparsowane) trafiają do pd.to_datetime(format="mixed", dayfirst=True)
+def parse_match_dates(values):
+    values = np.asarray(values, dtype=object)
+    lengths = np.fromiter((len(v) if type(v) is str else 0 for v in values), dtype=np.int64, count=len(values))
+    short = lengths == 10
+    fixed = (lengths == 16) | short
+
+    chars = np.zeros((len(values), 16), dtype=np.int32)
+    if fixed.any():
+        chars[fixed] = values[fixed].astype("U16").view(np.int32).reshape(-1, 16)
+    chars[short, 10:] = np.frombuffer(" 00:00".encode("utf-32-le"), dtype=np.int32)
+
+    digits = chars - ord("0")
+    fixed &= ((digits[:, _DIGITS] >= 0) & (digits[:, _DIGITS] <= 9)).all(axis=1)
+    for pos, sep in _SEPARATORS.items():
+        fixed &= chars[:, pos] == ord(sep)
+
+    d = digits[fixed].astype(np.int64)
+    day = d[:, 0] * 10 + d[:, 1]
+    month = d[:, 3] * 10 + d[:, 4]
+    year = d[:, 6] * 1000 + d[:, 7] * 100 + d[:, 8] * 10 + d[:, 9]
+    hour = d[:, 11] * 10 + d[:, 12]
+    minute = d[:, 14] * 10 + d[:, 15]
+    minutes = hour * 60 + minute
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    parsed = (months.astype("datetime64[D]") + (day - 1)).astype("datetime64[ns]") + minutes.astype("timedelta64[m]")
+    # niepoprawne daty (np. 31.02, 25:00, 10:75) -> NaT, tak jak errors="coerce"
+    valid = ((month >= 1) & (month <= 12) & (day >= 1) & (hour < 24) & (minute < 60)
+             & (parsed.astype("datetime64[M]") == months))
+    parsed[~valid] = np.datetime64("NaT")
+
+    dates = pd.Series(np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]"))
+    dates[fixed] = parsed
+    rest = ~fixed & pd.notna(values)
+    if rest.any():
+        dates[rest] = pd.to_datetime(pd.Series(values[rest], dtype=object), format="mixed", dayfirst=True,
+                                     errors="coerce").astype("datetime64[ns]").to_numpy()
+    return dates
+
 
 # Klasa do analizy danych meczowych drużyny koszykarskiej
 class BasketAnalysis:
-    def __init__(self, team):
+    # dekorator mierzący czas przygotowania danych (span "prepare")
+    @log_call(name="prepare")
+    def __init__(self, team, schema="default", backend="pandas"):
+        if schema not in SCHEMAS:
+            raise ValueError(f"Nieznany schemat danych: {schema} (dostępne: {', '.join(SCHEMAS)})")
+        if backend != "pandas" and schema != "default":
+            raise ValueError("Schemat danych dotyczy tylko silnika pandas")
         self.team = team
-        self.df = pd.DataFrame(team.get_matches())
+        self.schema = schema
+        self.memory_before = None  # zużycie pamięci przed optymalizacją typów (tylko schema="optimized")
+        matches = team.get_matches()
+        if backend != "pandas":
+            # inny silnik (Polars / Arrow) - dane w jego formacie, DataFrame pandas tworzony dopiero na żądanie
+            self.backend = frame_backends.get_backend(backend)
+            self.frame = self.backend.prepare(matches)
+            return
+        self.backend = None
+        if isinstance(matches, MatchBatch):
+            self._init_from_batch(matches)
+            return
+        # brak meczów (np. pusty wycinek bazy) - pusta ramka z kolumnami meczu, metryki puste / NaN
+        self.df = pd.DataFrame(matches) if len(matches) else pd.DataFrame(columns=kernels.COLUMNS)
+        if schema == "optimized":
+            self._prepare_optimized()
+            return
 
-        # Konwersja kolumn do odpowiednich typów
+        # Konwersja kolumn do odpowiednich typów (daty w ns - jak MatchBatch, schemat "optimized" i inne silniki)
         self.df["Data i godzina meczu"] = pd.to_datetime(
             self.df["Data i godzina meczu"], dayfirst=True, errors="coerce"
-        )
+        ).astype("datetime64[ns]")
         self.df["Punkty Basket Hills"] = pd.to_numeric(self.df["Punkty Basket Hills"], errors="coerce")
         self.df["Punkty przeciwnika"] = pd.to_numeric(self.df["Punkty przeciwnika"], errors="coerce")
 
         # Usunięcie błędnych rekordów i sortowanie chronologiczne
         self.df = self.df.dropna(subset=["Data i godzina meczu", "Punkty Basket Hills", "Punkty przeciwnika"])
-        self.df = self.df.sort_values("Data i godzina meczu").reset_index(drop=True)
+        self.df = self.df.sort_values("Data i godzina meczu", kind="stable").reset_index(drop=True)
+
+    # Ścieżka bez kopiowania dla records.MatchBatch - kolumny mają już właściwe typy,
+    # więc pomijamy konwersję dat i punktów; sortujemy tylko, gdy mecze nie są chronologiczne
+    def _init_from_batch(self, batch):
+        df = batch.to_frame()
+        if np.isnat(batch.played_at).any():
+            df = df[df["Data i godzina meczu"].notna()].reset_index(drop=True)
+        if not df["Data i godzina meczu"].is_monotonic_increasing:
+            df = df.sort_values("Data i godzina meczu", kind="stable").reset_index(drop=True)
+        # kategorie bez meczów (np. same wygrane) dawałyby zerowe wiersze w value_counts / groupby,
+        # których nie ma w ścieżce słownikowej - usuwamy je (kopia kodów tylko w tym przypadku)
+        for col in CATEGORY_COLUMNS:
+            codes = df[col].array.codes
+            if len(np.unique(codes)) < len(df[col].cat.categories):
+                df[col] = df[col].cat.remove_unused_categories()
+        self.df = df
+
+    # Przygotowanie danych w schemacie "optimized" - te same kroki co w __init__, mniejsze typy
+    def _prepare_optimized(self):
+        df = self.df
+        self.memory_before = df.memory_usage(deep=True)
+
+        df["Data i godzina meczu"] = parse_match_dates(df["Data i godzina meczu"])
+        for col in POINT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df = df.dropna(subset=["Data i godzina meczu", *POINT_COLUMNS])
+
+        for col in POINT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+        for col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+        self.df = df.sort_values("Data i godzina meczu", kind="stable").reset_index(drop=True)
+
+    # Zużycie pamięci (bajty) dla każdej kolumny: przed i po optymalizacji typów
+    def memory_report(self):
+        after = self.df.memory_usage(deep=True)
+        before = self.memory_before if self.memory_before is not None else after
+        report = pd.DataFrame({"Przed [B]": before, "Po [B]": after}).fillna(0).astype("int64")
+        report.loc["Razem"] = report.sum()
+        report["Zmiana [%]"] = (100 * (report["Po [B]"] / report["Przed [B]"] - 1)).round(1)
+        return report
+
+    # Utworzenie analizy na podstawie danych zapisanych w bazie (storage.MatchStore),
+    # bez ponownego pobierania strony - wycinek: drużyna / sezon / zakres dat
+    @classmethod
+    def from_store(cls, store, team_name, season=None, start=None, end=None, schema="default"):
+        matches = store.load(team_name, season=season, start=start, end=end)
+        return cls(BasketballTeam(team_name, matches), schema=schema)
 
     # Metoda statyczna do obliczania stosunku wygranych do przegranych
+    # (kolumny kategoryczne: remisy w kolejności pierwszego wystąpienia, tak jak dla tekstu)
     @staticmethod
     def win_loss_ratio(df):
+        if isinstance(df["Wynik meczu"].dtype, pd.CategoricalDtype):
+            counts = df.groupby("Wynik meczu", observed=True, sort=False).size().rename("count")
+            return counts.sort_values(ascending=False, kind="stable")
         return df["Wynik meczu"].value_counts()
 
     # Metoda statyczna do obliczania średniej liczby punktów zdobytych na mecz
@@ -35,6 +174,11 @@ class BasketAnalysis:
     # Metoda statyczna do analizy wyników meczów u siebie i na wyjeździe
     @staticmethod
     def home_away_results(df):
+        if isinstance(df["Wynik meczu"].dtype, pd.CategoricalDtype):
+            keys = ["Miejsce meczu", "Wynik meczu"]
+            counts = df.groupby(keys, observed=True, sort=False).size().rename("count").reset_index()
+            counts = counts.sort_values(["Miejsce meczu", "count"], ascending=[True, False], kind="stable")
+            return counts.set_index(keys)["count"]
         return df.groupby("Miejsce meczu")["Wynik meczu"].value_counts()
 
     # Metoda statyczna do obliczania średniej liczby punktów zdobytych u siebie i na wyjeździe
@@ -64,7 +208,7 @@ class BasketAnalysis:
     def top_bottom_games(df, n=5):
         top = df.nlargest(n, "Punkty Basket Hills")[["Data i godzina meczu", "Przeciwnik", "Punkty Basket Hills"]]
         bottom = df.nsmallest(n, "Punkty Basket Hills")[["Data i godzina meczu", "Przeciwnik", "Punkty Basket Hills"]]
-        return top, bottom
+        return kernels.plain_columns(top), kernels.plain_columns(bottom)
 
     # Metoda statyczna do obliczanie najdłuższą serię wygranych i najdłuższą serię porażek w sezonie
     @staticmethod
@@ -75,17 +219,118 @@ class BasketAnalysis:
         longest_losses = streaks[streaks["first"] == "Porażka"]["size"].max()
         return longest_wins, longest_losses
 
-    def run(self):
-        return {
-            "wins_losses": self.win_loss_ratio(self.df),
-            "avg_scored": round(self.avg_points_scored(self.df), 2),
-            "avg_conceded": round(self.avg_points_conceded(self.df), 2),
-            "home_away": self.home_away_results(self.df),
-            "avg_home_away": self.avg_points_home_away(self.df),
-            "win_loss_home_away": self.win_loss_home_away(self.df),
-            "point_diff": self.point_difference(self.df),
-            "top_games": self.top_bottom_games(self.df)[0],
-            "bottom_games": self.top_bottom_games(self.df)[1],
-            "streaks": self.longest_streak(self.df),  
-            "df": self.df
-        }
\ No newline at end of file
+    # Wspólne wyniki pośrednie - liczone raz i współdzielone przez kilka metryk
+
+    # DataFrame pandas dla silników innych niż pandas (w silniku pandas ustawiany w __init__)
+    @cached_property
+    def df(self):
+        return self.backend.to_pandas(self.frame)
+
+    # wszystkie metryki policzone przez wybrany silnik, w kształtach pandas
+    @cached_property
+    def backend_metrics(self):
+        return self.backend.metrics(self.frame)
+
+    # kolumna różnicy punktów (Punkty Basket Hills - Punkty przeciwnika)
+    @cached_property
+    def point_diff_column(self):
+        return self.df["Punkty Basket Hills"] - self.df["Punkty przeciwnika"]
+
+    @cached_property
+    def point_diff(self):
+        return pd.DataFrame({
+            "Data i godzina meczu": self.df["Data i godzina meczu"],
+            "Różnica punktów": self.point_diff_column,
+        })
+
+    @cached_property
+    def top_bottom(self):
+        return self.top_bottom_games(self.df)
+
+    @cached_property
+    def streaks(self):
+        return self.longest_streak(self.df)
+
+    # wszystkie metryki policzone naraz jednoprzebiegowym jądrem NumPy (kernels.compute_all)
+    @cached_property
+    def fused_metrics(self):
+        return kernels.compute_all(self.df)
+
+    # Zwraca leniwy obiekt wyników - każda metryka jest liczona dopiero przy pierwszym odczycie
+    # metrics: opcjonalna lista nazw metryk (podzbiór METRICS), domyślnie wszystkie
+    # fused: True - pierwszy odczyt liczy od razu wszystkie metryki jednym przebiegiem NumPy
+    def run(self, metrics=None, fused=False):
+        return AnalysisResults(self, metrics, fused)
+
+
+# Metryki dostępne w wynikach run() - nazwa: funkcja licząca na obiekcie BasketAnalysis
+METRICS = {
+    "wins_losses": lambda a: a.win_loss_ratio(a.df),
+    "avg_scored": lambda a: round(a.avg_points_scored(a.df), 2),
+    "avg_conceded": lambda a: round(a.avg_points_conceded(a.df), 2),
+    "home_away": lambda a: a.home_away_results(a.df),
+    "avg_home_away": lambda a: a.avg_points_home_away(a.df),
+    "win_loss_home_away": lambda a: a.win_loss_home_away(a.df),
+    "point_diff": lambda a: a.point_diff,
+    "top_games": lambda a: a.top_bottom[0],
+    "bottom_games": lambda a: a.top_bottom[1],
+    "streaks": lambda a: a.streaks,
+    "longest_win_streak": lambda a: a.streaks[0],
+    "longest_loss_streak": lambda a: a.streaks[1],
+    "df": lambda a: a.df,
+}
+
+
+# Leniwy słownik wyników analizy
+# - zachowuje się jak dict zwracany wcześniej przez run() (results["avg_scored"], "df" in results)
+# - metryka jest liczona przy pierwszym odczycie i zapamiętywana
+class AnalysisResults(MutableMapping):
+    def __init__(self, analysis, metrics=None, fused=False):
+        if metrics is None:
+            metrics = list(METRICS)
+        unknown = [m for m in metrics if m not in METRICS]
+        if unknown:
+            raise KeyError(f"Nieznane metryki: {', '.join(unknown)}")
+
+        self.analysis = analysis
+        self.fused = fused
+        self._keys = list(metrics)
+        self._values = {}
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            if key not in self._keys:
+                raise KeyError(key)
+            with TRACER.span(f"metric:{key}"):
+                if self.analysis.backend is not None:
+                    self._values[key] = self.analysis.backend_metrics[key]
+                elif self.fused:
+                    self._values[key] = self.analysis.fused_metrics[key]
+                else:
+                    self._values[key] = METRICS[key](self.analysis)
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            self._keys.append(key)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        self._keys.remove(key)
+        self._values.pop(key, None)
+
+    # sprawdzenie dostępności metryki bez jej liczenia
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    # nazwy metryk, które zostały już policzone
+    def computed(self):
+        return [k for k in self._keys if k in self._values]
\ No newline at end of file
@@ -1,50 +1,115 @@
 import streamlit as st
+import os
+import json
 import subprocess
 import sys
 import io
+import threading
 import time
 import unittest
 import logging
 from data_fetcher import MatchDataFetcher
+from decorators import TRACER
+from http_cache import ResponseCache
+from storage import MatchStore
+from refresh import BackgroundRefresher
+from shared_cache import SharedCache
 from models import BasketballTeam
 from analysis import BasketAnalysis
-from plots import (
-    PointsPlotMatplotlib, PointDiffPlotMatplotlib,
-    AvgHomeAwayPlotMatplotlib, TopBottomPlotMatplotlib,
-    PointsPlotSeaborn, PointDiffPlotSeaborn,
-    AvgHomeAwayPlotSeaborn, TopBottomPlotSeaborn,
-    PointsPlotPlotly, PointDiffPlotPlotly,
-    AvgHomeAwayPlotPlotly, TopBottomPlotPlotly,
-)
+from plots import load_backend
 
 
 TEAM_URL = "https://rozgrywki.pzkosz.pl/liga/4/druzyny/d/4119/basket-hills-bielsko-biala/terminarz.html"
 TEAM_NAME = "Basket Hills Bielsko-Biała"
+CACHE_DIR = ".cache/pzkosz"
+STORE_PATH = "matches.db"
+TRACE_FILE = os.environ.get("BASKET_TRACE_FILE")  # opcjonalny plik JSON lines z pomiarami czasu
+REFRESH_INTERVAL = float(os.environ.get("BASKET_REFRESH_INTERVAL", 900))  # co ile sekund odświeżać dane w tle
+SHARED_CACHE_PATH = os.environ.get("BASKET_SHARED_CACHE", ".cache/shared.db")  # cache wspólny dla procesów Streamlit
+
+run_id = TRACER.start_run()  # każde uruchomienie skryptu to osobny przebieg pomiarów
 
 st.set_page_config(page_title="Basket Hills - analiza danych", layout="wide")
 
-@st.cache_data
+# Dane i metryki potrzebne na poszczególnych stronach - strona bez metryk nie pobiera danych ani nie liczy analizy
+PAGE_METRICS = {
+    "Strona główna": (),
+    "Analiza drużyny": ("wins_losses", "avg_scored", "avg_conceded", "df", "home_away",
+                        "longest_win_streak", "longest_loss_streak"),
+    "Wykresy": ("df", "point_diff", "avg_home_away", "top_games", "bottom_games"),
+    "Testy jednostkowe": (),
+}
+
+# jeden pobierający na proces - pamięta odciski wierszy, więc przy odświeżeniu parsowane są tylko zmienione mecze
+# - współdzielony przez sesje i wątek odświeżający, dlatego razem z blokadą
+@st.cache_resource
+def team_fetcher():
+    return MatchDataFetcher(TEAM_URL, TEAM_NAME, cache=ResponseCache(CACHE_DIR), parser="lxml-iter"), threading.Lock()
+
+def scrape_data():
+    fetcher, lock = team_fetcher()
+    with lock:
+        matches, download_time = fetcher.fetch_matches(advance=False)
+        MatchStore(STORE_PATH).upsert(TEAM_NAME, fetcher.last_diff.upserts)  # historia meczów między sezonami
+        fetcher.advance()  # dopiero po udanym zapisie - inaczej zmiany trafią do kolejnego last_diff
+        cache_hit = fetcher.cache_hit
+    return matches, download_time, cache_hit, time.time()  # czas pobrania - wspólny dla procesów
+
+@st.cache_resource
+def shared_cache():
+    return SharedCache(SHARED_CACHE_PATH, ttl=REFRESH_INTERVAL)
+
+# stronę pobiera tylko jeden z procesów aplikacji, pozostałe odczytują wynik ze wspólnego cache
+def fetch_data():
+    return shared_cache().get_or_compute(f"fetch:{TEAM_URL}", scrape_data)
+
+# jeden wątek odświeżający na proces - sesje nigdy nie pobierają strony równolegle
+@st.cache_resource
+def data_refresher():
+    return BackgroundRefresher(fetch_data, REFRESH_INTERVAL).start()
+
+# ostatnie poprawne dane (Snapshot); czekamy tylko na pierwsze pobranie
 def load_data():
-    fetcher = MatchDataFetcher(TEAM_URL, TEAM_NAME)
-    return fetcher.fetch_matches()  
+    return data_refresher().get()
+
+# wspólne (dla wszystkich sesji i stron) leniwe wyniki analizy dla danej wersji danych
+# - każda metryka liczona raz na proces, po odświeżeniu danych liczona od nowa
+@st.cache_resource(max_entries=2)
+def load_results(version, _matches):
+    return BasketAnalysis(BasketballTeam(TEAM_NAME, _matches), schema="optimized").run()
+
+# skrót zawartości danych - klucz wyników analizy we wspólnym cache (ten sam we wszystkich procesach)
+@st.cache_resource(max_entries=2)
+def data_digest(version, _matches):
+    return ResponseCache.content_hash(json.dumps(_matches, sort_keys=True, default=str))
+
+# pobranie danych i policzenie tylko tych metryk, których potrzebuje dana strona
+def page_results(page):
+    with st.spinner("Pobieram dane z PZKosz..."):
+        try:
+            snapshot = load_data()
+            results = shared_cache().get_or_compute(
+                f"metrics:{data_digest(snapshot.version, snapshot.value[0])}:{page}",
+                lambda: {name: load_results(snapshot.version, snapshot.value[0])[name] for name in PAGE_METRICS[page]},
+                ttl=24 * 3600,
+            )
+        except Exception as e:
+            st.error("Nie udało się pobrać danych (PZKosz).")
+            st.exception(e)
+            st.stop()
+
+    scraped_at = snapshot.value[3]
+    st.sidebar.caption(f"Dane sprzed {(time.time() - scraped_at) / 60:.0f} min "
+                       f"(odświeżanie co {REFRESH_INTERVAL / 60:.0f} min)")
+    if data_refresher().last_error is not None:
+        st.sidebar.warning("Ostatnie odświeżenie danych nie powiodło się - wyświetlane są poprzednie dane.")
+    return results
 
 menu = st.sidebar.radio(
     "Menu",
-    ["Strona główna", "Analiza drużyny", "Wykresy", "Testy jednostkowe"]
+    list(PAGE_METRICS)
 )
 
-with st.spinner("Pobieram dane z PZKosz..."):
-    try:
-        matches, download_time = load_data()
-    except Exception as e:
-        st.error("Nie udało się pobrać danych (PZKosz).")
-        st.exception(e)
-        st.stop()
-team = BasketballTeam(TEAM_NAME, matches)
-analysis = BasketAnalysis(team)
-results = analysis.run()
-results["longest_win_streak"], results["longest_loss_streak"] = analysis.longest_streak(results["df"])
-
 if menu == "Strona główna":
     st.title("Projekt zaliczeniowy")
 
@@ -149,7 +214,8 @@ wizualizacji oraz prezentacji wyników.
 5. **`plots.py` - warstwa wizualizacji**  
    - `BasePlot` jest klasą abstrakcyjną definiującą wspólną metodę `draw(data)`.  
    - Dla każdej biblioteki (**Matplotlib, Seaborn, Plotly**) istnieją osobne klasy wykresów:
-     `PointsPlot`, `PointDiffPlot`, `AvgHomeAwayPlot`, `TopBottomPlot`.  
+     `PointsPlot`, `PointDiffPlot`, `AvgHomeAwayPlot`, `TopBottomPlot`
+     (moduły `plots_matplotlib.py`, `plots_seaborn.py`, `plots_plotly.py`, importowane dopiero po wyborze biblioteki).  
    - Dzięki temu aplikacja umożliwia wybór biblioteki wizualizacji w interfejsie,
      przy zachowaniu wspólnego interfejsu i tej samej logiki danych.
                 
@@ -158,7 +224,9 @@ wizualizacji oraz prezentacji wyników.
      wraz z czytelnym podsumowaniem wyników.
 
 7. **`main.py` - uruchamianie aplikacji**  
-   - Plik startowy wywołujący aplikację poleceniem: `streamlit run app.py`.
+   - Plik startowy wywołujący aplikację poleceniem: `streamlit run app.py`.  
+   - `python main.py report` tworzy raport bez serwera (np. w cron / CI): pliki PNG/HTML z wykresami
+     i JSON z metrykami dla jednej lub wielu drużyn, z podsumowaniem czasów i kodem wyjścia.
 
 8. **`test_analysis.py` oraz `test_fetcher.py` - testy jednostkowe**  
    - `test_analysis.py` weryfikuje poprawność obliczeń w `BasketAnalysis` na kontrolnym zbiorze danych.  
@@ -230,8 +298,11 @@ W projekcie wykorzystano następujące elementy programowania obiektowego:
 """)
 
 elif menu == "Analiza drużyny":
+    results = page_results(menu)
+    _, download_time, cache_hit, _ = load_data().value
 
-    st.info(f"Czas pobierania danych ze strony: {download_time:.3f} s")
+    cache_info = "strona bez zmian (cache)" if cache_hit else "nowe dane"
+    st.info(f"Czas pobierania danych ze strony: {download_time:.3f} s ({cache_info})")
 
     st.header("Pytania badawcze i odpowiedzi")
 
@@ -263,6 +334,7 @@ elif menu == "Analiza drużyny":
         st.metric("Najdłuższa seria porażek", results["longest_loss_streak"])
 
 elif menu == "Wykresy":
+    results = page_results(menu)
     st.header("Wizualizacja danych")
 
     library = st.radio(
@@ -272,53 +344,26 @@ elif menu == "Wykresy":
         horizontal=True
     )
 
-    if library == "Matplotlib":
-        plots = [
-            ("1. Trend punktów zdobytych i straconych w sezonie",
-             PointsPlotMatplotlib("Punkty Basket Hills i przeciwników w kolejnych meczach"),
-             results["df"]),
-            ("2. Różnica punktowa w kolejnych meczach",
-             PointDiffPlotMatplotlib("Różnica punktów w sezonie"),
-             results["point_diff"]),
-            ("3. Średnia liczba punktów: u siebie vs na wyjeździe",
-             AvgHomeAwayPlotMatplotlib("Średnia punktów: dom vs wyjazd"),
-             results["avg_home_away"]),
-            ("4. Najlepsze i najsłabsze mecze punktowo",
-             TopBottomPlotMatplotlib("Najwyższe i najniższe zdobycze punktowe"),
-             {"top": results["top_games"], "bottom": results["bottom_games"]}),
-        ]
-
-    elif library == "Seaborn":
-        plots = [
-            ("1. Trend punktów zdobytych i straconych w sezonie",
-             PointsPlotSeaborn("Punkty Basket Hills i przeciwników w kolejnych meczach"),
-             results["df"]),
-            ("2. Różnica punktowa w kolejnych meczach",
-             PointDiffPlotSeaborn("Różnica punktów w sezonie"),
-             results["point_diff"]),
-            ("3. Średnia liczba punktów: u siebie vs na wyjeździe",
-             AvgHomeAwayPlotSeaborn("Średnia punktów: dom vs wyjazd"),
-             results["avg_home_away"]),
-            ("4. Najlepsze i najsłabsze mecze punktowo",
-             TopBottomPlotSeaborn("Najwyższe i najniższe zdobycze punktowe"),
-             {"top": results["top_games"], "bottom": results["bottom_games"]}),
-        ]
-
-    else:  # Plotly
-        plots = [
-            ("1. Trend punktów zdobytych i straconych w sezonie",
-             PointsPlotPlotly("Punkty Basket Hills i przeciwników w kolejnych meczach"),
-             results["df"]),
-            ("2. Różnica punktowa w kolejnych meczach",
-             PointDiffPlotPlotly("Różnica punktów w sezonie"),
-             results["point_diff"]),
-            ("3. Średnia liczba punktów: u siebie vs na wyjeździe",
-             AvgHomeAwayPlotPlotly("Średnia punktów: dom vs wyjazd"),
-             results["avg_home_away"]),
-            ("4. Najlepsze i najsłabsze mecze punktowo",
-             TopBottomPlotPlotly("Najwyższe i najniższe zdobycze punktowe"),
-             {"top": results["top_games"], "bottom": results["bottom_games"]}),
-        ]
+    # klasy wykresów wybranej biblioteki są importowane dopiero teraz (np. PointsPlotPlotly)
+    backend = load_backend(library)
+
+    def plot_class(kind):
+        return getattr(backend, f"{kind}{library}")
+
+    plots = [
+        ("1. Trend punktów zdobytych i straconych w sezonie",
+         plot_class("PointsPlot")("Punkty Basket Hills i przeciwników w kolejnych meczach"),
+         results["df"]),
+        ("2. Różnica punktowa w kolejnych meczach",
+         plot_class("PointDiffPlot")("Różnica punktów w sezonie"),
+         results["point_diff"]),
+        ("3. Średnia liczba punktów: u siebie vs na wyjeździe",
+         plot_class("AvgHomeAwayPlot")("Średnia punktów: dom vs wyjazd"),
+         results["avg_home_away"]),
+        ("4. Najlepsze i najsłabsze mecze punktowo",
+         plot_class("TopBottomPlot")("Najwyższe i najniższe zdobycze punktowe"),
+         {"top": results["top_games"], "bottom": results["bottom_games"]}),
+    ]
 
     for header, plot_obj, data in plots:
         st.subheader(header)
@@ -382,4 +427,24 @@ elif menu == "Testy jednostkowe":
 
         with st.expander("Pełny log z testów"):
             st.code(output)
-    
\ No newline at end of file
+    
+
+
+# Panel diagnostyczny - czasy etapów (spany) bieżącego przebiegu oraz p50 / p95 ze wszystkich przebiegów
+run_spans = TRACER.run_spans(run_id)
+if TRACE_FILE:
+    TRACER.export_jsonl(TRACE_FILE, run_spans)
+
+with st.sidebar.expander("Diagnostyka wydajności"):
+    st.caption("Bieżący przebieg")
+    st.dataframe(
+        [{"Etap": s.path, "Czas [ms]": round(s.duration * 1000, 2)} for s in run_spans],
+        hide_index=True,
+    )
+    st.caption("Wszystkie przebiegi")
+    st.dataframe(
+        [{"Etap": r["path"], "Liczba": r["count"], "p50 [ms]": round(r["p50_ms"], 2),
+          "p95 [ms]": round(r["p95_ms"], 2)} for r in TRACER.stats()],
+        hide_index=True,
+    )
+    st.download_button("Pobierz pomiary (JSONL)", TRACER.to_jsonl(), file_name="spans.jsonl")
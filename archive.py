@@ -0,0 +1,121 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+
+MODES = ("record", "replay")
+
+
+# Archiwum surowych stron HTML (nagrywanie / odtwarzanie bez sieci)
+# - treść zapisywana raz, pod skrótem SHA-256 (objects/ab/abcdef....z, kompresja zlib)
+# - index.jsonl: historia wersji każdego adresu (nowy wpis tylko przy zmianie treści)
+# - odczyt przez mmap - skompresowany plik nie jest kopiowany do pamięci procesu przed dekompresją
+# - mode="record": MatchDataFetcher zapisuje każdą pobraną stronę
+#   mode="replay": MatchDataFetcher czyta strony z archiwum, bez żadnych zapytań HTTP
+class HtmlArchive:
+    def __init__(self, directory, mode="replay"):
+        if mode not in MODES:
+            raise ValueError(f"Nieznany tryb archiwum: {mode} (dostępne: {', '.join(MODES)})")
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_size = -1
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "index.jsonl")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest + ".z")
+
+    # {url: [wpisy od najstarszego]} - wczytywany ponownie tylko, gdy plik indeksu urósł
+    def _entries(self):
+        try:
+            size = os.path.getsize(self.index_path)
+        except OSError:
+            size = 0
+        with self._lock:
+            if size != self._index_size:
+                index = {}
+                if size:
+                    with open(self.index_path, encoding="utf-8") as f:
+                        for line in f:
+                            try:
+                                entry = json.loads(line)
+                            except ValueError:
+                                continue  # niedokończony wpis przerwanego zapisu
+                            index.setdefault(entry["url"], []).append(entry)
+                self._index, self._index_size = index, size
+            return self._index
+
+    def urls(self):
+        return sorted(self._entries())
+
+    # wersje strony: [{"url", "sha256", "recorded_at", "size"}] od najstarszej
+    def versions(self, url):
+        return list(self._entries().get(url, []))
+
+    # zapis strony; zwraca skrót treści
+    def record(self, url, text):
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(data, 9))
+            os.replace(tmp, path)
+
+        history = self._entries().get(url)
+        if not history or history[-1]["sha256"] != digest:
+            entry = {"url": url, "sha256": digest, "recorded_at": time.time(), "size": len(data)}
+            line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+            # jeden zapis w trybie dopisywania - wpisy z wielu wątków / procesów się nie przeplatają
+            with self._lock, open(self.index_path, "a+b") as f:
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line  # urwany wpis przerwanego zapisu - nowy wpis w osobnej linii
+                f.write(line)
+                # indeks w pamięci aktualny (nikt inny nie dopisał w międzyczasie) - dopisujemy bez ponownego wczytania
+                if self._index is not None and end == self._index_size:
+                    self._index.setdefault(url, []).append(entry)
+                    self._index_size = end + len(line)
+        return digest
+
+    # treść strony o danym skrócie (odczyt przez mmap)
+    def read(self, digest):
+        try:
+            with open(self._blob_path(digest), "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return zlib.decompress(data).decode("utf-8")
+        except FileNotFoundError:
+            raise KeyError(f"Brak treści w archiwum: {digest}") from None
+
+    # najnowsza (lub wskazana skrótem) wersja strony
+    def load(self, url, digest=None):
+        history = self._entries().get(url)
+        if not history:
+            raise KeyError(f"Brak strony w archiwum: {url}")
+        if digest is None:
+            digest = history[-1]["sha256"]
+        elif all(entry["sha256"] != digest for entry in history):
+            raise KeyError(f"Brak wersji {digest} strony {url} w archiwum")
+        return self.read(digest)
+
+    # rozmiar archiwum na dysku (skompresowane treści) i rozmiar stron po rozpakowaniu
+    def stats(self):
+        stored = {}
+        for history in self._entries().values():
+            for entry in history:
+                stored[entry["sha256"]] = entry["size"]
+        disk = sum(os.path.getsize(self._blob_path(d)) for d in stored if os.path.exists(self._blob_path(d)))
+        return {"urls": len(self._entries()), "objects": len(stored), "raw_bytes": sum(stored.values()),
+                "disk_bytes": disk}
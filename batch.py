@@ -0,0 +1,136 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import kernels
+from storage import season_of
+
+TEAM = "Drużyna"
+SEASON = "Sezon"
+
+
+# metryki liczone w procesie roboczym dla jednej grupy (drużyna, sezon)
+def _group_metrics(frame):
+    results = kernels.compute_all(frame.reset_index(drop=True))
+    return {k: results[k] for k in ("point_diff", "top_games", "bottom_games")}
+
+
+# Analiza wielu drużyn i sezonów naraz
+# - wejście: lista obiektów SportsTeam albo jedna ramka w formacie długim z kolumną drużyny
+# - metryki skalarne (bilans, średnie, dom/wyjazd, serie) liczone wektorowo jednym groupby
+# - cięższe metryki (różnica punktów, najlepsze/najsłabsze mecze) liczone w puli procesów,
+#   ale tylko dla dużych danych - uruchomienie puli kosztuje więcej niż policzenie kilku tysięcy meczów
+class BatchAnalysis:
+    min_parallel_rows = 50_000  # poniżej tej liczby meczów detail() liczy w bieżącym procesie
+
+    def __init__(self, teams=None, frame=None, team_col=TEAM, by_season=True):
+        if (teams is None) == (frame is None):
+            raise ValueError("Podaj listę drużyn (teams) albo ramkę danych (frame)")
+
+        if teams is not None:
+            parts = [pd.DataFrame(t.get_matches()).assign(**{TEAM: t.get_name()}) for t in teams]
+            frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[*kernels.COLUMNS, TEAM])
+            team_col = TEAM
+
+        df = frame.rename(columns={team_col: TEAM})
+        df["Data i godzina meczu"] = pd.to_datetime(df["Data i godzina meczu"], dayfirst=True, errors="coerce")
+        df["Punkty Basket Hills"] = pd.to_numeric(df["Punkty Basket Hills"], errors="coerce")
+        df["Punkty przeciwnika"] = pd.to_numeric(df["Punkty przeciwnika"], errors="coerce")
+        df = df.dropna(subset=["Data i godzina meczu", "Punkty Basket Hills", "Punkty przeciwnika"])
+
+        self.group_cols = [TEAM]
+        if by_season:
+            if SEASON not in df.columns:
+                df[SEASON] = df["Data i godzina meczu"].map(season_of).astype(str)
+            self.group_cols.append(SEASON)
+
+        self.df = df.sort_values(self.group_cols + ["Data i godzina meczu"], kind="stable").reset_index(drop=True)
+
+    # Tabela zbiorcza: jeden wiersz na grupę (drużyna[, sezon]), metryki skalarne z run()
+    def summary(self):
+        df = self.df
+        keys = [df[c] for c in self.group_cols]
+        win = df["Wynik meczu"] == "Wygrana"
+        loss = df["Wynik meczu"] == "Porażka"
+        home = df["Miejsce meczu"] == "U siebie"
+        away = df["Miejsce meczu"] == "Na wyjeździe"
+        scored = df["Punkty Basket Hills"]
+
+        parts = pd.DataFrame({
+            "matches": 1,
+            "wins": win,
+            "losses": loss,
+            "scored": scored,
+            "conceded": df["Punkty przeciwnika"],
+            "home_games": home,
+            "away_games": away,
+            "home_scored": scored.where(home, 0),
+            "away_scored": scored.where(away, 0),
+            "home_wins": home & win,
+            "home_losses": home & loss,
+            "away_wins": away & win,
+            "away_losses": away & loss,
+        })
+        sums = parts.groupby(keys, sort=True).sum()
+
+        out = pd.DataFrame(index=sums.index)
+        out["matches"] = sums["matches"]
+        out["wins"] = sums["wins"]
+        out["losses"] = sums["losses"]
+        out["avg_scored"] = (sums["scored"] / sums["matches"]).round(2)
+        out["avg_conceded"] = (sums["conceded"] / sums["matches"]).round(2)
+        out["avg_home"] = sums["home_scored"] / sums["home_games"].where(sums["home_games"] > 0)
+        out["avg_away"] = sums["away_scored"] / sums["away_games"].where(sums["away_games"] > 0)
+        for col in ("home_wins", "home_losses", "away_wins", "away_losses"):
+            out[col] = sums[col]
+
+        longest = self._longest_streaks()
+        out["longest_win_streak"] = longest.get("Wygrana", float("nan"))
+        out["longest_loss_streak"] = longest.get("Porażka", float("nan"))
+        return out.reset_index()
+
+    # najdłuższe serie dla wszystkich grup naraz - numer serii zmienia się przy zmianie wyniku lub grupy
+    def _longest_streaks(self):
+        df = self.df
+        changed = df["Wynik meczu"] != df["Wynik meczu"].shift()
+        for col in self.group_cols:
+            changed |= df[col] != df[col].shift()
+        run_id = changed.cumsum()
+
+        runs = df.groupby(run_id).agg(
+            **{c: (c, "first") for c in self.group_cols},
+            result=("Wynik meczu", "first"),
+            size=("Wynik meczu", "size"),
+        )
+        longest = runs.groupby(self.group_cols + ["result"])["size"].max().unstack("result")
+        return {r: longest[r] for r in longest.columns}
+
+    def groups(self):
+        return self.df.groupby(self.group_cols, sort=True)
+
+    # Cięższe metryki per grupa liczone równolegle w puli procesów
+    # max_workers=0 albo mniej niż min_parallel_rows meczów - liczenie w bieżącym procesie
+    # zwraca słownik tabel w formacie długim: point_diff, top_games, bottom_games
+    def detail(self, max_workers=None):
+        groups = list(self.groups())
+        frames = [g.drop(columns=self.group_cols) for _, g in groups]
+
+        if max_workers == 0 or len(frames) <= 1 or len(self.df) < self.min_parallel_rows:
+            computed = [_group_metrics(f) for f in frames]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                computed = list(pool.map(_group_metrics, frames, chunksize=max(1, len(frames) // 32)))
+
+        tables = {}
+        for name in ("point_diff", "top_games", "bottom_games"):
+            parts = []
+            for (key, _), metrics in zip(groups, computed):
+                key = key if isinstance(key, tuple) else (key,)
+                part = metrics[name].copy()
+                for col, value in zip(reversed(self.group_cols), reversed(key)):
+                    part.insert(0, col, value)
+                parts.append(part)
+            tables[name] = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        return tables
+
+    def run(self, max_workers=None):
+        return {"summary": self.summary(), **self.detail(max_workers)}
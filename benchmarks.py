@@ -0,0 +1,298 @@
+import argparse
+import copy
+import ctypes
+import functools
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from data_fetcher import MatchDataFetcher, ROW_PARSERS
+from fixtures import TEAM_NAME, make_matches, make_schedule_html
+
+DEFAULT_SIZES = (10, 1_000, 10_000)
+
+
+def _best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _result(benchmark, case, rows, seconds, **extra):
+    return {"benchmark": benchmark, "case": case, "rows": rows, "seconds": seconds, **extra}
+
+
+# odpowiedź HTTP podstawiana w miejsce requests.get
+def _fake_response(html):
+    resp = Mock()
+    resp.text = html
+    resp.status_code = 200
+    resp.raise_for_status = Mock()
+    return resp
+
+
+# Porównanie silników parsowania HTML (fetch_matches z podmienionym requests.get)
+def bench_parsers(sizes=DEFAULT_SIZES, repeat=3):
+    results = []
+    for n in sizes:
+        html = make_schedule_html(n)
+        reference = None
+        for parser in ROW_PARSERS:
+            # nowy obiekt w każdym pomiarze - bez odcisków wierszy z poprzedniego parsowania
+            with patch("data_fetcher.requests.get", return_value=_fake_response(html)):
+                elapsed = _best_of(lambda: MatchDataFetcher("http://example.com", TEAM_NAME, parser=parser)
+                                   .fetch_matches(), repeat)
+                fetcher = MatchDataFetcher("http://example.com", TEAM_NAME, parser=parser)
+                data, _ = fetcher.fetch_matches()
+
+            if reference is None:
+                reference = data
+            elif data != reference:
+                raise AssertionError(f"Parser {parser} zwrócił inne rekordy dla n={n}")
+
+            results.append(_result("fetch_matches", parser, n, elapsed))
+
+            # odświeżenie niezmienionej strony - wiersze rozpoznane po odciskach
+            with patch("data_fetcher.requests.get", return_value=_fake_response(html)):
+                elapsed = _best_of(fetcher.fetch_matches, repeat)
+            results.append(_result("fetch_matches", f"{parser}_refresh", n, elapsed))
+    return results
+
+
+# nazwy wszystkich cached_property klasy (także dziedziczonych)
+def _cached_properties(cls):
+    return {name for klass in cls.__mro__ for name, attr in vars(klass).items()
+            if isinstance(attr, functools.cached_property)}
+
+
+# kopia analizy bez zapamiętanych wyników pośrednich (cached_property)
+# - df to w ścieżce pandas dane ustawiane w __init__, a nie wynik pośredni, więc zostaje
+def _without_cache(analysis):
+    fresh = copy.copy(analysis)
+    for name in _cached_properties(type(analysis)) - {"df"}:
+        fresh.__dict__.pop(name, None)
+    return fresh
+
+
+# Budowa BasketAnalysis oraz policzenie wszystkich metryk run() (pandas i jądro NumPy)
+def bench_analysis(sizes=DEFAULT_SIZES, repeat=3):
+    import frame_backends
+    from analysis import BasketAnalysis, SCHEMAS
+    from models import BasketballTeam
+    from records import MatchBatch
+
+    results = []
+    for n in sizes:
+        team = BasketballTeam(TEAM_NAME, make_matches(n))
+        batch_team = BasketballTeam(TEAM_NAME, MatchBatch.from_dicts(team.get_matches()))
+        for case, make in (("construct", lambda: BasketAnalysis(team)),
+                           ("construct_optimized", lambda: BasketAnalysis(team, schema="optimized")),
+                           ("construct_batch", lambda: BasketAnalysis(batch_team))):
+            elapsed = _best_of(make, repeat)
+            memory = int(make().df.memory_usage(deep=True).sum())
+            results.append(_result("analysis", case, n, elapsed, memory_bytes=memory))
+
+        for schema in SCHEMAS:
+            analysis = BasketAnalysis(team, schema=schema)
+            suffix = "" if schema == "default" else f"_{schema}"
+            for case, fused in (("run", False), ("run_fused", True)):
+                def run_all():
+                    results_ = _without_cache(analysis).run(fused=fused)
+                    for key in results_:
+                        results_[key]
+                results.append(_result("analysis", case + suffix, n, _best_of(run_all, repeat)))
+
+        # alternatywne silniki danych (jeśli zainstalowane)
+        for backend in frame_backends.BACKENDS:
+            if not frame_backends.available(backend):
+                continue
+            elapsed = _best_of(lambda: BasketAnalysis(team, backend=backend), repeat)
+            results.append(_result("analysis", f"construct_{backend}", n, elapsed))
+            analysis = BasketAnalysis(team, backend=backend)
+            elapsed = _best_of(lambda: analysis.backend.metrics(analysis.frame), repeat)
+            results.append(_result("analysis", f"run_{backend}", n, elapsed))
+    return results
+
+
+# Rysowanie każdego wykresu (BasePlot.draw) bez Streamlit i bez cache wykresów
+def bench_plots(sizes=DEFAULT_SIZES, repeat=1):
+    import plots
+    from analysis import BasketAnalysis
+    from models import BasketballTeam
+
+    backends = {library: plots.load_backend(library) for library in plots.BACKENDS}
+    kinds = ("PointsPlot", "PointDiffPlot", "AvgHomeAwayPlot", "TopBottomPlot")
+
+    results = []
+    with patch("streamlit.image"), patch("streamlit.plotly_chart"):
+        for n in sizes:
+            res = BasketAnalysis(BasketballTeam(TEAM_NAME, make_matches(n))).run()
+            inputs = {
+                "PointsPlot": res["df"],
+                "PointDiffPlot": res["point_diff"],
+                "AvgHomeAwayPlot": res["avg_home_away"],
+                "TopBottomPlot": {"top": res["top_games"], "bottom": res["bottom_games"]},
+            }
+            for library, module in backends.items():
+                for kind in kinds:
+                    plot = getattr(module, f"{kind}{library}")("Benchmark", cache=None)
+                    elapsed = _best_of(lambda: plot.draw(inputs[kind]), repeat)
+                    results.append(_result("plot", type(plot).__name__, n, elapsed))
+    return results
+
+
+SUITES = {"fetch": bench_parsers, "analysis": bench_analysis, "plots": bench_plots}
+
+
+# Porównanie z zapisanym wynikiem bazowym; regresja = wolniej o więcej niż tolerance
+# (i o więcej niż min_delta sekund, żeby pominąć szum bardzo krótkich pomiarów)
+def compare_to_baseline(results, baseline, tolerance=0.25, min_delta=0.002):
+    reference = {(b["benchmark"], b["case"], b["rows"]): b["seconds"] for b in baseline}
+    regressions = []
+    for r in results:
+        before = reference.get((r["benchmark"], r["case"], r["rows"]))
+        if before is None:
+            continue
+        r["baseline_seconds"] = before
+        r["ratio"] = r["seconds"] / before if before else float("inf")
+        if r["seconds"] > before * (1 + tolerance) and r["seconds"] - before > min_delta:
+            regressions.append(r)
+    return regressions
+
+
+# bieżąca pamięć procesu (RSS) w KiB - z /proc (Linux); None, gdy niedostępna
+def _current_rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * resource.getpagesize() // 1024
+
+
+# wynik glibc mallinfo2 (pola size_t)
+class _MallInfo2(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_size_t) for name in ("arena", "ordblks", "smblks", "hblks", "hblkhd", "usmblks",
+                                                      "fsmblks", "uordblks", "fordblks", "keepcost")]
+
+
+# pamięć zajęta przez żywe alokacje malloc w KiB (glibc mallinfo2); None poza glibc
+# - w odróżnieniu od RSS nie maskuje wycieku, gdy proces ma wolne obszary sterty po wcześniejszej pracy
+def _heap_in_use_kb():
+    try:
+        mallinfo2 = ctypes.CDLL(None).mallinfo2
+    except (OSError, AttributeError):
+        return None
+    mallinfo2.restype = _MallInfo2
+    info = mallinfo2()
+    return (info.uordblks + info.hblkhd) // 1024
+
+
+# Test długotrwały: wielokrotne renderowanie wykresu Matplotlib i pomiar pamięci co `every` renderów
+# - rss_kb: bieżący RSS procesu (ru_maxrss rośnie tylko monotonicznie, więc nie pokazuje zwalniania)
+# - heap_kb: pamięć żywych alokacji malloc (np. bufory PNG, tablice NumPy)
+# - blocks: liczba żywych bloków alokatora Pythona (sys.getallocatedblocks) - zatrzymane obiekty
+# - traced_kb (trace=True): pamięć zaalokowana przez Pythona (tracemalloc) względem stanu po rozgrzewce;
+#   dokładna, ale kilkukrotnie spowalnia rendery
+# - historia spanów TRACER jest czyszczona przed każdą próbką (ograniczona, ale inaczej rosłaby z każdym renderem)
+# - dpi: rozdzielczość PNG (None = jak w aplikacji); niskie dpi pozwala wykonać setki renderów w teście
+# po rozgrzewce pamięć powinna pozostać stała - figury nie mogą się gromadzić (late_growth)
+def soak_figures(renders=2000, warmup=50, every=250, dpi=None, trace=True):
+    import pandas as pd
+    from decorators import TRACER
+    from plots_matplotlib import AvgHomeAwayPlotMatplotlib
+
+    data = pd.Series([82.5, 74.0], index=pd.Index(["U siebie", "Na wyjeździe"], name="Miejsce meczu"),
+                     name="Punkty Basket Hills")
+    plot = AvgHomeAwayPlotMatplotlib("Średnia punktów: dom vs wyjazd", cache=None)
+    if dpi is not None:
+        plot.dpi = dpi
+
+    for _ in range(warmup):
+        plot.render_payload(data)
+    TRACER.clear()
+    gc.collect()
+
+    started = tracemalloc.is_tracing()
+    if trace and not started:
+        tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0] if trace else 0
+        samples = []
+        for i in range(1, renders + 1):
+            plot.render_payload(data)
+            if i % every == 0 or i == renders:
+                TRACER.clear()
+                gc.collect()
+                sample = {"renders": i, "rss_kb": _current_rss_kb(), "heap_kb": _heap_in_use_kb(),
+                          "blocks": sys.getallocatedblocks()}
+                if trace:
+                    sample["traced_kb"] = round((tracemalloc.get_traced_memory()[0] - base) / 1024, 1)
+                samples.append(sample)
+    finally:
+        if trace and not started:
+            tracemalloc.stop()
+    return samples
+
+
+# przyrost wartości `key` na jeden render między dwiema ostatnimi próbkami soak_figures
+# - pomija rozgrzewkę i wczesne okna, w których pamięć rośnie jeszcze przez cache Matplotlib
+def late_growth(samples, key):
+    before, last = samples[-2], samples[-1]
+    return (last[key] - before[key]) / (last["renders"] - before["renders"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki: pobieranie/parsowanie, analiza, wykresy")
+    parser.add_argument("--suite", nargs="+", choices=sorted(SUITES), default=sorted(SUITES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="liczby wierszy (np. 10 1000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="liczba powtórzeń (najlepszy wynik)")
+    parser.add_argument("--output", default="bench_results.json", help="plik JSON z wynikami")
+    parser.add_argument("--baseline", help="plik JSON z wynikami bazowymi do porównania (np. bench_baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dopuszczalne spowolnienie (0.25 = 25%%)")
+    parser.add_argument("--soak", type=int, metavar="N", help="dodatkowo: N renderów i pomiar pamięci")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.suite:
+        repeat = 1 if name == "plots" else args.repeat
+        for r in SUITES[name](sizes=args.sizes, repeat=repeat):
+            memory = f"  {r['memory_bytes'] / 1024:10.1f} KiB" if "memory_bytes" in r else ""
+            print(f"{r['benchmark']:<14} {r['case']:<28} {r['rows']:>8} wierszy  {r['seconds'] * 1000:10.2f} ms{memory}")
+            results.append(r)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(results, json.load(f)["results"], args.tolerance)
+        for r in regressions:
+            print(f"REGRESJA: {r['benchmark']} {r['case']} n={r['rows']}: "
+                  f"{r['baseline_seconds'] * 1000:.2f} ms -> {r['seconds'] * 1000:.2f} ms (x{r['ratio']:.2f})")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+        "regressions": len(regressions),
+    }
+    if args.soak:
+        report["soak"] = soak_figures(renders=args.soak)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from data_fetcher import HEADERS, MatchDataFetcher, make_session
+from decorators import TRACER
+from storage import MatchStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_tasks (
+    url        TEXT    NOT NULL,
+    kind       TEXT    NOT NULL,
+    season     TEXT    NOT NULL DEFAULT '',
+    team       TEXT,
+    status     TEXT    NOT NULL DEFAULT 'pending',
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    rows       INTEGER,
+    error      TEXT,
+    updated_at REAL,
+    PRIMARY KEY (url, season)  -- ta sama strona ligi może być podana dla kilku sezonów
+);
+CREATE INDEX IF NOT EXISTS idx_crawl_tasks_status ON crawl_tasks (kind, status);
+"""
+
+# odnośnik do drużyny na stronie ligi, np. /liga/4/druzyny/d/4119/basket-hills-bielsko-biala.html
+TEAM_LINK = re.compile(r"(?P<base>.*/druzyny/d/\d+/[^/?#]+?)(?:/terminarz)?\.html")
+
+
+# Ogranicznik tempa zapytań (token bucket) - wspólny dla wszystkich wątków
+# - rate zapytań na sekundę, burst - ile zapytań może pójść od razu po przerwie
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError(f"Limit zapytań musi być dodatni (podano: {rate})")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+# Punkt kontrolny pobierania - tabela zadań w bazie SQLite (zwykle tej samej co MatchStore)
+# - zadania "league" (strona ligi w sezonie) i "team" (terminarz drużyny)
+# - po przerwaniu kolejne uruchomienie pomija zadania "done" i ponawia pozostałe
+class CrawlCheckpoint:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add(self, url, kind, season="", team=None):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR IGNORE INTO crawl_tasks (url, kind, season, team) VALUES (?, ?, ?, ?)",
+                         (url, kind, season or "", team))
+
+    def pending(self, kind, max_attempts):
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT url, season, team FROM crawl_tasks WHERE kind = ? AND status != 'done' AND attempts < ? "
+                "ORDER BY rowid", (kind, max_attempts),
+            ).fetchall()
+
+    def finish(self, url, season, rows=None, error=None):
+        status = "failed" if error else "done"
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE crawl_tasks SET status = ?, attempts = attempts + 1, rows = ?, error = ?, updated_at = ? "
+                "WHERE url = ? AND season = ?", (status, rows, error, time.time(), url, season or ""),
+            )
+
+    def counts(self):
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM crawl_tasks GROUP BY status").fetchall())
+
+
+# Pobieranie historii wielu sezonów / lig / drużyn z możliwością wznowienia
+# - seasons: {sezon: [adresy stron lig]} - drużyny są odczytywane z odnośników na stronach lig
+# - pobieranie w puli wątków (max_workers), tempo ograniczone przez RateLimiter
+# - mecze każdej drużyny trafiają do MatchStore od razu po sparsowaniu (bez gromadzenia w pamięci)
+# - postęp zapisywany w CrawlCheckpoint; przerwane pobieranie wznawia się od niedokończonych zadań
+class BackfillCrawler:
+    def __init__(self, store, seasons, checkpoint=None, max_workers=4, rate=2.0, max_attempts=3,
+                 session=None, cache=None, parser="lxml-iter", team_filter=None, archive=None):
+        self.store = store if isinstance(store, MatchStore) else MatchStore(store)
+        self.seasons = seasons
+        self.checkpoint = checkpoint or CrawlCheckpoint(self.store.path)
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.max_attempts = max_attempts
+        self.session = session if session is not None else make_session(max_workers)
+        self.cache = cache  # opcjonalny http_cache.ResponseCache (ponowne pobranie = 304)
+        self.parser = parser
+        self.archive = archive  # opcjonalne archive.HtmlArchive - nagrywanie lub odtwarzanie stron
+        self.team_filter = team_filter  # opcjonalna funkcja (sezon, nazwa drużyny) -> bool
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _get(self, url):
+        if self.archive is not None and self.archive.mode == "replay":
+            return self.archive.load(url)
+        self.limiter.wait()
+        r = self.session.get(url, headers=HEADERS, timeout=20)
+        r.raise_for_status()
+        if self.archive is not None:
+            self.archive.record(url, r.text)
+        return r.text
+
+    # odnośniki do drużyn na stronie ligi -> adresy terminarzy
+    @staticmethod
+    def discover_teams(html, base_url):
+        teams = {}
+        for a in BeautifulSoup(html, "html.parser").find_all("a", href=True):
+            match = TEAM_LINK.fullmatch(urljoin(base_url, a["href"]).split("?")[0])
+            name = a.get_text(" ", strip=True)
+            if match and name:
+                teams.setdefault(match["base"] + "/terminarz.html", name)
+        return teams
+
+    def _crawl_league(self, url, season):
+        with TRACER.span("crawl:league"):
+            try:
+                teams = self.discover_teams(self._get(url), url)
+            except Exception as e:
+                self.checkpoint.finish(url, season, error=str(e))
+                return
+            for team_url, name in teams.items():
+                if self.team_filter is None or self.team_filter(season, name):
+                    self.checkpoint.add(team_url, "team", season, name)
+            self.checkpoint.finish(url, season, rows=len(teams))
+
+    def _crawl_team(self, url, season, team):
+        with TRACER.span("crawl:team"):
+            try:
+                fetcher = MatchDataFetcher(url, team, session=self.session, cache=self.cache, parser=self.parser,
+                                           archive=self.archive)
+                if self.archive is None or self.archive.mode != "replay":
+                    self.limiter.wait()
+                matches, _ = fetcher.fetch_matches()
+                rows = self.store.upsert(team, matches, season=season or None)
+            except Exception as e:
+                self.checkpoint.finish(url, season, error=str(e))
+                return
+            self.checkpoint.finish(url, season, rows=rows)
+
+    # przerwanie (np. Ctrl-C) ustawia stop() jeszcze przed zamknięciem puli - zadania w kolejce
+    # są anulowane, kończą się tylko te już rozpoczęte
+    def _run_tasks(self, kind, func):
+        tasks = self.checkpoint.pending(kind, self.max_attempts)
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        guarded = TRACER.bind(self._guarded)  # spany wątków roboczych w przebiegu wywołującego
+        try:
+            futures = []
+            for task in tasks:
+                if self._stop.is_set():
+                    break
+                futures.append(pool.submit(guarded, func, *task))
+            for future in futures:
+                future.result()
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    # zadanie pomijane po stop() - zostaje w punkcie kontrolnym jako niedokończone
+    def _guarded(self, func, *task):
+        if not self._stop.is_set():
+            func(*task)
+
+    # pełne pobieranie: strony lig -> lista drużyn -> terminarze; zwraca liczniki zadań wg statusu
+    def run(self):
+        self._stop.clear()
+        for season, league_urls in self.seasons.items():
+            for url in league_urls:
+                self.checkpoint.add(url, "league", season)
+        self._run_tasks("league", lambda url, season, team: self._crawl_league(url, season))
+        if not self._stop.is_set():
+            self._run_tasks("team", self._crawl_team)
+        return self.checkpoint.counts()
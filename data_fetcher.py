@@ -1,65 +1,344 @@
+import hashlib
+import io
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from decorators import log_call
+from lxml import etree
+from decorators import log_call, TRACER
+from records import Location, MatchBatch
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+# Wyodrębnianie wierszy tabeli (listy tekstów komórek) - różne silniki parsowania
+
+# BeautifulSoup z wbudowanym parserem Pythona lub z lxml
+def _rows_bs4(html, features):
+    soup = BeautifulSoup(html, features)
+    for r in soup.select("table tbody tr"):
+        yield [c.get_text(strip=True) for c in r.find_all("td")]
+
+
+# czy wiersz leży wewnątrz "table tbody" (odpowiednik selektora "table tbody tr")
+def _in_table_body(tr):
+    seen_tbody = False
+    for parent in tr.iterancestors():
+        if parent.tag == "tbody":
+            seen_tbody = True
+        elif parent.tag == "table" and seen_tbody:
+            return True
+    return False
+
+
+# tekst komórki bez treści skryptów, stylów, szablonów i komentarzy - te pomija też get_text() z bs4
+_CELL_TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+
+# strumieniowe parsowanie lxml (iterparse) - wiersze są przetwarzane i zwalniane
+# na bieżąco, bez budowania całego drzewa dokumentu
+def _rows_lxml_iter(html):
+    source = io.BytesIO(html.encode("utf-8"))
+    for _, tr in etree.iterparse(source, events=("end",), tag="tr", html=True, encoding="utf-8"):
+        if _in_table_body(tr):
+            # get_text(strip=True) z bs4 = sklejenie przyciętych fragmentów tekstu
+            yield ["".join(t.strip() for t in _CELL_TEXT(td)) for td in tr.iter("td")]
+
+        # zwolnienie przetworzonych wierszy (o ile nie są zagnieżdżone w innym wierszu)
+        if next(tr.iterancestors("tr"), None) is None:
+            tr.clear()
+            while tr.getprevious() is not None:
+                del tr.getparent()[0]
+
+
+ROW_PARSERS = {
+    "html.parser": lambda html: _rows_bs4(html, "html.parser"),
+    "lxml": lambda html: _rows_bs4(html, "lxml"),
+    "lxml-iter": _rows_lxml_iter,
+}
+
+# odcisk wiersza tabeli - skrót surowych tekstów komórek
+def row_fingerprint(cols):
+    return hashlib.blake2b("\x1f".join(cols).encode("utf-8"), digest_size=16).digest()
+
+
+# klucz meczu przy porównywaniu pobrań (ten sam co w bazie MatchStore: data + przeciwnik)
+def _match_key(match):
+    return match["Data i godzina meczu"], match["Przeciwnik"]
+
+
+# Różnica między dwoma pobraniami terminarza
+# - added: nowe mecze, changed: pary (poprzedni, obecny) dla meczów ze zmienionym wierszem
+#   (np. poprawiony wynik), removed: mecze, których nie ma już na stronie
+class MatchDiff:
+    __slots__ = ("added", "changed", "removed")
+
+    def __init__(self, added=(), changed=(), removed=()):
+        self.added = list(added)
+        self.changed = list(changed)
+        self.removed = list(removed)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    # mecze do zapisania / przeliczenia (nowe i zmienione, w obecnej postaci)
+    @property
+    def upserts(self):
+        return self.added + [new for _, new in self.changed]
+
+    def summary(self):
+        return {"added": len(self.added), "changed": len(self.changed), "removed": len(self.removed)}
+
+    def __repr__(self):
+        return f"MatchDiff({self.summary()})"
+
+
+# porównanie list meczów (w kolejności z nowej strony, usunięte w kolejności ze starej)
+def diff_matches(old, new):
+    before = {_match_key(m): m for m in old}
+    after = {_match_key(m): m for m in new}
+    added, changed = [], []
+    for key, match in after.items():
+        previous = before.get(key)
+        if previous is None:
+            added.append(match)
+        elif previous != match:
+            changed.append((previous, match))
+    removed = [match for key, match in before.items() if key not in after]
+    return MatchDiff(added, changed, removed)
+
 
 # Klasa odpowiedzialna za pobieranie i parsowanie danych meczowych ze strony internetowej
 class MatchDataFetcher:
-    def __init__(self, url, team_name):
+    def __init__(self, url, team_name, session=None, cache=None, parser="html.parser", archive=None):
+        if parser not in ROW_PARSERS:
+            raise ValueError(f"Nieznany parser HTML: {parser} (dostępne: {', '.join(ROW_PARSERS)})")
         self.url = url
         self.team_name = team_name
+        self.parser = parser  # silnik parsowania HTML, klucz z ROW_PARSERS
+        self.session = session  # opcjonalna współdzielona sesja HTTP (pula połączeń)
+        self.cache = cache  # opcjonalny dyskowy cache odpowiedzi (http_cache.ResponseCache)
+        self.archive = archive  # opcjonalne archiwum stron (archive.HtmlArchive): nagrywanie / odtwarzanie
         self.download_time = None  
+        self.cache_hit = None  # True / False po pobraniu z cache, None bez cache
+        self.row_records = {}  # odcisk wiersza -> mecz (None dla wierszy pominiętych) z ostatniego parsowania
+        self.rows_parsed = 0  # liczba wierszy sparsowanych od nowa przy ostatnim parsowaniu
+        self.matches = None  # mecze z ostatniego pobrania - punkt odniesienia dla last_diff
+        self.last_diff = None  # MatchDiff względem poprzedniego pobrania (pierwsze: wszystkie mecze jako added)
+        self._fetched = None
 
     # dekorator mierzący czas pobrania HTML 
-    @log_call
+    @log_call(name="download")
     def _download_html(self):
-        headers = {"User-Agent": "Mozilla/5.0"}
-        r = requests.get(self.url, headers=headers, timeout=15)
+        if self.archive is not None and self.archive.mode == "replay":
+            return self.archive.load(self.url)  # bez zapytań HTTP
+        html = self._request_html()
+        if self.archive is not None:
+            self.archive.record(self.url, html)
+        return html
+
+    def _request_html(self):
+        http = self.session if self.session is not None else requests
+        headers = dict(HEADERS)
+        if self.cache is not None:
+            headers.update(self.cache.conditional_headers(self.url))
+
+        r = http.get(self.url, headers=headers, timeout=15)
+
+        if self.cache is not None and r.status_code == 304:
+            html = self.cache.not_modified(self.url)
+            if html is not None:
+                self.cache_hit = True
+                return html
+            # brak treści na dysku - ponowne pobranie bez nagłówków warunkowych
+            r = http.get(self.url, headers=HEADERS, timeout=15)
+
         r.raise_for_status()
+        if self.cache is not None:
+            self.cache_hit = self.cache.store(self.url, r.text, r.headers)
         return r.text
 
-    def fetch_matches(self):
-        html = self._download_html()
+    # advance=False: last_diff jest liczony, ale punkt odniesienia zostaje bez zmian do wywołania
+    # advance() - np. dopiero po udanym zapisie zmian, żeby nieudany zapis nie zgubił meczów
+    def fetch_matches(self, advance=True):
+        with TRACER.span("fetch"):
+            html = self._download_html()
+            data = self._parse_cached(html)
+            self.last_diff = diff_matches(self.matches or [], data)
+            self._fetched = data
+            if advance:
+                self.advance()
+            return data, self.download_time
 
-        soup = BeautifulSoup(html, "html.parser")
-        rows = soup.select("table tbody tr")
+    # ostatnio pobrane mecze stają się punktem odniesienia dla kolejnego last_diff
+    def advance(self):
+        self.matches = self._fetched
 
+    # strona się nie zmieniła - wykorzystujemy wcześniej sparsowane mecze
+    def _parse_cached(self, html):
+        with TRACER.span("parse"):
+            if self.cache_hit:
+                data = self.cache.load_parsed(self.url, self.team_name)
+                if data is not None:
+                    return data
+
+            data = self.parse_matches(html)
+            if self.cache is not None:
+                self.cache.store_parsed(self.url, self.team_name, data)
+            return data
+
+    # parsowanie tabeli z meczami z gotowego kodu HTML
+    # - wiersze o tym samym odcisku co przy poprzednim parsowaniu nie są analizowane ponownie
+    def parse_matches(self, html):
+        previous = self.row_records
+        records = {}
         data = []
-        for r in rows:
-            cols = [c.get_text(strip=True) for c in r.find_all("td")]
-            if len(cols) >= 5:
-                left_team = cols[1]
-                score = cols[2]
-                right_team = cols[3]
-                date = cols[4]
+        parsed = 0
+        for cols in ROW_PARSERS[self.parser](html):
+            key = row_fingerprint(cols)
+            if key in records:
+                match = records[key]
+            elif key in previous:
+                match = previous[key]
+            else:
+                row = self._parse_row(cols)
+                match = None if row is None else self._to_dict(*row)
+                parsed += 1
+            records[key] = match
+            if match is not None:
+                data.append(dict(match))
+
+        self.row_records = records
+        self.rows_parsed = parsed
+        return data
+
+    @staticmethod
+    def _to_dict(date, opponent, my_pts, opp_pts, location):
+        return {
+            "Data i godzina meczu": date,
+            "Przeciwnik": opponent,
+            "Punkty Basket Hills": my_pts,
+            "Punkty przeciwnika": opp_pts,
+            "Wynik meczu": "Wygrana" if my_pts > opp_pts else "Porażka",
+            "Miejsce meczu": location
+        }
+
+    # parsowanie do zwartej paczki kolumnowej (records.MatchBatch) - bez słowników dla każdego meczu
+    def parse_batch(self, html):
+        rows = list(self._match_rows(html))
+        dates, opponents, my_pts, opp_pts, locations = zip(*rows) if rows else ((),) * 5
+        codes = [Location.HOME if location == "U siebie" else Location.AWAY for location in locations]
+        return MatchBatch.from_columns(dates, opponents, my_pts, opp_pts, codes)
+
+    def fetch_batch(self):
+        with TRACER.span("fetch"):
+            html = self._download_html()
+            with TRACER.span("parse"):
+                return self.parse_batch(html), self.download_time
 
-                if ":" not in score or "-" in score or "-" in score:
-                    continue
+    # wiersze tabeli dotyczące drużyny: (data, przeciwnik, punkty, punkty przeciwnika, miejsce meczu)
+    def _match_rows(self, html):
+        for cols in ROW_PARSERS[self.parser](html):
+            row = self._parse_row(cols)
+            if row is not None:
+                yield row
 
+    # pojedynczy wiersz tabeli -> krotka meczu lub None (mecz nierozegrany / bez naszej drużyny)
+    def _parse_row(self, cols):
+        if len(cols) < 5:
+            return None
+        left_team = cols[1]
+        score = cols[2]
+        right_team = cols[3]
+        date = cols[4]
+
+        if ":" not in score or "-" in score or "-" in score:
+            return None
+
+        try:
+            left_pts, right_pts = [int(x) for x in score.split(":")]
+        except:
+            return None
+
+        if self.team_name.lower() in left_team.lower():
+            return date, right_team, left_pts, right_pts, "U siebie"
+        elif self.team_name.lower() in right_team.lower():
+            return date, left_team, right_pts, left_pts, "Na wyjeździe"
+        return None
+
+
+# sesja HTTP z pulą połączeń - pool_size połączeń utrzymywanych na host
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Klasa do równoległego pobierania danych wielu drużyn (cała liga)
+# - pula wątków + jedna sesja HTTP z pulą połączeń
+# - limit jednoczesnych zapytań do jednego hosta
+# - wyniki są kluczowane nazwą drużyny, więc nazwy muszą być unikalne
+class LeagueDataFetcher:
+    def __init__(self, teams, max_workers=16, max_per_host=6, session=None, cache=None,
+                 parser="html.parser", archive=None):
+        self.teams = list(teams)  # lista par (url, team_name)
+        names = Counter(team_name for _, team_name in self.teams)
+        duplicates = sorted(name for name, count in names.items() if count > 1)
+        if duplicates:
+            raise ValueError(f"Powtórzone nazwy drużyn: {', '.join(duplicates)}")
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.session = session if session is not None else make_session(max_per_host)
+        self.cache = cache
+        self.parser = parser
+        self.archive = archive
+        self.errors = {}
+        self.total_time = None
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    # semafor ograniczający liczbę jednoczesnych zapytań do danego hosta
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host]
+
+    def _fetch_one(self, url, team_name):
+        fetcher = MatchDataFetcher(url, team_name, session=self.session, cache=self.cache,
+                                   parser=self.parser, archive=self.archive)
+        with TRACER.span("fetch"):
+            with self._host_limit(url):
+                html = fetcher._download_html()
+            return fetcher._parse_cached(html), fetcher.download_time
+
+    # zwraca słownik {nazwa drużyny: (lista_meczy, czas_pobrania_html)}
+    # drużyny, których nie udało się pobrać, trafiają do self.errors
+    def fetch_all(self):
+        self.errors = {}
+        results = {}
+        start = time.perf_counter()
+
+        workers = max(1, min(self.max_workers, len(self.teams)))
+        fetch_one = TRACER.bind(self._fetch_one)  # spany wątków roboczych w przebiegu wywołującego
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                team_name: pool.submit(fetch_one, url, team_name)
+                for url, team_name in self.teams
+            }
+            for team_name, future in futures.items():
                 try:
-                    left_pts, right_pts = [int(x) for x in score.split(":")]
-                except:
-                    continue
-
-                if self.team_name.lower() in left_team.lower():
-                    opponent = right_team
-                    my_pts = left_pts
-                    opp_pts = right_pts
-                    location = "U siebie"
-                elif self.team_name.lower() in right_team.lower():
-                    opponent = left_team
-                    my_pts = right_pts
-                    opp_pts = left_pts
-                    location = "Na wyjeździe"
-                else:
-                    continue
-
-                data.append({
-                    "Data i godzina meczu": date,
-                    "Przeciwnik": opponent,
-                    "Punkty Basket Hills": my_pts,
-                    "Punkty przeciwnika": opp_pts,
-                    "Wynik meczu": "Wygrana" if my_pts > opp_pts else "Porażka",
-                    "Miejsce meczu": location
-                })
-
-        return data, self.download_time
\ No newline at end of file
+                    results[team_name] = future.result()
+                except Exception as e:
+                    self.errors[team_name] = e
+
+        self.total_time = time.perf_counter() - start
+        return results
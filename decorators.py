@@ -1,16 +1,156 @@
+from collections import deque
+from contextlib import contextmanager
 from functools import wraps
+import itertools
+import json
+import threading
 import time
 
-# dekorator logujący czas pobierania danych
-def log_call(func):
+
+# Pojedynczy odcinek czasu (span) - np. pobranie HTML, parsowanie, liczenie metryki, render wykresu
+class Span:
+    __slots__ = ("name", "path", "run", "start", "duration", "thread")
+
+    def __init__(self, name, path, run):
+        self.name = name
+        self.path = path  # ścieżka zagnieżdżenia, np. "fetch/download"
+        self.run = run  # numer przebiegu (np. jednego uruchomienia skryptu Streamlit)
+        self.start = time.time()
+        self.duration = None
+        self.thread = threading.current_thread().name
+
+    def to_dict(self):
+        return {
+            "run": self.run,
+            "name": self.name,
+            "path": self.path,
+            "start": self.start,
+            "duration_ms": None if self.duration is None else self.duration * 1000,
+            "thread": self.thread,
+        }
+
+
+# Zbieranie zagnieżdżonych pomiarów czasu
+# - stos otwartych spanów i numer bieżącego przebiegu są osobne dla każdego wątku (sesji Streamlit);
+#   wątki robocze przejmują przebieg wątku, który zlecił im pracę (bind)
+# - zakończone spany trafiają do ograniczonej historii, z której liczone są p50 / p95
+class Tracer:
+    def __init__(self, max_spans=20_000):
+        self.spans = deque(maxlen=max_spans)
+        self._local = threading.local()
+        self._runs = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # początek nowego przebiegu w bieżącym wątku; zwraca jego numer
+    def start_run(self):
+        self._local.run = next(self._runs)
+        self._local.stack = []
+        return self._local.run
+
+    def current_run(self):
+        return getattr(self._local, "run", None)
+
+    # func do wywołania w wątku roboczym (np. ThreadPoolExecutor) w bieżącym przebiegu
+    # - numer przebiegu jest lokalny dla wątku, więc bez tego spany wątków roboczych miałyby run=None
+    def bind(self, func):
+        run = self.current_run()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            saved = getattr(self._local, "run", None), getattr(self._local, "stack", None)
+            self._local.run, self._local.stack = run, []
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.run, self._local.stack = saved
+        return wrapper
+
+    @contextmanager
+    def span(self, name):
+        stack = self._stack()
+        path = f"{stack[-1].path}/{name}" if stack else name
+        s = Span(name, path, self.current_run())
+        stack.append(s)
+        started = time.perf_counter()
+        try:
+            yield s
+        finally:
+            s.duration = time.perf_counter() - started
+            stack.pop()
+            with self._lock:
+                self.spans.append(s)
+
+    def run_spans(self, run):
+        with self._lock:
+            return [s for s in self.spans if s.run == run]
+
+    # statystyki dla każdej ścieżki: liczba pomiarów, p50, p95, maksimum (w ms)
+    def stats(self):
+        with self._lock:
+            durations = {}
+            for s in self.spans:
+                durations.setdefault(s.path, []).append(s.duration * 1000)
+
+        rows = []
+        for path, values in sorted(durations.items()):
+            values.sort()
+            rows.append({
+                "path": path,
+                "count": len(values),
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+                "max_ms": values[-1],
+            })
+        return rows
+
+    # eksport w formacie JSON lines (jeden span na linię)
+    def to_jsonl(self, spans=None):
+        if spans is None:
+            with self._lock:
+                spans = list(self.spans)
+        return "".join(json.dumps(s.to_dict(), ensure_ascii=False) + "\n" for s in spans)
+
+    def export_jsonl(self, path, spans=None):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(self.to_jsonl(spans))
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+# percentyl metodą najbliższej rangi (wartości posortowane rosnąco)
+def _percentile(values, q):
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+TRACER = Tracer()
+
+
+# dekorator logujący czas wykonania metody jako span w TRACER
+# - przy metodach obiektów z atrybutem download_time zapisuje w nim zmierzony czas
+# - użycie: @log_call albo @log_call(name="download")
+def log_call(func=None, *, name=None):
+    if func is None:
+        return lambda f: log_call(f, name=name)
+
+    span_name = name or func.__name__
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        result = func(*args, **kwargs)
-        elapsed = time.perf_counter() - start
+        with TRACER.span(span_name) as s:
+            result = func(*args, **kwargs)
+        elapsed = s.duration
 
         if args and hasattr(args[0], "download_time"):
             args[0].download_time = elapsed
 
         return result
-    return wrapper
\ No newline at end of file
+    return wrapper
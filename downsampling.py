@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+
+
+# Largest-Triangle-Three-Buckets: wybór `budget` punktów szeregu zachowujących jego kształt
+# (pierwszy i ostatni punkt zawsze zostają, z każdego kubełka punkt o największym trójkącie)
+def lttb_indices(y, budget):
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    out = np.empty(budget, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+# kubełkowanie min/max: z każdego kubełka minimum i maksimum (zachowuje skrajne wartości)
+def minmax_indices(y, budget):
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if budget >= n or budget < 2:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, budget // 2 + 1).astype(np.int64)
+    picked = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            picked += [lo + int(np.argmin(y[lo:hi])), lo + int(np.argmax(y[lo:hi]))]
+    return np.unique(picked)
+
+
+METHODS = {"lttb": lttb_indices, "minmax": minmax_indices}
+
+
+# indeksy punktów do narysowania dla jednego lub kilku szeregów (kolumny tablicy 2D);
+# budżet jest dzielony między szeregi, wynik to posortowana suma wybranych indeksów
+def downsample_indices(values, budget, method="lttb"):
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, None]
+    n, k = values.shape
+    if budget is None or n <= budget:
+        return np.arange(n)
+
+    select = METHODS[method]
+    per_series = max(3, budget // k)
+    return np.unique(np.concatenate([select(values[:, j], per_series) for j in range(k)]))
+
+
+# pozycje etykiet osi X - co najwyżej max_ticks równomiernie rozłożonych etykiet
+def tick_positions(n, max_ticks):
+    if n == 0:
+        return np.arange(0)
+    step = max(1, math.ceil(n / max_ticks))
+    return np.arange(0, n, step)
@@ -0,0 +1,66 @@
+import random
+from datetime import datetime, timedelta
+
+from data_fetcher import MatchDataFetcher
+
+# Syntetyczne dane meczowe wspólne dla testów jednostkowych i benchmarków
+TEAM_NAME = "Basket Hills Bielsko-Biała"
+OPPONENTS = [
+    "AZS AGH Kraków", "MKS Dąbrowa Górnicza II", "KS Kosz Pleszew", "Sokół Łańcut II",
+    "Wisła Kraków", "GKS Tychy II", "Znicz Basket Pruszków", "Polonia Bytom",
+]
+
+
+# daty kolejnych meczów - co 3 dni; przy bardzo dużych n co 2 godziny od 1900 r.,
+# żeby nie wyjść poza zakres dat obsługiwany przez pandas (rok 2262)
+def _match_dates(n):
+    if n <= 20_000:
+        start, step = datetime(2015, 10, 1, 18, 0), timedelta(days=3)
+    else:
+        start, step = datetime(1900, 1, 1, 18, 0), timedelta(hours=2)
+    return (start + step * i for i in range(n))
+
+
+# Generator syntetycznych stron z terminarzem w układzie PZKosz
+# - mecze rozegrane (u siebie / na wyjeździe), nierozegrane ("-:-") oraz mecze innych drużyn
+def make_schedule_html(n, seed=0):
+    rnd = random.Random(seed)
+    rows = []
+    for i, when in enumerate(_match_dates(n)):
+        opponent = rnd.choice(OPPONENTS)
+        home, away = (TEAM_NAME, opponent) if rnd.random() < 0.5 else (opponent, TEAM_NAME)
+        if rnd.random() < 0.05:
+            home = rnd.choice(OPPONENTS)
+        score = "-:-" if rnd.random() < 0.05 else f"{rnd.randint(50, 110)}:{rnd.randint(50, 110)}"
+        date = when.strftime("%d.%m.%Y %H:%M")
+        rows.append(
+            f"<tr><td>{i + 1}</td><td><a href=\"#\">{home}</a></td><td>{score}</td>"
+            f"<td><a href=\"#\">{away}</a></td><td>{date}</td></tr>"
+        )
+    return (
+        "<html><head><meta charset=\"utf-8\"><title>Terminarz</title></head><body>"
+        "<table><thead><tr><th>Lp.</th><th>Gospodarz</th><th>Wynik</th><th>Gość</th><th>Data</th></tr></thead>"
+        "<tbody>" + "\n".join(rows) + "</tbody></table></body></html>"
+    )
+
+
+# Generator listy meczów w formacie zwracanym przez MatchDataFetcher.fetch_matches
+def make_matches(n, seed=0):
+    rnd = random.Random(seed)
+    matches = []
+    for when in _match_dates(n):
+        my_pts, opp_pts = rnd.randint(50, 110), rnd.randint(50, 110)
+        matches.append({
+            "Data i godzina meczu": when.strftime("%d.%m.%Y %H:%M"),
+            "Przeciwnik": rnd.choice(OPPONENTS),
+            "Punkty Basket Hills": my_pts,
+            "Punkty przeciwnika": opp_pts,
+            "Wynik meczu": "Wygrana" if my_pts > opp_pts else "Porażka",
+            "Miejsce meczu": "U siebie" if rnd.random() < 0.5 else "Na wyjeździe",
+        })
+    return matches
+
+
+# mecze drużyny sparsowane ze strony make_schedule_html(n, seed)
+def parse_schedule(n, seed=0, team_name=TEAM_NAME, **kwargs):
+    return MatchDataFetcher("http://example.com", team_name, **kwargs).parse_matches(make_schedule_html(n, seed=seed))
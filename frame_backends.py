@@ -0,0 +1,255 @@
+import importlib
+import importlib.util
+
+import numpy as np
+import pandas as pd
+from kernels import DATE, OPPONENT, SCORED, CONCEDED, RESULT, LOCATION
+from records import MatchBatch
+
+# Alternatywne silniki DataFrame dla BasketAnalysis (argument backend=...)
+# - "pandas" - domyślna ścieżka BasketAnalysis (statyczne metody pandas)
+# - "polars" - Polars LazyFrame, wszystkie zapytania wykonywane razem i wielowątkowo (pl.collect_all)
+# - "arrow"  - pyarrow.compute na tabeli Arrow
+# Biblioteki są opcjonalne - importowane dopiero przy wyborze silnika.
+# Silnik liczy agregaty natywnie, a wyniki są zamieniane na te same kształty pandas co w BasketAnalysis.
+BACKENDS = {
+    "polars": "PolarsBackend",
+    "arrow": "ArrowBackend",
+}
+DATE_FORMATS = ("%d.%m.%Y %H:%M", "%d.%m.%Y")
+DIFF = "Różnica punktów"
+ROW = "_row"  # numer wiersza po sortowaniu - kolejność pierwszego wystąpienia i remisy jak w pandas
+
+
+def get_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Nieznany silnik danych: {name} (dostępne: pandas, {', '.join(BACKENDS)})")
+    return globals()[BACKENDS[name]]()
+
+
+def available(name):
+    module = {"polars": "polars", "arrow": "pyarrow"}[name]
+    return importlib.util.find_spec(module) is not None
+
+
+def _require(module, name):
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"Silnik '{name}' wymaga biblioteki {module} (pip install {module})") from e
+
+
+# średnia jako dokładna suma całkowita / liczność - bit w bit jak Series.mean() w pandas
+def _mean(total, count):
+    return total / count if count else None
+
+
+# Zamiana agregatów policzonych przez silnik na wyniki w kształtach BasketAnalysis / kernels.compute_all
+# - agg["results"]: [(wynik, liczność, pierwszy_wiersz)], agg["pairs"]: [(miejsce, wynik, liczność, pierwszy_wiersz)]
+# - agg["location_means"]: {miejsce: średnia}, agg["streaks"]: {wynik: najdłuższa seria}
+def shape_results(agg, df):
+    results = sorted(agg["results"], key=lambda r: (-r[1], r[2]))
+    wins_losses = pd.Series(
+        np.array([r[1] for r in results], dtype=np.int64),
+        index=pd.Index([r[0] for r in results], name=RESULT),
+        name="count",
+    )
+
+    pairs = sorted(agg["pairs"], key=lambda p: (p[0], -p[2], p[3]))
+    home_away = pd.Series(
+        np.array([p[2] for p in pairs], dtype=np.int64),
+        index=pd.MultiIndex.from_arrays([[p[0] for p in pairs], [p[1] for p in pairs]], names=[LOCATION, RESULT]),
+        name="count",
+    )
+
+    locations = sorted(agg["location_means"])
+    avg_home_away = pd.Series(
+        [agg["location_means"][loc] for loc in locations], index=pd.Index(locations, name=LOCATION),
+        name=SCORED, dtype="float64",
+    )
+
+    labels = sorted({p[1] for p in pairs})
+    counts = {(p[0], p[1]): p[2] for p in pairs}
+    win_loss_home_away = pd.DataFrame(
+        np.array([[counts.get((loc, res), 0) for res in labels] for loc in locations], dtype=np.int64)
+        .reshape(len(locations), len(labels)),
+        index=pd.Index(locations, name=LOCATION),
+        columns=pd.Index(labels, name=RESULT),
+    )
+
+    point_diff = pd.DataFrame({DATE: df[DATE], DIFF: agg["diff"]}, index=df.index)
+    cols = [DATE, OPPONENT, SCORED]
+    longest = (agg["streaks"].get("Wygrana", np.nan), agg["streaks"].get("Porażka", np.nan))
+
+    def rounded(value):  # round() na np.float64 - zaokrąglanie NumPy, jak w ścieżce pandas
+        return round(np.float64(value), 2) if value is not None else np.nan
+
+    return {
+        "wins_losses": wins_losses,
+        "avg_scored": rounded(agg["avg_scored"]),
+        "avg_conceded": rounded(agg["avg_conceded"]),
+        "home_away": home_away,
+        "avg_home_away": avg_home_away,
+        "win_loss_home_away": win_loss_home_away,
+        "point_diff": point_diff,
+        "top_games": df.iloc[agg["top"]][cols],
+        "bottom_games": df.iloc[agg["bottom"]][cols],
+        "streaks": longest,
+        "longest_win_streak": longest[0],
+        "longest_loss_streak": longest[1],
+        "df": df,
+    }
+
+
+# Silnik Polars - przygotowanie danych i metryki jako plany LazyFrame
+class PolarsBackend:
+    name = "polars"
+
+    def __init__(self):
+        self.pl = _require("polars", self.name)
+
+    # konwersja typów, odrzucenie niepełnych wierszy i sortowanie chronologiczne (jak BasketAnalysis.__init__)
+    def prepare(self, matches):
+        pl = self.pl
+        if isinstance(matches, MatchBatch):
+            frame = pl.from_pandas(matches.to_frame().astype({OPPONENT: str, RESULT: str, LOCATION: str}))
+        else:
+            frame = pl.DataFrame(matches, infer_schema_length=None)
+        if frame.is_empty():
+            frame = pl.DataFrame(schema={DATE: pl.Utf8, OPPONENT: pl.Utf8, SCORED: pl.Int64, CONCEDED: pl.Int64,
+                                         RESULT: pl.Utf8, LOCATION: pl.Utf8})
+
+        date = pl.col(DATE)
+        if frame.schema[DATE] == pl.Utf8:
+            date = pl.coalesce([date.str.strptime(pl.Datetime("ns"), fmt, strict=False) for fmt in DATE_FORMATS])
+        else:
+            date = date.cast(pl.Datetime("ns"))
+
+        return (
+            frame.lazy()
+            .with_columns(
+                date.alias(DATE),
+                pl.col(SCORED).cast(pl.Int64, strict=False),
+                pl.col(CONCEDED).cast(pl.Int64, strict=False),
+            )
+            .drop_nulls([DATE, SCORED, CONCEDED])
+            .sort(DATE, maintain_order=True)
+            .with_row_index(ROW)
+            .collect()
+        )
+
+    def to_pandas(self, frame):
+        return frame.drop(ROW).to_pandas()
+
+    # wszystkie zapytania w jednym wywołaniu collect_all - Polars wykonuje je równolegle
+    def metrics(self, frame, n=5):
+        pl = self.pl
+        lf = frame.lazy()
+        queries = [
+            lf.group_by(RESULT).agg(pl.len().alias("count"), pl.col(ROW).min().alias("first")),
+            lf.group_by([LOCATION, RESULT]).agg(pl.len().alias("count"), pl.col(ROW).min().alias("first")),
+            lf.group_by(LOCATION).agg(pl.col(SCORED).sum() / pl.len()),
+            lf.select((pl.col(SCORED).sum() / pl.len()).alias("scored"),
+                      (pl.col(CONCEDED).sum() / pl.len()).alias("conceded")),
+            lf.select((pl.col(SCORED) - pl.col(CONCEDED)).alias(DIFF)),
+            lf.sort([SCORED, ROW], descending=[True, False]).head(n).select(ROW),
+            lf.sort([SCORED, ROW]).head(n).select(ROW),
+            lf.group_by(pl.col(RESULT).rle_id().alias("run"))
+              .agg(pl.col(RESULT).first(), pl.len().alias("length"))
+              .group_by(RESULT).agg(pl.col("length").max()),
+        ]
+        results, pairs, means, averages, diff, top, bottom, streaks = pl.collect_all(queries)
+
+        agg = {
+            "results": results.select(RESULT, "count", "first").rows(),
+            "pairs": pairs.select(LOCATION, RESULT, "count", "first").rows(),
+            "location_means": dict(means.select(LOCATION, SCORED).rows()),
+            "avg_scored": averages["scored"][0],
+            "avg_conceded": averages["conceded"][0],
+            "diff": diff[DIFF].to_numpy(),
+            "top": top[ROW].to_numpy(),
+            "bottom": bottom[ROW].to_numpy(),
+            "streaks": dict(streaks.select(RESULT, "length").rows()),
+        }
+        return shape_results(agg, self.to_pandas(frame))
+
+
+# Silnik pyarrow.compute - tabela Arrow i agregacje Table.group_by
+class ArrowBackend:
+    name = "arrow"
+
+    def __init__(self):
+        self.pa = _require("pyarrow", self.name)
+        self.pc = importlib.import_module("pyarrow.compute")
+
+    def _to_int(self, column):
+        pa, pc = self.pa, self.pc
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = pc.if_else(pc.match_substring_regex(column, r"^\s*-?\d+\s*$"), pc.utf8_trim_whitespace(column),
+                                pa.scalar(None, column.type))
+        return pc.cast(column, pa.int64(), safe=False)
+
+    def _to_timestamp(self, column):
+        pa, pc = self.pa, self.pc
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            parsed = [pc.strptime(column, format=fmt, unit="ns", error_is_null=True) for fmt in DATE_FORMATS]
+            return pc.coalesce(*parsed)
+        return pc.cast(column, pa.timestamp("ns"))
+
+    def prepare(self, matches):
+        pa, pc = self.pa, self.pc
+        if isinstance(matches, MatchBatch):
+            table = pa.Table.from_pandas(matches.to_frame().astype({OPPONENT: str, RESULT: str, LOCATION: str}),
+                                         preserve_index=False)
+        elif matches:
+            table = pa.Table.from_pylist(matches)
+        else:
+            table = pa.table({DATE: pa.array([], pa.string()), OPPONENT: pa.array([], pa.string()),
+                              SCORED: pa.array([], pa.int64()), CONCEDED: pa.array([], pa.int64()),
+                              RESULT: pa.array([], pa.string()), LOCATION: pa.array([], pa.string())})
+
+        table = table.set_column(table.schema.get_field_index(DATE), DATE, self._to_timestamp(table[DATE]))
+        for col in (SCORED, CONCEDED):
+            table = table.set_column(table.schema.get_field_index(col), col, self._to_int(table[col]))
+
+        valid = pc.and_(pc.is_valid(table[DATE]), pc.and_(pc.is_valid(table[SCORED]), pc.is_valid(table[CONCEDED])))
+        table = table.filter(valid).sort_by(DATE)
+        return table.append_column(ROW, pa.array(np.arange(table.num_rows, dtype=np.int64)))
+
+    def to_pandas(self, table):
+        return table.drop_columns([ROW]).to_pandas()
+
+    def metrics(self, table, n=5):
+        pc = self.pc
+        results = table.group_by(RESULT).aggregate([(ROW, "count"), (ROW, "min")])
+        pairs = table.group_by([LOCATION, RESULT]).aggregate([(ROW, "count"), (ROW, "min")])
+        means = table.group_by(LOCATION).aggregate([(SCORED, "sum"), (SCORED, "count")])
+
+        def rows(t, *cols):
+            return list(zip(*(t[c].to_pylist() for c in cols)))
+
+        top = pc.sort_indices(table, sort_keys=[(SCORED, "descending"), (ROW, "ascending")])[:n]
+        bottom = pc.sort_indices(table, sort_keys=[(SCORED, "ascending"), (ROW, "ascending")])[:n]
+
+        # serie: długości ciągów tego samego wyniku (RLE na kodach)
+        streaks = {}
+        if table.num_rows:
+            values = table[RESULT].to_numpy(zero_copy_only=False)
+            starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+            lengths = np.diff(np.append(starts, len(values)))
+            for label, length in zip(values[starts], lengths):
+                streaks[label] = max(streaks.get(label, 0), int(length))
+
+        agg = {
+            "results": rows(results, RESULT, f"{ROW}_count", f"{ROW}_min"),
+            "pairs": rows(pairs, LOCATION, RESULT, f"{ROW}_count", f"{ROW}_min"),
+            "location_means": {loc: total / count for loc, total, count
+                               in rows(means, LOCATION, f"{SCORED}_sum", f"{SCORED}_count")},
+            "avg_scored": _mean(pc.sum(table[SCORED]).as_py(), table.num_rows),
+            "avg_conceded": _mean(pc.sum(table[CONCEDED]).as_py(), table.num_rows),
+            "diff": pc.subtract(table[SCORED], table[CONCEDED]).to_numpy(),
+            "top": top.to_numpy(),
+            "bottom": bottom.to_numpy(),
+            "streaks": streaks,
+        }
+        return shape_results(agg, self.to_pandas(table))
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+
+
+# Dyskowy cache odpowiedzi HTTP
+# - dla każdego adresu URL przechowuje treść strony oraz nagłówki ETag / Last-Modified
+# - pozwala wysyłać zapytania warunkowe (If-None-Match / If-Modified-Since)
+# - przechowuje też sparsowane mecze, żeby przy niezmienionej stronie pominąć parsowanie
+class ResponseCache:
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def content_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, url, suffix):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def _read_json(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # zapis przez plik tymczasowy - inne procesy nigdy nie widzą połowy pliku
+    def _write(self, path, text):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def _meta(self, url):
+        return self._read_json(self._path(url, ".json"))
+
+    # nagłówki zapytania warunkowego dla zapisanej wcześniej odpowiedzi
+    def conditional_headers(self, url):
+        meta = self._meta(url)
+        if meta is None or not os.path.exists(self._path(url, ".html")):
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load_body(self, url):
+        try:
+            with open(self._path(url, ".html"), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # odpowiedź 304 - strona się nie zmieniła, zwracamy treść z dysku
+    # - brak treści (None) nie jest tu liczony jako chybienie: pobierający pobiera stronę ponownie,
+    #   a wynik tego samego zapytania liczy store()
+    def not_modified(self, url):
+        body = self.load_body(url)
+        if body is not None:
+            self._count(True)
+        return body
+
+    # zapis nowej odpowiedzi; zwraca True, jeśli treść jest identyczna z zapisaną (hash)
+    def store(self, url, text, headers):
+        digest = self.content_hash(text)
+        meta = self._meta(url) or {}
+        unchanged = meta.get("sha256") == digest and os.path.exists(self._path(url, ".html"))
+
+        if not unchanged:
+            self._write(self._path(url, ".html"), text)
+        meta.update({
+            "url": url,
+            "sha256": digest,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        })
+        self._write(self._path(url, ".json"), json.dumps(meta))
+
+        self._count(unchanged)
+        return unchanged
+
+    # sparsowane mecze są ważne tylko dla tej samej treści strony (ten sam hash)
+    def load_parsed(self, url, team_name):
+        meta = self._meta(url)
+        parsed = self._read_json(self._path(url, f".{self.content_hash(team_name)[:16]}.parsed.json"))
+        if meta is None or parsed is None or parsed.get("sha256") != meta.get("sha256"):
+            return None
+        return parsed["matches"]
+
+    def store_parsed(self, url, team_name, matches):
+        meta = self._meta(url)
+        if meta is None:
+            return
+        path = self._path(url, f".{self.content_hash(team_name)[:16]}.parsed.json")
+        self._write(path, json.dumps({"sha256": meta["sha256"], "matches": matches}, ensure_ascii=False))
@@ -0,0 +1,185 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+
+import pandas as pd
+from analysis import BasketAnalysis
+from models import BasketballTeam
+
+
+# Przyrostowa analiza wyników drużyny
+# - append(matches) dopisuje nowe mecze i aktualizuje liczniki w czasie O(liczba nowych meczów)
+# - utrzymywane są: bilans, sumy punktów (średnie), podział dom/wyjazd, bieżąca i najdłuższe serie
+#   oraz kopce z najlepszymi i najsłabszymi meczami
+# - rebuild() / verify() budują pełną analizę (BasketAnalysis) jako kontrolę spójności
+class IncrementalAnalysis:
+    def __init__(self, team_name, matches=None, n=5):
+        self.team_name = team_name
+        self.n = n
+        self.rows = []  # znormalizowane mecze w kolejności chronologicznej
+        self._reset()
+        if matches:
+            self.append(matches)
+
+    def _reset(self):
+        self.wins_losses = Counter()
+        self.count = 0
+        self.sum_scored = 0
+        self.sum_conceded = 0
+        self.home_away = Counter()  # (miejsce meczu, wynik meczu) -> liczba meczów
+        self._home_away_sum = defaultdict(int)
+        self._home_away_count = Counter()
+        self.current_streak = (None, 0)  # (wynik meczu, długość bieżącej serii)
+        self.longest = {"Wygrana": 0, "Porażka": 0}
+        self._top = []  # kopiec (punkty, -nr meczu) - n najlepszych meczów
+        self._bottom = []  # kopiec (-punkty, -nr meczu) - n najsłabszych meczów
+
+    # walidacja jak w BasketAnalysis: poprawna data i punkty, w przeciwnym razie mecz jest pomijany
+    @staticmethod
+    def _normalize(matches):
+        df = pd.DataFrame(matches)
+        dates = pd.to_datetime(df["Data i godzina meczu"], format="mixed", dayfirst=True, errors="coerce")
+        scored = pd.to_numeric(df["Punkty Basket Hills"], errors="coerce")
+        conceded = pd.to_numeric(df["Punkty przeciwnika"], errors="coerce")
+
+        rows = []
+        for m, date, pts, opp_pts in zip(matches, dates, scored, conceded):
+            if pd.isna(date) or pd.isna(pts) or pd.isna(opp_pts):
+                continue
+            rows.append(dict(m, **{
+                "Data i godzina meczu": date.to_pydatetime(),
+                "Punkty Basket Hills": pts,
+                "Punkty przeciwnika": opp_pts,
+            }))
+        return rows
+
+    def _add(self, idx, row):
+        result = row["Wynik meczu"]
+        location = row["Miejsce meczu"]
+        pts = row["Punkty Basket Hills"]
+
+        self.count += 1
+        self.wins_losses[result] += 1
+        self.sum_scored += pts
+        self.sum_conceded += row["Punkty przeciwnika"]
+        self.home_away[(location, result)] += 1
+        self._home_away_sum[location] += pts
+        self._home_away_count[location] += 1
+
+        last, length = self.current_streak
+        length = length + 1 if result == last else 1
+        self.current_streak = (result, length)
+        if result in self.longest:
+            self.longest[result] = max(self.longest[result], length)
+
+        # przy równej liczbie punktów wygrywa wcześniejszy mecz (jak nlargest/nsmallest z keep="first")
+        for heap, key in ((self._top, (pts, -idx)), (self._bottom, (-pts, -idx))):
+            if len(heap) < self.n:
+                heapq.heappush(heap, key)
+            elif key > heap[0]:
+                heapq.heapreplace(heap, key)
+
+    # dopisanie nowych meczów; zwraca liczbę zaakceptowanych rekordów
+    def append(self, matches):
+        new_rows = self._normalize(matches) if matches else []
+        if not new_rows:
+            return 0
+
+        last_date = self.rows[-1]["Data i godzina meczu"] if self.rows else None
+        new_rows.sort(key=lambda r: r["Data i godzina meczu"])
+        in_order = last_date is None or new_rows[0]["Data i godzina meczu"] >= last_date
+
+        if in_order:
+            for row in new_rows:
+                self.rows.append(row)
+                self._add(len(self.rows) - 1, row)
+        else:
+            # mecz sprzed ostatniego zapisanego - serie wymagają ponownego przeliczenia
+            self.rows = sorted(self.rows + new_rows, key=lambda r: r["Data i godzina meczu"])
+            self._reset()
+            for idx, row in enumerate(self.rows):
+                self._add(idx, row)
+        return len(new_rows)
+
+    # zastosowanie różnicy między pobraniami (data_fetcher.MatchDiff)
+    # - same nowe mecze: dopisanie przyrostowe; zmienione lub usunięte: przeliczenie liczników od zera
+    def apply_diff(self, diff):
+        if not diff.changed and not diff.removed:
+            return self.append(diff.added)
+
+        stale = diff.removed + [old for old, _ in diff.changed]
+        stale_keys = {(r["Data i godzina meczu"], r["Przeciwnik"]) for r in self._normalize(stale)}
+        new_rows = self._normalize(diff.upserts) if diff.upserts else []
+        kept = [r for r in self.rows if (r["Data i godzina meczu"], r["Przeciwnik"]) not in stale_keys]
+        self.rows = sorted(kept + new_rows, key=lambda r: r["Data i godzina meczu"])
+        self._reset()
+        for idx, row in enumerate(self.rows):
+            self._add(idx, row)
+        return len(new_rows)
+
+    @property
+    def avg_scored(self):
+        return round(self.sum_scored / self.count, 2) if self.count else math.nan
+
+    @property
+    def avg_conceded(self):
+        return round(self.sum_conceded / self.count, 2) if self.count else math.nan
+
+    @property
+    def avg_home_away(self):
+        return {loc: self._home_away_sum[loc] / cnt for loc, cnt in self._home_away_count.items()}
+
+    @property
+    def top_games(self):
+        return [self.rows[-neg_idx] for _, neg_idx in sorted(self._top, reverse=True)]
+
+    @property
+    def bottom_games(self):
+        return [self.rows[-neg_idx] for _, neg_idx in sorted(self._bottom, reverse=True)]
+
+    def summary(self):
+        return {
+            "wins_losses": dict(self.wins_losses),
+            "avg_scored": self.avg_scored,
+            "avg_conceded": self.avg_conceded,
+            "home_away": dict(self.home_away),
+            "avg_home_away": self.avg_home_away,
+            "current_streak": self.current_streak,
+            "streaks": (self.longest["Wygrana"], self.longest["Porażka"]),
+            "top_games": [(g["Przeciwnik"], g["Punkty Basket Hills"]) for g in self.top_games],
+            "bottom_games": [(g["Przeciwnik"], g["Punkty Basket Hills"]) for g in self.bottom_games],
+        }
+
+    # pełne przeliczenie od zera
+    def rebuild(self):
+        return BasketAnalysis(BasketballTeam(self.team_name, list(self.rows)))
+
+    # porównanie liczników przyrostowych z pełnym przeliczeniem; zwraca listę niezgodnych metryk
+    def verify(self):
+        results = self.rebuild().run()
+        streaks = tuple(0 if pd.isna(s) else int(s) for s in results["streaks"])
+        expected = {
+            "wins_losses": dict(results["wins_losses"]),
+            "avg_scored": results["avg_scored"],
+            "avg_conceded": results["avg_conceded"],
+            "home_away": dict(results["home_away"]),
+            "avg_home_away": dict(results["avg_home_away"]),
+            "streaks": streaks,
+            "top_games": list(zip(results["top_games"]["Przeciwnik"], results["top_games"]["Punkty Basket Hills"])),
+            "bottom_games": list(zip(results["bottom_games"]["Przeciwnik"], results["bottom_games"]["Punkty Basket Hills"])),
+        }
+        actual = self.summary()
+
+        mismatched = []
+        for key, value in expected.items():
+            if key in ("avg_scored", "avg_conceded"):
+                same = math.isclose(actual[key], value) if self.count else True
+            elif key == "avg_home_away":
+                same = actual[key].keys() == value.keys() and all(
+                    math.isclose(actual[key][k], value[k]) for k in value
+                )
+            else:
+                same = actual[key] == value
+            if not same:
+                mismatched.append(key)
+        return mismatched
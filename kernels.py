@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+DATE = "Data i godzina meczu"
+OPPONENT = "Przeciwnik"
+SCORED = "Punkty Basket Hills"
+CONCEDED = "Punkty przeciwnika"
+RESULT = "Wynik meczu"
+LOCATION = "Miejsce meczu"
+COLUMNS = (DATE, OPPONENT, SCORED, CONCEDED, RESULT, LOCATION)
+
+
+# kolumny kategoryczne wycinka wyników (najlepsze / najsłabsze mecze) zamienione na tekst, jak w schemacie
+# "default" - kategoria zachowałaby wszystkich przeciwników, np. na osi X wykresu Seaborn
+def plain_columns(frame):
+    categorical = [col for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)]
+    return frame.astype({col: str for col in categorical}) if categorical else frame
+
+
+# kody kategorii w kolejności pierwszego wystąpienia (jak value_counts przy remisach)
+def _factorize(series):
+    codes, uniques = pd.factorize(series.to_numpy())
+    return codes, uniques
+
+
+# indeks pierwszego wystąpienia każdego klucza (klucze spoza danych -> len(keys))
+def _first_seen(keys, size):
+    first = np.full(size, len(keys), dtype=np.int64)
+    np.minimum.at(first, keys, np.arange(len(keys)))
+    return first
+
+
+# Najdłuższe serie wygranych i porażek - kodowanie długości serii (RLE)
+def streaks(results):
+    codes = (results == "Wygrana").astype(np.int8) - (results == "Porażka").astype(np.int8)
+    if len(codes) == 0:
+        return np.nan, np.nan
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+    lengths = np.diff(np.append(starts, len(codes)))
+    run_codes = codes[starts]
+
+    wins = lengths[run_codes == 1]
+    losses = lengths[run_codes == -1]
+    return (wins.max() if len(wins) else np.nan), (losses.max() if len(losses) else np.nan)
+
+
+# Jednoprzebiegowe, wektorowe liczenie wszystkich metryk BasketAnalysis na tablicach NumPy
+# - wyniki mają te same kształty, indeksy i typy co statyczne metody BasketAnalysis
+def compute_all(df, n=5):
+    scored = df[SCORED].to_numpy()
+    conceded = df[CONCEDED].to_numpy()
+    res_codes, res_uniques = _factorize(df[RESULT])
+    loc_codes, loc_uniques = _factorize(df[LOCATION])
+    n_res, n_loc = len(res_uniques), len(loc_uniques)
+
+    # bilans: liczność malejąco, remisy w kolejności pierwszego wystąpienia
+    res_counts = np.bincount(res_codes, minlength=n_res)
+    order = np.argsort(-res_counts, kind="stable")
+    wins_losses = pd.Series(
+        res_counts[order], index=pd.Index(res_uniques[order], name=RESULT), name="count"
+    )
+
+    # podział dom/wyjazd: wspólny kod (miejsce, wynik) i zliczenia przez bincount
+    loc_rank = np.empty(n_loc, dtype=np.int64)
+    loc_order = np.argsort(np.asarray(loc_uniques, dtype=object), kind="stable")
+    loc_rank[loc_order] = np.arange(n_loc)
+
+    pair = loc_codes * n_res + res_codes
+    pair_counts = np.bincount(pair, minlength=n_loc * n_res)
+    pair_first = _first_seen(pair, n_loc * n_res)
+    present = np.flatnonzero(pair_counts)
+    present = present[np.lexsort((pair_first[present], -pair_counts[present], loc_rank[present // n_res]))]
+    home_away = pd.Series(
+        pair_counts[present],
+        index=pd.MultiIndex.from_arrays(
+            [loc_uniques[present // n_res], res_uniques[present % n_res]], names=[LOCATION, RESULT]
+        ),
+        name="count",
+    )
+
+    loc_counts = np.bincount(loc_codes, minlength=n_loc)
+    loc_sums = np.bincount(loc_codes, weights=scored, minlength=n_loc)
+    avg_home_away = pd.Series(
+        (loc_sums / loc_counts)[loc_order],
+        index=pd.Index(loc_uniques[loc_order], name=LOCATION),
+        name=SCORED,
+    )
+
+    res_order = np.argsort(np.asarray(res_uniques, dtype=object), kind="stable")
+    table = pair_counts.reshape(n_loc, n_res)[np.ix_(loc_order, res_order)]
+    win_loss_home_away = pd.DataFrame(
+        table,
+        index=pd.Index(loc_uniques[loc_order], name=LOCATION),
+        columns=pd.Index(res_uniques[res_order], name=RESULT),
+    )
+
+    diff = scored - conceded
+    point_diff = pd.DataFrame({DATE: df[DATE], "Różnica punktów": diff}, index=df.index)
+
+    # najlepsze / najsłabsze mecze - stabilne sortowanie = keep="first" z nlargest/nsmallest
+    cols = [DATE, OPPONENT, SCORED]
+    top = plain_columns(df.iloc[np.argsort(-scored, kind="stable")[:n]][cols])
+    bottom = plain_columns(df.iloc[np.argsort(scored, kind="stable")[:n]][cols])
+
+    longest = streaks(df[RESULT].to_numpy())
+
+    return {
+        "wins_losses": wins_losses,
+        "avg_scored": round(scored.mean(), 2) if len(scored) else np.nan,
+        "avg_conceded": round(conceded.mean(), 2) if len(conceded) else np.nan,
+        "home_away": home_away,
+        "avg_home_away": avg_home_away,
+        "win_loss_home_away": win_loss_home_away,
+        "point_diff": point_diff,
+        "top_games": top,
+        "bottom_games": bottom,
+        "streaks": longest,
+        "longest_win_streak": longest[0],
+        "longest_loss_streak": longest[1],
+        "df": df,
+    }
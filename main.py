@@ -1,11 +1,277 @@
+import argparse
+import json
+import os
+import re
 import subprocess
 import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 
-def main():
+DEFAULT_TEAMS = {
+    "Basket Hills Bielsko-Biała":
+        "https://rozgrywki.pzkosz.pl/liga/4/druzyny/d/4119/basket-hills-bielsko-biala/terminarz.html",
+}
+PLOT_KINDS = {
+    "PointsPlot": "Punkty drużyny i przeciwników w kolejnych meczach",
+    "PointDiffPlot": "Różnica punktów w sezonie",
+    "AvgHomeAwayPlot": "Średnia punktów: dom vs wyjazd",
+    "TopBottomPlot": "Najwyższe i najniższe zdobycze punktowe",
+}
+
+# kody wyjścia trybu raportu (do harmonogramów cron / CI)
+EXIT_OK = 0
+EXIT_PARTIAL = 1  # część drużyn lub wykresów się nie udała
+EXIT_FAILED = 2   # nie powstał żaden raport
+
+
+def run_app():
     try:
         subprocess.run([sys.executable, "-m", "streamlit", "run", "app.py"], check=False)
     except KeyboardInterrupt:
         pass
 
+
+# nazwa drużyny -> nazwa katalogu (bez polskich znaków i spacji)
+def slugify(name):
+    ascii_name = unicodedata.normalize("NFKD", name.replace("ł", "l").replace("Ł", "L"))
+    ascii_name = ascii_name.encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", ascii_name.lower()).strip("-") or "team"
+
+
+# nazwy drużyn -> unikalne nazwy katalogów; nazwy różniące się tylko znakami diakrytycznymi
+# lub interpunkcją dostają przyrostek -2, -3, ... (inaczej raport jednej nadpisałby drugą)
+def unique_slugs(names):
+    slugs = {}
+    used = set()
+    for name in names:
+        base = slug = slugify(name)
+        suffix = 1
+        while slug in used:
+            suffix += 1
+            slug = f"{base}-{suffix}"
+        used.add(slug)
+        slugs[name] = slug
+    return slugs
+
+
+# "Nazwa=URL" -> (nazwa, url)
+def parse_team(value):
+    name, sep, url = value.partition("=")
+    if not sep or not name.strip() or not url.strip():
+        raise argparse.ArgumentTypeError(f"oczekiwano NAZWA=URL, otrzymano: {value}")
+    return name.strip(), url.strip()
+
+
+# dodatnia liczba (np. limit zapytań na sekundę)
+def positive_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"oczekiwano liczby, otrzymano: {value}") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"wartość musi być dodatnia, otrzymano: {value}")
+    return number
+
+
+# Pobranie historii wielu sezonów do bazy meczów (z wznowieniem po przerwaniu)
+# - leagues: lista par (sezon, adres strony ligi)
+def run_backfill(leagues, db_path, max_workers=4, rate=2.0, cache_dir=None, log=print):
+    from crawler import BackfillCrawler
+    from http_cache import ResponseCache
+
+    seasons = {}
+    for season, url in leagues:
+        seasons.setdefault(season, []).append(url)
+    crawler = BackfillCrawler(db_path, seasons, max_workers=max_workers, rate=rate,
+                              cache=ResponseCache(cache_dir) if cache_dir else None)
+    try:
+        counts = crawler.run()
+    except KeyboardInterrupt:
+        crawler.stop()
+        counts = crawler.checkpoint.counts()
+    log(", ".join(f"{status}: {n}" for status, n in sorted(counts.items())))
+    if counts.get("failed") or counts.get("pending"):
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+# wartość metryki w postaci zgodnej z JSON
+def to_json(value):
+    if hasattr(value, "to_json"):
+        if getattr(value.index, "nlevels", 1) > 1:
+            value = value.copy()
+            value.index = [" / ".join(map(str, key)) for key in value.index]
+        orient = None
+        if value.ndim == 2:  # tabela meczów -> lista rekordów, tabela przestawna -> słownik wierszy
+            orient = "records" if value.index.name is None else "index"
+        return json.loads(value.to_json(orient=orient, date_format="iso", force_ascii=False))
+    if hasattr(value, "item"):
+        value = value.item()
+    return None if value != value else value  # NaN -> null
+
+
+# zadanie dla procesu roboczego: render jednego wykresu do pliku
+def render_job(job):
+    from plots import load_backend
+
+    library, kind, title, data, path = job
+    start = time.perf_counter()
+    plot = getattr(load_backend(library), f"{kind}{library}")(title, cache=None)
+    written = plot.save(data, path)
+    return written, time.perf_counter() - start
+
+
+# Raport bez serwera: pobranie -> analiza -> wykresy, dla jednej lub wielu drużyn
+# - drużyny pobierane równolegle (LeagueDataFetcher), wykresy renderowane w puli procesów
+# - wyniki: <katalog>/<drużyna>/metrics.json, wykresy PNG (Matplotlib/Seaborn) lub HTML (Plotly),
+#   oraz <katalog>/summary.json z czasami etapów i błędami
+# - teams: słownik {nazwa drużyny: adres terminarza}
+# - archive: opcjonalne archive.HtmlArchive (nagranie stron albo odtworzenie bez sieci)
+def run_report(teams, output_dir, libraries=("Matplotlib",), max_workers=None, cache_dir=None, log=print,
+               archive=None):
+    from analysis import BasketAnalysis
+    from data_fetcher import LeagueDataFetcher
+    from http_cache import ResponseCache
+    from models import BasketballTeam
+
+    timings = {}
+    errors = {}
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    fetcher = LeagueDataFetcher([(url, name) for name, url in teams.items()], cache=cache, parser="lxml-iter",
+                                archive=archive)
+    fetched = fetcher.fetch_all()
+    timings["fetch"] = time.perf_counter() - start
+    errors.update({team: f"pobieranie: {error}" for team, error in fetcher.errors.items()})
+
+    start = time.perf_counter()
+    jobs = []
+    reports = {}
+    slugs = unique_slugs(teams)
+    for team_name, (matches, download_time) in fetched.items():
+        try:
+            results = BasketAnalysis(BasketballTeam(team_name, matches), schema="optimized").run()
+            team_dir = os.path.join(output_dir, slugs[team_name])
+            os.makedirs(team_dir, exist_ok=True)
+
+            metrics = {key: to_json(results[key]) for key in results if key not in ("df", "streaks")}
+            with open(os.path.join(team_dir, "metrics.json"), "w", encoding="utf-8") as f:
+                json.dump({"team": team_name, "matches": len(results["df"]), "download_time": download_time,
+                           "metrics": metrics}, f, ensure_ascii=False, indent=2)
+
+            inputs = {
+                "PointsPlot": results["df"],
+                "PointDiffPlot": results["point_diff"],
+                "AvgHomeAwayPlot": results["avg_home_away"],
+                "TopBottomPlot": {"top": results["top_games"], "bottom": results["bottom_games"]},
+            }
+            for library in libraries:
+                for kind, title in PLOT_KINDS.items():
+                    jobs.append((library, kind, f"{team_name}: {title}", inputs[kind],
+                                 os.path.join(team_dir, f"{kind}_{library}")))
+            reports[team_name] = team_dir
+        except Exception as e:
+            errors[team_name] = f"analiza: {e}"
+    timings["analysis"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    files = []
+    if max_workers == 0 or len(jobs) <= 1:
+        outcomes = [_safe_render(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            outcomes = list(pool.map(_safe_render, jobs))
+    for job, (path, seconds, error) in zip(jobs, outcomes):
+        if error is None:
+            files.append({"path": path, "seconds": round(seconds, 4)})
+        else:
+            errors[f"{job[0]}/{job[1]}: {os.path.basename(os.path.dirname(job[4]))}"] = f"wykres: {error}"
+    timings["plots"] = time.perf_counter() - start
+    timings["total"] = time.perf_counter() - started
+
+    if not reports:
+        status = EXIT_FAILED
+    elif errors:
+        status = EXIT_PARTIAL
+    else:
+        status = EXIT_OK
+
+    summary = {
+        "status": status,
+        "teams": sorted(reports),
+        "errors": errors,
+        "timings": {stage: round(seconds, 4) for stage, seconds in timings.items()},
+        "files": files,
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    for stage, seconds in timings.items():
+        log(f"{stage:<10} {seconds * 1000:10.1f} ms")
+    log(f"drużyny: {len(reports)}/{len(teams)}, wykresy: {len(files)}/{len(jobs)}, błędy: {len(errors)}")
+    for name, error in errors.items():
+        log(f"BŁĄD {name}: {error}")
+    return summary
+
+
+# błąd pojedynczego wykresu nie przerywa całego raportu
+def _safe_render(job):
+    try:
+        path, seconds = render_job(job)
+        return path, seconds, None
+    except Exception as e:
+        return None, 0.0, f"{type(e).__name__}: {e}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analiza wyników drużyn koszykarskich (PZKosz)")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("app", help="aplikacja Streamlit (domyślnie)")
+
+    report = commands.add_parser("report", help="raport bez serwera: pliki PNG/HTML/JSON")
+    report.add_argument("--team", action="append", type=parse_team, metavar="NAZWA=URL",
+                        help="drużyna i adres terminarza (można podać wiele razy)")
+    report.add_argument("--output-dir", default="reports", help="katalog wyników")
+    report.add_argument("--library", nargs="+", default=["Matplotlib"],
+                        choices=["Matplotlib", "Seaborn", "Plotly"], help="biblioteki wykresów")
+    report.add_argument("--workers", type=int, default=None,
+                        help="liczba procesów renderujących (0 = bez puli procesów)")
+    report.add_argument("--cache-dir", default=".cache/pzkosz", help="cache odpowiedzi HTTP ('' = wyłączony)")
+    archive_mode = report.add_mutually_exclusive_group()
+    archive_mode.add_argument("--record", metavar="KATALOG", help="zapis pobranych stron do archiwum")
+    archive_mode.add_argument("--replay", metavar="KATALOG", help="strony z archiwum, bez dostępu do sieci")
+
+    backfill = commands.add_parser("backfill", help="pobranie historii sezonów do bazy meczów")
+    backfill.add_argument("--league", action="append", required=True, type=parse_team, metavar="SEZON=URL",
+                          help="sezon (np. 2023/2024) i adres strony ligi (można podać wiele razy)")
+    backfill.add_argument("--db", default="matches.db", help="baza SQLite (mecze i postęp pobierania)")
+    backfill.add_argument("--workers", type=int, default=4, help="liczba równoległych pobrań")
+    backfill.add_argument("--rate", type=positive_float, default=2.0, help="maksymalna liczba zapytań na sekundę")
+    backfill.add_argument("--cache-dir", default="", help="cache odpowiedzi HTTP ('' = wyłączony)")
+    args = parser.parse_args(argv)
+
+    if args.command in (None, "app"):
+        run_app()
+        return EXIT_OK
+    if args.command == "backfill":
+        return run_backfill(args.league, args.db, max_workers=args.workers, rate=args.rate,
+                            cache_dir=args.cache_dir or None)
+
+    archive = None
+    if args.record or args.replay:
+        from archive import HtmlArchive
+
+        archive = HtmlArchive(args.record or args.replay, mode="record" if args.record else "replay")
+
+    teams = dict(args.team) if args.team else dict(DEFAULT_TEAMS)
+    summary = run_report(teams, args.output_dir, libraries=args.library, max_workers=args.workers,
+                         cache_dir=args.cache_dir or None, archive=archive)
+    return summary["status"]
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
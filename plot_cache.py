@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# Odcisk (hash) danych wejściowych wykresu - DataFrame, Series lub słownik takich obiektów
+def data_fingerprint(data):
+    h = hashlib.sha256()
+    _update(h, data)
+    return h.hexdigest()
+
+
+def _update(h, data):
+    if isinstance(data, dict):
+        for key in sorted(data):
+            h.update(repr(key).encode("utf-8"))
+            _update(h, data[key])
+    elif isinstance(data, (pd.DataFrame, pd.Series)):
+        h.update(type(data).__name__.encode("utf-8"))
+        if isinstance(data, pd.DataFrame):
+            schema = list(zip(data.columns, map(str, data.dtypes)))
+        else:
+            schema = [(data.name, str(data.dtype))]
+        h.update(repr(schema).encode("utf-8"))
+        h.update(repr(list(data.index.names)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        h.update(repr(data).encode("utf-8"))
+
+
+# Cache wyrenderowanych wykresów (LRU)
+# - klucz: (klasa wykresu, tytuł, opcje wykresu, odcisk danych)
+# - wartość: bajty PNG (Matplotlib/Seaborn) lub JSON figury (Plotly), zapisana razem z rozmiarem w bajtach
+# - ograniczenie liczby wpisów i łącznego rozmiaru w bajtach
+class FigureCache:
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()  # wspólny dla wszystkich sesji Streamlit (wątków)
+
+    @staticmethod
+    def key(plot, data):
+        return (type(plot).__qualname__, plot.title, repr(sorted(plot.options().items())), data_fingerprint(data))
+
+    # rozmiar wpisu w bajtach - JSON Plotly liczony po zakodowaniu (UTF-8), nie w znakach
+    @staticmethod
+    def payload_size(payload):
+        return len(payload.encode("utf-8")) if isinstance(payload, str) else len(payload)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, payload):
+        size = self.payload_size(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (payload, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._size -= old_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+FIGURE_CACHE = FigureCache()
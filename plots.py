@@ -1,263 +1,129 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-import plotly.express as px
-import streamlit as st
+import importlib
 from abc import ABC, abstractmethod
+from decorators import TRACER
+from plot_cache import FIGURE_CACHE
+from downsampling import downsample_indices, tick_positions
 
+# Moduły z klasami wykresów dla poszczególnych bibliotek - importowane dopiero przy pierwszym użyciu,
+# dzięki czemu start aplikacji (i strony bez wykresów) nie ładuje Matplotlib, Seaborn ani Plotly
+BACKENDS = {
+    "Matplotlib": "plots_matplotlib",
+    "Seaborn": "plots_seaborn",
+    "Plotly": "plots_plotly",
+}
 
-# Polimorfizm: każda klasa wykresu ma tę samą metodę draw(),
+
+# Polimorfizm: każda klasa wykresu ma tę samą metodę render(),
 # ale inną implementację
 # klasa abstrakcyjna - narzuca wspólny interfejs dla wszystkich wykresów
 class BasePlot(ABC):
-    def __init__(self, title: str):
+    def __init__(self, title: str, cache=FIGURE_CACHE):
         self.title = title  # atrybut wspólny dla wszystkich wykresów
+        self.cache = cache  # cache wyrenderowanych wykresów (None - bez cache)
 
-    @abstractmethod
-    def draw(self, data):  # metoda abstrakcyjna do implementacji w klasach dziedziczących
-        pass
-
-
-# MATPLOTLIB
-
-# dziedziczenie - PointsPlotMatplotlib dziedziczy po BasePlot
-class PointsPlotMatplotlib(BasePlot):
-    def draw(self, data):
-        df = data.copy()
-        df["Data"] = df["Data i godzina meczu"].dt.date
-
-        x = range(len(df))
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.plot(x, df["Punkty Basket Hills"], marker="o",
-                label="Basket Hills", color="darkred")
-        ax.plot(x, df["Punkty przeciwnika"], marker="o",
-                label="Przeciwnik", color="black")
-
-        ax.set_xticks(x)
-        ax.set_xticklabels(df["Data"], rotation=90, fontsize=8)
-
-        ax.set_title(self.title)
-        ax.set_ylabel("Punkty")
-        ax.set_xlabel("Data")
-        ax.legend()
-        st.pyplot(fig)
-
-
-# dziedziczenie - PointDiffPlotMatplotlib dziedziczy po BasePlot
-class PointDiffPlotMatplotlib(BasePlot):
-    def draw(self, data):
-        df = data.copy()
-        df["Data"] = df["Data i godzina meczu"].dt.date
-
-        x = range(len(df))
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.plot(x, df["Różnica punktów"], marker="o", color="#800020")
-        ax.axhline(0, linestyle="--", color="gray")
-
-        ax.set_xticks(x)
-        ax.set_xticklabels(df["Data"], rotation=90, fontsize=8)
-
-        ax.set_title(self.title)
-        ax.set_ylabel("Różnica punktów")
-        ax.set_xlabel("Data")
-        st.pyplot(fig)
-
-
-# dziedziczenie - AvgHomeAwayPlotMatplotlib dziedziczy po BasePlot
-class AvgHomeAwayPlotMatplotlib(BasePlot):
-    def draw(self, data):
-        series = data
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.bar(series.index, series.values, color="darkred")
-
-        ax.set_title(self.title)
-        ax.set_ylabel("Średnia liczba punktów")
-        ax.set_xlabel("Miejsce meczu")
-        ax.tick_params(axis="x", rotation=0)
-        st.pyplot(fig)
-
-
-# dziedziczenie - TopBottomPlotMatplotlib dziedziczy po BasePlot
-class TopBottomPlotMatplotlib(BasePlot):
-    def draw(self, data):
-        top_df = data["top"]
-        bottom_df = data["bottom"]
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.bar(top_df["Przeciwnik"], top_df["Punkty Basket Hills"],
-               label="Najlepsze mecze", color="darkred")
-        ax.bar(bottom_df["Przeciwnik"], bottom_df["Punkty Basket Hills"],
-               label="Najsłabsze mecze", color="black")
-
-        ax.set_title(self.title)
-        ax.set_ylabel("Punkty")
-        ax.set_xlabel("Przeciwnik")
-        ax.legend(fontsize=8)
-        ax.tick_params(axis="x", rotation=90, labelsize=8)
-        st.pyplot(fig)
-
-
-# SEABORN
-
-# dziedziczenie - PointsPlotSeaborn dziedziczy po BasePlot
-class PointsPlotSeaborn(BasePlot):
-    def draw(self, data):
-        df = data.copy()
-        df["Data"] = df["Data i godzina meczu"].dt.date
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        sns.lineplot(data=df, x="Data", y="Punkty Basket Hills",
-                     marker="o", label="Basket Hills", color="darkred", ax=ax)
-        sns.lineplot(data=df, x="Data", y="Punkty przeciwnika",
-                     marker="o", label="Przeciwnik", color="black", ax=ax)
-
-        ax.set_title(self.title)
-        ax.set_ylabel("Punkty")
-        ax.set_xlabel("Data")
-        ax.tick_params(axis="x", rotation=90, labelsize=8)
-        ax.tick_params(axis="y", labelsize=8)
-        st.pyplot(fig)
-
-
-# dziedziczenie - PointDiffPlotSeaborn dziedziczy po BasePlot
-class PointDiffPlotSeaborn(BasePlot):
+    # rysowanie wykresu w aplikacji - przy tych samych danych wynik pochodzi z cache
     def draw(self, data):
-        df = data.copy()
-        df["Data"] = df["Data i godzina meczu"].dt.date
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        sns.lineplot(data=df, x="Data", y="Różnica punktów",
-                     marker="o", color="#800020", ax=ax)
-        ax.axhline(0, linestyle="--", color="gray")
-
-        ax.set_title(self.title)
-        ax.set_ylabel("Różnica punktów")
-        ax.set_xlabel("Data")
-        ax.tick_params(axis="x", rotation=90, labelsize=8)
-        ax.tick_params(axis="y", labelsize=8)
-        st.pyplot(fig)
-
-
-# dziedziczenie - AvgHomeAwayPlotSeaborn dziedziczy po BasePlot
-class AvgHomeAwayPlotSeaborn(BasePlot):
-    def draw(self, data):
-        series = data
-        fig, ax = plt.subplots(figsize=(8, 4))
-        sns.barplot(x=series.index, y=series.values, color="darkred", ax=ax)
-
-        ax.set_title(self.title)
-        ax.set_ylabel("Średnia liczba punktów")
-        ax.set_xlabel("Miejsce meczu")
-        ax.tick_params(axis="x", rotation=0)
-        st.pyplot(fig)
-
+        with TRACER.span(f"plot:{type(self).__name__}"):
+            if self.cache is None:
+                payload = self.render_payload(data)
+            else:
+                key = self.cache.key(self, data)
+                payload = self.cache.get(key)
+                if payload is None:
+                    payload = self.render_payload(data)
+                    self.cache.put(key, payload)
+            with TRACER.span("show"):
+                self.show(payload)
+
+    # render + serializacja; figura jest zawsze zwalniana, także po błędzie serializacji
+    def render_payload(self, data):
+        with TRACER.span("render"):
+            fig = self.render(data)
+        try:
+            with TRACER.span("serialize"):
+                return self.serialize(fig)
+        finally:
+            self.release(fig)
+
+    def release(self, fig):  # zwolnienie zasobów figury (domyślnie nic)
+        pass
 
-# dziedziczenie - TopBottomPlotSeaborn dziedziczy po BasePlot
-class TopBottomPlotSeaborn(BasePlot):
-    def draw(self, data):
-        top_df = data["top"]
-        bottom_df = data["bottom"]
+    file_extension = "bin"
 
-        fig, ax = plt.subplots(figsize=(8, 4))
-        sns.barplot(data=top_df, x="Przeciwnik", y="Punkty Basket Hills",
-                    color="darkred", label="Najlepsze mecze", ax=ax)
-        sns.barplot(data=bottom_df, x="Przeciwnik", y="Punkty Basket Hills",
-                    color="black", label="Najsłabsze mecze", ax=ax)
+    def export(self, payload):  # zawartość pliku statycznego (domyślnie zserializowany wykres)
+        return payload
 
-        ax.set_title(self.title)
-        ax.set_ylabel("Punkty")
-        ax.set_xlabel("Przeciwnik")
-        ax.legend(fontsize=8)
-        ax.tick_params(axis="x", rotation=90, labelsize=8)
-        ax.tick_params(axis="y", labelsize=8)
-        st.pyplot(fig)
+    # zapis wykresu do pliku (bez Streamlit) - zwraca ścieżkę z rozszerzeniem właściwym dla biblioteki
+    def save(self, data, path):
+        path = f"{path}.{self.file_extension}"
+        content = self.export(self.render_payload(data))
+        mode, encoding = ("wb", None) if isinstance(content, bytes) else ("w", "utf-8")
+        with open(path, mode, encoding=encoding) as f:
+            f.write(content)
+        return path
 
+    def options(self):  # parametry wpływające na wygląd wykresu (część klucza cache)
+        return {}
 
-# PLOTLY
+    @abstractmethod
+    def render(self, data):  # metoda abstrakcyjna do implementacji w klasach dziedziczących - zwraca figurę
+        pass
 
-# dziedziczenie - PointsPlotPlotly dziedziczy po BasePlot
-class PointsPlotPlotly(BasePlot):
-    def draw(self, data):
-        df = data.copy()
-        df["Data"] = df["Data i godzina meczu"].dt.date
+    @abstractmethod
+    def serialize(self, fig):  # zamiana figury na bajty / tekst do przechowania w cache
+        pass
 
-        fig = px.line(
-            df,
-            x="Data",
-            y=["Punkty Basket Hills", "Punkty przeciwnika"],
-            markers=True,
-            title=self.title,
-            color_discrete_map={
-                "Punkty Basket Hills": "darkred",
-                "Punkty przeciwnika": "black",
-            },
-        )
-        fig.update_layout(xaxis_title="Data", yaxis_title="Punkty")
-        fig.update_xaxes(tickangle=90)
-        st.plotly_chart(fig, use_container_width=True)
+    @abstractmethod
+    def show(self, payload):  # wyświetlenie zserializowanego wykresu w Streamlit
+        pass
 
 
-# dziedziczenie - PointDiffPlotPlotly dziedziczy po BasePlot
-class PointDiffPlotPlotly(BasePlot):
-    def draw(self, data):
-        df = data.copy()
+# klasa pomocnicza dla wykresów szeregów czasowych (punkty, różnica punktów)
+# - ogranicza liczbę rysowanych punktów do budżetu max_points (LTTB lub min/max)
+# - ogranicza liczbę etykiet osi X do max_ticks
+class TimeSeriesPlot:
+    max_points = 500
+    max_ticks = 30
+    marker_limit = 100  # powyżej tej liczby punktów linie są rysowane bez znaczników
+    method = "lttb"
+
+    def __init__(self, title: str, cache=FIGURE_CACHE, max_points=None, max_ticks=None, method=None):
+        super().__init__(title, cache)
+        if max_points is not None:
+            self.max_points = max_points
+        if max_ticks is not None:
+            self.max_ticks = max_ticks
+        if method is not None:
+            self.method = method
+
+    def options(self):
+        return {**super().options(), "max_points": self.max_points, "max_ticks": self.max_ticks,
+                "method": self.method}
+
+    # zwraca (pozycje wybranych meczów, ramkę z wybranymi meczami i kolumną "Data")
+    def downsample(self, data, columns):
+        positions = downsample_indices(data[columns].to_numpy(), self.max_points, self.method)
+        df = data.iloc[positions].copy()
         df["Data"] = df["Data i godzina meczu"].dt.date
+        return positions, df
 
-        fig = px.line(
-            df,
-            x="Data",
-            y="Różnica punktów",
-            markers=True,
-            title=self.title,
-            color_discrete_sequence=["#800020"],
-        )
-        fig.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig.update_layout(xaxis_title="Data", yaxis_title="Różnica punktów")
-        fig.update_xaxes(tickangle=90)
-        st.plotly_chart(fig, use_container_width=True)
+    def marker(self, df):
+        return "o" if len(df) <= self.marker_limit else None
 
-
-# dziedziczenie - AvgHomeAwayPlotPlotly dziedziczy po BasePlot
-class AvgHomeAwayPlotPlotly(BasePlot):
-    def draw(self, data):
-        series = data.reset_index()
-        fig = px.bar(
-            series,
-            x=series.columns[0],
-            y=series.columns[1],
-            title=self.title,
-            color_discrete_sequence=["darkred"],
-        )
-        fig.update_layout(
-            xaxis_title="Miejsce meczu",
-            yaxis_title="Średnia liczba punktów",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    def ticks(self, df):
+        return tick_positions(len(df), self.max_ticks)
 
 
-# dziedziczenie - TopBottomPlotPlotly dziedziczy po BasePlot
-class TopBottomPlotPlotly(BasePlot):
-    def draw(self, data):
-        top_df = data["top"].copy()
-        bottom_df = data["bottom"].copy()
+# import modułu z klasami wykresów wybranej biblioteki ("Matplotlib", "Seaborn", "Plotly")
+def load_backend(library):
+    if library not in BACKENDS:
+        raise ValueError(f"Nieznana biblioteka wykresów: {library}")
+    return importlib.import_module(BACKENDS[library])
 
-        top_df["Typ"] = "Najlepsze mecze"
-        bottom_df["Typ"] = "Najsłabsze mecze"
-        combined = pd.concat([top_df, bottom_df])
 
-        fig = px.bar(
-            combined,
-            x="Przeciwnik",
-            y="Punkty Basket Hills",
-            color="Typ",
-            title=self.title,
-            color_discrete_map={
-                "Najlepsze mecze": "darkred",
-                "Najsłabsze mecze": "black",
-            },
-        )
-        fig.update_xaxes(tickangle=90)
-        fig.update_layout(xaxis_title="Przeciwnik", yaxis_title="Punkty")
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+# leniwy dostęp do klas wykresów, np. from plots import PointsPlotPlotly
+def __getattr__(name):
+    for library, module_name in BACKENDS.items():
+        if name.endswith(library) or name == f"{library}Plot":
+            return getattr(importlib.import_module(module_name), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,124 @@
+import io
+import threading
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from plots import BasePlot, TimeSeriesPlot
+
+
+# wspólna baza dla wykresów Matplotlib i Seaborn - wynik przechowywany jako PNG
+# - figury tworzone obiektowo (Figure + FigureCanvasAgg), bez globalnego stanu pyplot,
+#   więc menedżer figur pyplot nie gromadzi ich między kolejnymi renderami
+# - reuse_figure=True: jedna figura na typ wykresu i wątek (sesję), czyszczona przed ponownym użyciem
+# - dpi: rozdzielczość zapisywanego PNG
+class MatplotlibPlot(BasePlot):
+    reuse_figure = True
+    dpi = 200
+    file_extension = "png"
+    _figures = threading.local()
+
+    def new_figure(self, figsize=(8, 4)):
+        if not self.reuse_figure:
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+            return fig, fig.add_subplot()
+
+        pool = getattr(self._figures, "pool", None)
+        if pool is None:
+            pool = self._figures.pool = {}
+        fig = pool.get(type(self))
+        if fig is None:
+            fig = pool[type(self)] = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+        else:
+            fig.clear()
+        return fig, fig.add_subplot()
+
+    def serialize(self, fig):
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=self.dpi, bbox_inches="tight")
+        return buf.getvalue()
+
+    # usunięcie osi i artystów - dane wykresu nie są trzymane w pamięci po serializacji
+    def release(self, fig):
+        fig.clear()
+
+    def show(self, payload):
+        import streamlit as st  # Streamlit potrzebny tylko w aplikacji (raporty bez serwera go nie ładują)
+        st.image(payload, width="stretch")
+
+
+# MATPLOTLIB
+
+# dziedziczenie - PointsPlotMatplotlib dziedziczy po TimeSeriesPlot i MatplotlibPlot
+class PointsPlotMatplotlib(TimeSeriesPlot, MatplotlibPlot):
+    def render(self, data):
+        x, df = self.downsample(data, ["Punkty Basket Hills", "Punkty przeciwnika"])
+
+        fig, ax = self.new_figure(figsize=(8, 4))
+        ax.plot(x, df["Punkty Basket Hills"], marker=self.marker(df),
+                label="Basket Hills", color="darkred")
+        ax.plot(x, df["Punkty przeciwnika"], marker=self.marker(df),
+                label="Przeciwnik", color="black")
+
+        ticks = self.ticks(df)
+        ax.set_xticks(x[ticks])
+        ax.set_xticklabels(df["Data"].iloc[ticks], rotation=90, fontsize=8)
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Punkty")
+        ax.set_xlabel("Data")
+        ax.legend()
+        return fig
+
+
+# dziedziczenie - PointDiffPlotMatplotlib dziedziczy po TimeSeriesPlot i MatplotlibPlot
+class PointDiffPlotMatplotlib(TimeSeriesPlot, MatplotlibPlot):
+    def render(self, data):
+        x, df = self.downsample(data, ["Różnica punktów"])
+
+        fig, ax = self.new_figure(figsize=(8, 4))
+        ax.plot(x, df["Różnica punktów"], marker=self.marker(df), color="#800020")
+        ax.axhline(0, linestyle="--", color="gray")
+
+        ticks = self.ticks(df)
+        ax.set_xticks(x[ticks])
+        ax.set_xticklabels(df["Data"].iloc[ticks], rotation=90, fontsize=8)
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Różnica punktów")
+        ax.set_xlabel("Data")
+        return fig
+
+
+# dziedziczenie - AvgHomeAwayPlotMatplotlib dziedziczy po MatplotlibPlot
+class AvgHomeAwayPlotMatplotlib(MatplotlibPlot):
+    def render(self, data):
+        series = data
+        fig, ax = self.new_figure(figsize=(8, 4))
+        ax.bar(series.index, series.values, color="darkred")
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Średnia liczba punktów")
+        ax.set_xlabel("Miejsce meczu")
+        ax.tick_params(axis="x", rotation=0)
+        return fig
+
+
+# dziedziczenie - TopBottomPlotMatplotlib dziedziczy po MatplotlibPlot
+class TopBottomPlotMatplotlib(MatplotlibPlot):
+    def render(self, data):
+        top_df = data["top"]
+        bottom_df = data["bottom"]
+
+        fig, ax = self.new_figure(figsize=(8, 4))
+        ax.bar(top_df["Przeciwnik"], top_df["Punkty Basket Hills"],
+               label="Najlepsze mecze", color="darkred")
+        ax.bar(bottom_df["Przeciwnik"], bottom_df["Punkty Basket Hills"],
+               label="Najsłabsze mecze", color="black")
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Punkty")
+        ax.set_xlabel("Przeciwnik")
+        ax.legend(fontsize=8)
+        ax.tick_params(axis="x", rotation=90, labelsize=8)
+        return fig
@@ -0,0 +1,115 @@
+import json
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plots import BasePlot, TimeSeriesPlot
+
+
+# wspólna baza dla wykresów Plotly - wynik przechowywany jako JSON figury
+# - powyżej webgl_threshold meczów w danych linie rysowane są przez WebGL (scattergl); decyzja zapada
+#   przed ograniczeniem liczby punktów (TimeSeriesPlot.max_points), inaczej WebGL nie byłby nigdy użyty
+class PlotlyPlot(BasePlot):
+    webgl_threshold = 1000
+    file_extension = "html"
+
+    def options(self):
+        return {**super().options(), "webgl_threshold": self.webgl_threshold}
+
+    def serialize(self, fig):
+        return fig.to_json()
+
+    # figura odtwarzana z gotowego JSON bez ponownej walidacji (JSON pochodzi z serialize)
+    def show(self, payload):
+        import streamlit as st  # Streamlit potrzebny tylko w aplikacji (raporty bez serwera go nie ładują)
+        st.plotly_chart(go.Figure(json.loads(payload), _validate=False), use_container_width=True)
+
+    # samodzielna strona HTML (plotly.js z CDN)
+    def export(self, payload):
+        return go.Figure(json.loads(payload), _validate=False).to_html(include_plotlyjs="cdn")
+
+    # ślad liniowy budowany bezpośrednio z tablic NumPy (bez przekształceń plotly.express)
+    def line_trace(self, x, y, name, color, markers, webgl=False):
+        trace = go.Scattergl if webgl else go.Scatter
+        return trace(x=x, y=y, name=name, mode="lines+markers" if markers else "lines",
+                     line={"color": color}, marker={"color": color})
+
+
+# PLOTLY
+
+# dziedziczenie - PointsPlotPlotly dziedziczy po TimeSeriesPlot i PlotlyPlot
+class PointsPlotPlotly(TimeSeriesPlot, PlotlyPlot):
+    def render(self, data):
+        webgl = len(data) > self.webgl_threshold
+        _, df = self.downsample(data, ["Punkty Basket Hills", "Punkty przeciwnika"])
+        x = df["Data i godzina meczu"].dt.floor("D").to_numpy()
+        markers = self.marker(df) is not None
+
+        fig = go.Figure([
+            self.line_trace(x, df["Punkty Basket Hills"].to_numpy(), "Punkty Basket Hills", "darkred", markers,
+                            webgl),
+            self.line_trace(x, df["Punkty przeciwnika"].to_numpy(), "Punkty przeciwnika", "black", markers, webgl),
+        ])
+        fig.update_layout(title=self.title, xaxis_title="Data", yaxis_title="Punkty")
+        fig.update_xaxes(tickangle=90, nticks=self.max_ticks)
+        return fig
+
+
+# dziedziczenie - PointDiffPlotPlotly dziedziczy po TimeSeriesPlot i PlotlyPlot
+class PointDiffPlotPlotly(TimeSeriesPlot, PlotlyPlot):
+    def render(self, data):
+        webgl = len(data) > self.webgl_threshold
+        _, df = self.downsample(data, ["Różnica punktów"])
+        x = df["Data i godzina meczu"].dt.floor("D").to_numpy()
+
+        fig = go.Figure([
+            self.line_trace(x, df["Różnica punktów"].to_numpy(), "Różnica punktów", "#800020",
+                            self.marker(df) is not None, webgl),
+        ])
+        fig.add_hline(y=0, line_dash="dash", line_color="gray")
+        fig.update_layout(title=self.title, xaxis_title="Data", yaxis_title="Różnica punktów")
+        fig.update_xaxes(tickangle=90, nticks=self.max_ticks)
+        return fig
+
+
+# dziedziczenie - AvgHomeAwayPlotPlotly dziedziczy po PlotlyPlot
+class AvgHomeAwayPlotPlotly(PlotlyPlot):
+    def render(self, data):
+        series = data.reset_index()
+        fig = px.bar(
+            series,
+            x=series.columns[0],
+            y=series.columns[1],
+            title=self.title,
+            color_discrete_sequence=["darkred"],
+        )
+        fig.update_layout(
+            xaxis_title="Miejsce meczu",
+            yaxis_title="Średnia liczba punktów",
+        )
+        return fig
+
+
+# dziedziczenie - TopBottomPlotPlotly dziedziczy po PlotlyPlot
+class TopBottomPlotPlotly(PlotlyPlot):
+    def render(self, data):
+        top_df = data["top"].copy()
+        bottom_df = data["bottom"].copy()
+
+        top_df["Typ"] = "Najlepsze mecze"
+        bottom_df["Typ"] = "Najsłabsze mecze"
+        combined = pd.concat([top_df, bottom_df])
+
+        fig = px.bar(
+            combined,
+            x="Przeciwnik",
+            y="Punkty Basket Hills",
+            color="Typ",
+            title=self.title,
+            color_discrete_map={
+                "Najlepsze mecze": "darkred",
+                "Najsłabsze mecze": "black",
+            },
+        )
+        fig.update_xaxes(tickangle=90)
+        fig.update_layout(xaxis_title="Przeciwnik", yaxis_title="Punkty")
+        return fig
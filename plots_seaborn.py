@@ -0,0 +1,80 @@
+import seaborn as sns
+from matplotlib.ticker import MaxNLocator
+from plots import TimeSeriesPlot
+from plots_matplotlib import MatplotlibPlot
+
+
+# SEABORN
+
+# dziedziczenie - PointsPlotSeaborn dziedziczy po TimeSeriesPlot i MatplotlibPlot
+class PointsPlotSeaborn(TimeSeriesPlot, MatplotlibPlot):
+    def render(self, data):
+        _, df = self.downsample(data, ["Punkty Basket Hills", "Punkty przeciwnika"])
+
+        fig, ax = self.new_figure(figsize=(8, 4))
+        sns.lineplot(data=df, x="Data", y="Punkty Basket Hills",
+                     marker=self.marker(df), label="Basket Hills", color="darkred", ax=ax)
+        sns.lineplot(data=df, x="Data", y="Punkty przeciwnika",
+                     marker=self.marker(df), label="Przeciwnik", color="black", ax=ax)
+        ax.xaxis.set_major_locator(MaxNLocator(self.max_ticks))
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Punkty")
+        ax.set_xlabel("Data")
+        ax.tick_params(axis="x", rotation=90, labelsize=8)
+        ax.tick_params(axis="y", labelsize=8)
+        return fig
+
+
+# dziedziczenie - PointDiffPlotSeaborn dziedziczy po TimeSeriesPlot i MatplotlibPlot
+class PointDiffPlotSeaborn(TimeSeriesPlot, MatplotlibPlot):
+    def render(self, data):
+        _, df = self.downsample(data, ["Różnica punktów"])
+
+        fig, ax = self.new_figure(figsize=(8, 4))
+        sns.lineplot(data=df, x="Data", y="Różnica punktów",
+                     marker=self.marker(df), color="#800020", ax=ax)
+        ax.axhline(0, linestyle="--", color="gray")
+        ax.xaxis.set_major_locator(MaxNLocator(self.max_ticks))
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Różnica punktów")
+        ax.set_xlabel("Data")
+        ax.tick_params(axis="x", rotation=90, labelsize=8)
+        ax.tick_params(axis="y", labelsize=8)
+        return fig
+
+
+# dziedziczenie - AvgHomeAwayPlotSeaborn dziedziczy po MatplotlibPlot
+class AvgHomeAwayPlotSeaborn(MatplotlibPlot):
+    def render(self, data):
+        series = data
+        fig, ax = self.new_figure(figsize=(8, 4))
+        sns.barplot(x=series.index, y=series.values, color="darkred", ax=ax)
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Średnia liczba punktów")
+        ax.set_xlabel("Miejsce meczu")
+        ax.tick_params(axis="x", rotation=0)
+        return fig
+
+
+# dziedziczenie - TopBottomPlotSeaborn dziedziczy po MatplotlibPlot
+class TopBottomPlotSeaborn(MatplotlibPlot):
+    def render(self, data):
+        top_df = data["top"]
+        bottom_df = data["bottom"]
+
+        fig, ax = self.new_figure(figsize=(8, 4))
+        sns.barplot(data=top_df, x="Przeciwnik", y="Punkty Basket Hills",
+                    color="darkred", label="Najlepsze mecze", ax=ax)
+        sns.barplot(data=bottom_df, x="Przeciwnik", y="Punkty Basket Hills",
+                    color="black", label="Najsłabsze mecze", ax=ax)
+
+        ax.set_title(self.title)
+        ax.set_ylabel("Punkty")
+        ax.set_xlabel("Przeciwnik")
+        ax.legend(fontsize=8)
+        ax.tick_params(axis="x", rotation=90, labelsize=8)
+        ax.tick_params(axis="y", labelsize=8)
+        return fig
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import IntEnum
+
+import numpy as np
+import pandas as pd
+from kernels import DATE, OPPONENT, SCORED, CONCEDED, RESULT, LOCATION
+
+
+# kody wyniku i miejsca meczu (int8) - etykiety jak w słownikach z fetch_matches
+# - kolejność kodów = kolejność alfabetyczna etykiet, więc groupby / sortowanie po kategoriach
+#   daje ten sam układ wyników co na kolumnach tekstowych
+class Result(IntEnum):
+    LOSS = 0
+    WIN = 1
+
+    @property
+    def label(self):
+        return RESULT_LABELS[self]
+
+
+class Location(IntEnum):
+    AWAY = 0
+    HOME = 1
+
+    @property
+    def label(self):
+        return LOCATION_LABELS[self]
+
+
+RESULT_LABELS = ("Porażka", "Wygrana")
+LOCATION_LABELS = ("Na wyjeździe", "U siebie")
+
+
+# najmniejszy typ kodów dla n kategorii - ten sam, którego używa pd.Categorical (brak kopii w to_frame)
+def _code_dtype(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+# Pojedynczy mecz - zwarty rekord zamiast słownika z sześcioma długimi kluczami
+@dataclass(frozen=True, slots=True)
+class MatchRecord:
+    played_at: datetime
+    opponent: str
+    points: int
+    opponent_points: int
+    result: Result
+    location: Location
+
+    # słownik w formacie zwracanym przez MatchDataFetcher.fetch_matches
+    def to_dict(self):
+        return {
+            DATE: self.played_at,
+            OPPONENT: self.opponent,
+            SCORED: self.points,
+            CONCEDED: self.opponent_points,
+            RESULT: self.result.label,
+            LOCATION: self.location.label,
+        }
+
+
+# Paczka meczów w układzie kolumnowym (struct-of-arrays)
+# - daty jako datetime64[ns], punkty jako int16, wynik i miejsce jako kody int8
+# - przeciwnicy jako kody int8/int16/int32 + posortowana lista nazw (każda nazwa zapisana raz)
+# - to_frame() buduje DataFrame bezpośrednio z tych tablic, bez kopiowania danych
+class MatchBatch:
+    __slots__ = ("played_at", "opponent_codes", "opponents", "points", "opponent_points", "result", "location")
+
+    def __init__(self, played_at, opponent_codes, opponents, points, opponent_points, result, location):
+        self.played_at = np.asarray(played_at, dtype="datetime64[ns]")
+        self.opponents = list(opponents)
+        self.opponent_codes = np.asarray(opponent_codes, dtype=_code_dtype(len(self.opponents)))
+        self.points = np.asarray(points, dtype=np.int16)
+        self.opponent_points = np.asarray(opponent_points, dtype=np.int16)
+        self.result = np.asarray(result, dtype=np.int8)
+        self.location = np.asarray(location, dtype=np.int8)
+
+    # budowa z kolumn: daty jako tekst ("dd.mm.rrrr gg:mm") lub datetime, punkty i miejsce meczu
+    # (wynik wyznaczany z punktów, tak jak w MatchDataFetcher)
+    @classmethod
+    def from_columns(cls, dates, opponents, points, opponent_points, locations):
+        played_at = pd.to_datetime(pd.Series(dates, dtype=object), format="mixed", dayfirst=True, errors="coerce")
+        codes, names = pd.factorize(pd.Series(opponents, dtype=object), sort=True)
+        points = np.asarray(points, dtype=np.int16)
+        opponent_points = np.asarray(opponent_points, dtype=np.int16)
+        return cls(
+            played_at.to_numpy(dtype="datetime64[ns]"),
+            codes,
+            names,
+            points,
+            opponent_points,
+            (points > opponent_points).astype(np.int8),
+            np.asarray(locations, dtype=np.int8),
+        )
+
+    # konwersja listy słowników z fetch_matches
+    @classmethod
+    def from_dicts(cls, matches):
+        return cls.from_columns(
+            [m[DATE] for m in matches],
+            [m[OPPONENT] for m in matches],
+            [int(m[SCORED]) for m in matches],
+            [int(m[CONCEDED]) for m in matches],
+            [LOCATION_LABELS.index(m[LOCATION]) for m in matches],
+        )
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, i):
+        played_at = self.played_at[i]
+        return MatchRecord(
+            pd.Timestamp(played_at).to_pydatetime() if not np.isnat(played_at) else None,
+            self.opponents[self.opponent_codes[i]],
+            int(self.points[i]),
+            int(self.opponent_points[i]),
+            Result(int(self.result[i])),
+            Location(int(self.location[i])),
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self]
+
+    # rozmiar tablic w bajtach (bez listy nazw przeciwników)
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.__slots__ if name != "opponents")
+
+    # DataFrame w formacie BasketAnalysis - kolumny są widokami tablic paczki
+    # (przeciwnik, wynik i miejsce jako Categorical na istniejących kodach)
+    def to_frame(self):
+        return pd.DataFrame({
+            DATE: pd.Series(self.played_at, copy=False),
+            OPPONENT: pd.Categorical.from_codes(self.opponent_codes, categories=pd.Index(self.opponents, dtype=object)),
+            SCORED: pd.Series(self.points, copy=False),
+            CONCEDED: pd.Series(self.opponent_points, copy=False),
+            RESULT: pd.Categorical.from_codes(self.result, categories=RESULT_LABELS),
+            LOCATION: pd.Categorical.from_codes(self.location, categories=LOCATION_LABELS),
+        }, copy=False)
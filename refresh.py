@@ -0,0 +1,99 @@
+import threading
+import time
+
+
+# Migawka danych - wartość, czas wczytania (time.time()) i numer wersji
+class Snapshot:
+    __slots__ = ("value", "loaded_at", "version")
+
+    def __init__(self, value, loaded_at, version):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.version = version
+
+    def age(self):
+        return time.time() - self.loaded_at
+
+
+# Odświeżanie danych w tle (stale-while-revalidate)
+# - get() od razu zwraca ostatnie poprawne dane; tylko pierwsze wczytanie blokuje
+# - dane starsze niż interval są odświeżane w wątku roboczym, wynik podmieniany jest atomowo
+# - jednocześnie trwa co najwyżej jedno odświeżanie (kolejne wywołania czekają na nie lub je pomijają)
+# - nieudane odświeżenie zostawia poprzednie dane i zapisuje błąd w last_error
+class BackgroundRefresher:
+    def __init__(self, loader, interval=900.0):
+        self.loader = loader
+        self.interval = interval
+        self.last_error = None
+        self.refresh_count = 0  # liczba wywołań loadera
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._flight = None  # Event trwającego odświeżania
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    # ostatnie poprawne dane; przy braku danych czeka na pierwsze wczytanie
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh(wait=True)
+            snapshot = self._snapshot
+            if snapshot is None:
+                error = self.last_error
+                if error is None:  # odświeżanie przerwane bez wyjątku Exception (np. w innym wątku)
+                    raise RuntimeError("Nie udało się wczytać danych")
+                raise error
+        elif snapshot.age() >= self.interval:
+            self.refresh(wait=False)
+        return snapshot
+
+    # uruchomienie odświeżania (single-flight); wait=True czeka na jego zakończenie
+    def refresh(self, wait=False):
+        with self._lock:
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = threading.Event()
+
+        if leader:
+            if wait:
+                self._load(flight)
+            else:
+                threading.Thread(target=self._load, args=(flight,), name="data-refresh", daemon=True).start()
+        if wait:
+            flight.wait()
+
+    def _load(self, flight):
+        try:
+            self.refresh_count += 1
+            value = self.loader()
+            version = self._snapshot.version + 1 if self._snapshot else 1
+            self._snapshot = Snapshot(value, time.time(), version)  # podmiana jednym przypisaniem
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.set()
+
+    # okresowe odświeżanie w wątku w tle, niezależnie od ruchu użytkowników
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._schedule, name="data-refresh-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def _schedule(self):
+        while not self._stop.wait(self.interval):
+            self.refresh(wait=True)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
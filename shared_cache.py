@@ -0,0 +1,194 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    value       BLOB    NOT NULL,
+    size        INTEGER NOT NULL,
+    expires_at  REAL    NOT NULL,
+    accessed_at REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS locks (
+    key        TEXT PRIMARY KEY,
+    owner      TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+# Cache współdzielony przez wiele procesów (np. kilka workerów Streamlit za load balancerem)
+# - wartości (pickle) przechowywane w pliku SQLite, dostęp z wielu procesów chroni blokada bazy
+# - TTL wpisów; wygasłe wpisy zostają w bazie jako "stare" dane awaryjne, dopóki nie zostaną usunięte
+#   po przekroczeniu max_entries / max_bytes (najpierw wygasłe, potem najdawniej używane)
+# - czas ostatniego użycia (LRU) aktualizowany najwyżej raz na touch_interval sekund dla klucza,
+#   żeby odczyty nie były zapisami do bazy
+# - get_or_compute: single-flight - klucz odświeża tylko jeden proces (dzierżawa w tabeli locks),
+#   pozostałe czekają na jego wynik zamiast samodzielnie pobierać dane
+class SharedCache:
+    def __init__(self, path, ttl=900.0, max_entries=256, max_bytes=256 * 1024 * 1024, lock_timeout=120.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock_timeout = lock_timeout  # po tym czasie dzierżawa procesu, który padł, wygasa
+        self.poll_interval = 0.05
+        self.touch_interval = 10.0
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    # jedno połączenie na wątek - sqlite3 nie pozwala współdzielić połączeń między wątkami
+    @property
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # (wartość, czy_aktualna) albo (None, False) gdy brak wpisu
+    def _lookup(self, key):
+        now = time.time()
+        row = self._conn.execute("SELECT value, expires_at, accessed_at FROM entries WHERE key = ?",
+                                 (key,)).fetchone()
+        if row is None:
+            return None, False
+        if now - row[2] >= self.touch_interval:
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return pickle.loads(row[0]), row[1] > now
+
+    def get(self, key, default=None):
+        value, fresh = self._lookup(key)
+        if not fresh:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + ttl, now),
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, key):
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn.execute("DELETE FROM entries")
+        self._conn.execute("DELETE FROM locks")
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def total_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    # po przekroczeniu limitów: najpierw wygasłe wpisy, potem najdawniej używane
+    def _evict(self, conn, now):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY expires_at > ?, accessed_at", (now,)):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    # właściciel dzierżawy - proces i wątek (wątki jednego procesu też nie liczą klucza równolegle)
+    @property
+    def _token(self):
+        return f"{self.owner}-{threading.get_ident()}"
+
+    # dzierżawa klucza - True, jeśli ten wątek może go odświeżyć
+    def _acquire(self, key):
+        now = time.time()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires_at FROM locks WHERE key = ?", (key,)).fetchone()
+            acquired = row is None or row[1] <= now or row[0] == self._token
+            if acquired:
+                conn.execute("INSERT OR REPLACE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+                             (key, self._token, now + self.lock_timeout))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return acquired
+
+    def _release(self, key):
+        self._conn.execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, self._token))
+
+    def _locked(self, key):
+        row = self._conn.execute("SELECT expires_at FROM locks WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] > time.time()
+
+    # wartość z cache albo wynik compute() - liczony przez jeden proces naraz
+    # - pozostałe procesy czekają na zwolnienie dzierżawy i odczytują zapisany wynik
+    # - gdy odświeżenie się nie uda, a istnieje starsza wartość, zwracana jest starsza wartość
+    def get_or_compute(self, key, compute, ttl=None):
+        while True:
+            value, fresh = self._lookup(key)
+            if fresh:
+                self.hits += 1
+                return value
+
+            if self._acquire(key):
+                try:
+                    value, fresh = self._lookup(key)  # inny proces mógł skończyć przed naszą dzierżawą
+                    if fresh:
+                        self.hits += 1
+                        return value
+                    self.misses += 1
+                    value = compute()
+                    self.set(key, value, ttl)
+                    return value
+                finally:
+                    self._release(key)
+
+            while self._locked(key):
+                time.sleep(self.poll_interval)
+            value, fresh = self._lookup(key)
+            if fresh:
+                self.hits += 1
+                return value
+            if value is not None:
+                return value  # właściciel dzierżawy nie zapisał wyniku - starsze dane są lepsze niż brak danych
@@ -0,0 +1,138 @@
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    team            TEXT    NOT NULL,
+    season          TEXT    NOT NULL,
+    played_at       TEXT    NOT NULL,
+    opponent        TEXT    NOT NULL,
+    points          INTEGER NOT NULL,
+    opponent_points INTEGER NOT NULL,
+    result          TEXT    NOT NULL,
+    location        TEXT    NOT NULL,
+    PRIMARY KEY (team, played_at, opponent)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_team_season ON matches (team, season, played_at);
+CREATE INDEX IF NOT EXISTS idx_matches_team_opponent ON matches (team, opponent, played_at);
+"""
+
+UPSERT = """
+INSERT INTO matches (team, season, played_at, opponent, points, opponent_points, result, location)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (team, played_at, opponent) DO UPDATE SET
+    season = excluded.season,
+    points = excluded.points,
+    opponent_points = excluded.opponent_points,
+    result = excluded.result,
+    location = excluded.location
+"""
+
+
+# sezon koszykarski zaczyna się jesienią: mecz z 15.01.2025 należy do sezonu 2024/2025
+def season_of(date):
+    year = date.year if date.month >= 8 else date.year - 1
+    return f"{year}/{year + 1}"
+
+
+# koniec zakresu dat: sama data (date albo tekst bez godziny) obejmuje cały dzień,
+# czyli wszystkie mecze przed północą kolejnego dnia; (granica, czy_włącznie)
+def _end_bound(end):
+    stamp = pd.Timestamp(end)
+    if isinstance(end, datetime):
+        return stamp, True
+    if isinstance(end, date) or (isinstance(end, str) and ":" not in end and stamp == stamp.normalize()):
+        return stamp.normalize() + pd.Timedelta(days=1), False
+    return stamp, True
+
+
+# Trwałe przechowywanie meczów w bazie SQLite
+# - klucz (drużyna, data, przeciwnik) - ponowne pobranie tej samej strony nie tworzy duplikatów
+# - indeksy pozwalają szybko wczytać wycinek: drużyna / sezon / zakres dat / przeciwnik
+class MatchStore:
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # zapis (lub aktualizacja) meczów w formacie zwracanym przez MatchDataFetcher.fetch_matches
+    def upsert(self, team_name, matches, season=None):
+        if not matches:
+            return 0
+
+        dates = pd.to_datetime(
+            pd.Series([m["Data i godzina meczu"] for m in matches]), format="mixed", dayfirst=True, errors="coerce"
+        )
+        rows = []
+        for m, date in zip(matches, dates):
+            if pd.isna(date):
+                continue
+            rows.append((
+                team_name,
+                season or season_of(date),
+                date.isoformat(sep=" "),
+                m["Przeciwnik"],
+                int(m["Punkty Basket Hills"]),
+                int(m["Punkty przeciwnika"]),
+                m["Wynik meczu"],
+                m["Miejsce meczu"],
+            ))
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    # wczytanie wycinka danych - zwraca listę słowników w formacie fetch_matches
+    # (data jako obiekt datetime), gotową do przekazania do BasketballTeam
+    def load(self, team_name, season=None, start=None, end=None, opponent=None):
+        query = ("SELECT played_at, opponent, points, opponent_points, result, location "
+                 "FROM matches WHERE team = ?")
+        params = [team_name]
+        if season is not None:
+            query += " AND season = ?"
+            params.append(season)
+        if start is not None:
+            query += " AND played_at >= ?"
+            params.append(pd.Timestamp(start).isoformat(sep=" "))
+        if end is not None:
+            end, inclusive = _end_bound(end)
+            query += " AND played_at <= ?" if inclusive else " AND played_at < ?"
+            params.append(end.isoformat(sep=" "))
+        if opponent is not None:
+            query += " AND opponent = ?"
+            params.append(opponent)
+        query += " ORDER BY played_at"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return [
+            {
+                "Data i godzina meczu": pd.Timestamp(played_at).to_pydatetime(),
+                "Przeciwnik": opponent_name,
+                "Punkty Basket Hills": points,
+                "Punkty przeciwnika": opponent_points,
+                "Wynik meczu": result,
+                "Miejsce meczu": location,
+            }
+            for played_at, opponent_name, points, opponent_points, result, location in rows
+        ]
+
+    def seasons(self, team_name):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT season FROM matches WHERE team = ? ORDER BY season", (team_name,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def teams(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT DISTINCT team FROM matches ORDER BY team").fetchall()
+        return [r[0] for r in rows]
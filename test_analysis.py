@@ -1,6 +1,14 @@
 import unittest
+from unittest.mock import patch
+from datetime import datetime
+import pandas as pd
 from models import BasketballTeam
-from analysis import BasketAnalysis
+from analysis import BasketAnalysis, CATEGORY_COLUMNS, METRICS, parse_match_dates
+from incremental import IncrementalAnalysis
+from fixtures import make_matches, parse_schedule
+import frame_backends
+from records import MatchBatch
+from data_fetcher import diff_matches
 
 # Testy jednostkowe dla klasy BasketAnalysis
 class TestBasketAnalysis(unittest.TestCase):
@@ -78,6 +86,216 @@ class TestBasketAnalysis(unittest.TestCase):
         self.assertIn("avg_scored", results)
         self.assertEqual(results["avg_scored"], round((80 + 65 + 90) / 3, 2))
 
+    def test_run_is_lazy_and_memoized(self):
+        results = self.analysis.run()
+        self.assertEqual(results.computed(), [])
+
+        top = results["top_games"]
+        self.assertIs(results["top_games"], top)
+        self.assertEqual(results.computed(), ["top_games"])
+        self.assertEqual((results["longest_win_streak"], results["longest_loss_streak"]),
+                         BasketAnalysis.longest_streak(self.df))
+        self.assertEqual(results["point_diff"]["Różnica punktów"].tolist(), [10, -10, 5])
+
+    def test_run_metric_subset(self):
+        results = self.analysis.run(["avg_scored", "df"])
+        self.assertEqual(list(results), ["avg_scored", "df"])
+        self.assertNotIn("top_games", results)
+        with self.assertRaises(KeyError):
+            results["top_games"]
+        with self.assertRaises(KeyError):
+            self.analysis.run(["unknown"])
+
+
+# Testy zgodności jednoprzebiegowego jądra NumPy (kernels.compute_all) z metodami pandas
+class TestFusedMetrics(unittest.TestCase):
+
+    def assertSameResult(self, expected, actual):
+        if isinstance(expected, pd.Series):
+            pd.testing.assert_series_equal(expected, actual, check_exact=True)
+        elif isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(expected, actual, check_exact=True)
+        elif isinstance(expected, tuple):
+            self.assertEqual(len(expected), len(actual))
+            for e, a in zip(expected, actual):
+                self.assertTrue(e == a or (pd.isna(e) and pd.isna(a)), (expected, actual))
+        else:
+            self.assertTrue(expected == actual or (pd.isna(expected) and pd.isna(actual)))
+
+    def test_fused_matches_pandas(self):
+        for seed, n in [(1, 5), (2, 40), (3, 400)]:
+            matches = parse_schedule(n, seed=seed)
+            analysis = BasketAnalysis(BasketballTeam("Basket Hills", matches))
+            expected, actual = analysis.run(), analysis.run(fused=True)
+            for key in METRICS:
+                with self.subTest(seed=seed, metric=key):
+                    self.assertSameResult(expected[key], actual[key])
+
+    def test_fused_streaks_without_losses(self):
+        matches = [
+            {"Data i godzina meczu": f"0{i}.01.2024", "Przeciwnik": "Team A", "Punkty Basket Hills": 80,
+             "Punkty przeciwnika": 70, "Wynik meczu": "Wygrana", "Miejsce meczu": "U siebie"}
+            for i in range(1, 4)
+        ]
+        analysis = BasketAnalysis(BasketballTeam("Basket Hills", matches))
+        self.assertSameResult(analysis.run()["streaks"], analysis.run(fused=True)["streaks"])
+
+
+# Testy schematu "optimized" - mniejsze typy, te same wartości wyników
+class TestOptimizedSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.matches = parse_schedule(300, seed=4)
+        self.team = BasketballTeam("Basket Hills", self.matches)
+
+    def test_dtypes(self):
+        df = BasketAnalysis(self.team, schema="optimized").df
+        for col in CATEGORY_COLUMNS:
+            self.assertIsInstance(df[col].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["Punkty Basket Hills"].dtype.itemsize, 1)
+        self.assertEqual(df["Data i godzina meczu"].dtype, "datetime64[ns]")
+
+    def test_results_match_default_schema(self):
+        expected = BasketAnalysis(self.team).run()
+        for fused in (False, True):
+            actual = BasketAnalysis(self.team, schema="optimized").run(fused=fused)
+            for key in METRICS:
+                with self.subTest(metric=key, fused=fused):
+                    a, b = expected[key], actual[key]
+                    if isinstance(a, pd.DataFrame):
+                        pd.testing.assert_frame_equal(a, b, check_dtype=False, check_categorical=False,
+                                                      check_index_type=False, check_column_type=False)
+                    elif isinstance(a, pd.Series):
+                        pd.testing.assert_series_equal(a, b, check_dtype=False, check_categorical=False,
+                                                       check_index_type=False)
+                    else:
+                        self.assertEqual(a, b)
+
+    def test_memory_report(self):
+        report = BasketAnalysis(self.team, schema="optimized").memory_report()
+        self.assertLess(report.loc["Razem", "Po [B]"], report.loc["Razem", "Przed [B]"] / 2)
+        default = BasketAnalysis(self.team).memory_report()
+        self.assertTrue((default["Zmiana [%]"] == 0).all())
+
+    def test_parse_match_dates(self):
+        dates = parse_match_dates(["05.01.2024 18:30", "01.02.2024", "31.02.2024", "01.01.2024 24:00",
+                                   "01.01.2024 10:75", None, datetime(2020, 1, 2, 3, 4), "3.1.2024"])
+        self.assertEqual(list(dates[:2]), [pd.Timestamp(2024, 1, 5, 18, 30), pd.Timestamp(2024, 2, 1)])
+        self.assertTrue(dates[2:6].isna().all())
+        self.assertEqual(dates[6], pd.Timestamp(2020, 1, 2, 3, 4))
+        self.assertEqual(dates[7], pd.Timestamp(2024, 1, 3))
+
+    def test_unknown_schema_raises(self):
+        with self.assertRaises(ValueError):
+            BasketAnalysis(self.team, schema="arrow")
+
+
+# Testy silników danych (Polars / Arrow) - te same wyniki co ścieżka pandas
+class TestFrameBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.matches = make_matches(400, seed=6) + [
+            {"Data i godzina meczu": "zła data", "Przeciwnik": "Team X", "Punkty Basket Hills": 80,
+             "Punkty przeciwnika": 70, "Wynik meczu": "Wygrana", "Miejsce meczu": "U siebie"},
+        ]
+        self.expected = BasketAnalysis(BasketballTeam("X", self.matches)).run()
+
+    def assertSameResults(self, actual):
+        for key in METRICS:
+            with self.subTest(metric=key):
+                a, b = self.expected[key], actual[key]
+                if isinstance(a, pd.DataFrame):
+                    pd.testing.assert_frame_equal(a, b)
+                elif isinstance(a, pd.Series):
+                    pd.testing.assert_series_equal(a, b)
+                else:
+                    self.assertEqual(a, b)
+
+    def test_backends_match_pandas(self):
+        for backend in frame_backends.BACKENDS:
+            with self.subTest(backend=backend):
+                if not frame_backends.available(backend):
+                    self.skipTest(f"brak biblioteki dla silnika {backend}")
+                self.assertSameResults(BasketAnalysis(BasketballTeam("X", self.matches), backend=backend).run())
+
+    # mecze o tej samej dacie i godzinie - kolejność jak na wejściu (sortowanie stabilne) we wszystkich silnikach
+    def test_backends_match_pandas_with_tied_dates(self):
+        results = ["Porażka", "Wygrana", "Porażka", "Porażka", "Wygrana", "Porażka"]
+        tied = [
+            {"Data i godzina meczu": "15.03.2024 18:00", "Przeciwnik": f"Team {i}",
+             "Punkty Basket Hills": 70, "Punkty przeciwnika": 70 + (1 if r == "Porażka" else -1),
+             "Wynik meczu": r, "Miejsce meczu": "U siebie" if i % 3 else "Na wyjeździe"}
+            for i, r in enumerate(results)
+        ]
+        self.matches = tied[::-1] + self.matches[:40] + tied
+        self.expected = BasketAnalysis(BasketballTeam("X", self.matches)).run()
+        self.test_backends_match_pandas()
+
+    def test_backend_accepts_match_batch(self):
+        if not frame_backends.available("arrow"):
+            self.skipTest("brak pyarrow")
+        batch = MatchBatch.from_dicts(self.matches[:-1])
+        results = BasketAnalysis(BasketballTeam("X", batch), backend="arrow").run()
+        self.assertEqual(results["avg_scored"], self.expected["avg_scored"])
+        self.assertEqual(len(results["df"]), len(self.expected["df"]))
+
+    def test_unknown_backend_raises(self):
+        with self.assertRaises(ValueError):
+            BasketAnalysis(BasketballTeam("X", self.matches), backend="duckdb")
+        with self.assertRaises(ValueError):
+            BasketAnalysis(BasketballTeam("X", self.matches), schema="optimized", backend="arrow")
+
+
+# Testy jednostkowe dla przyrostowej analizy (IncrementalAnalysis)
+class TestIncrementalAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.matches = parse_schedule(200, seed=3)
+
+    def test_append_matches_full_rebuild(self):
+        inc = IncrementalAnalysis("Basket Hills")
+        for i in range(0, len(self.matches), 17):
+            inc.append(self.matches[i:i + 17])
+            self.assertEqual(inc.verify(), [])
+        self.assertEqual(inc.count, len(self.matches))
+
+    def test_current_streak(self):
+        inc = IncrementalAnalysis("Basket Hills", self.matches[:1])
+        first = self.matches[0]["Wynik meczu"]
+        self.assertEqual(inc.current_streak, (first, 1))
+        inc.append([dict(self.matches[0], **{"Data i godzina meczu": "01.01.2099 18:00"})])
+        self.assertEqual(inc.current_streak, (first, 2))
+
+    def test_out_of_order_append_recomputes(self):
+        inc = IncrementalAnalysis("Basket Hills", self.matches[100:])
+        inc.append(self.matches[:100])
+        self.assertEqual(inc.verify(), [])
+
+    def test_apply_diff(self):
+        inc = IncrementalAnalysis("Basket Hills", self.matches[:150])
+        changed = dict(self.matches[10], **{"Punkty Basket Hills": 200})
+        diff = diff_matches(self.matches[:150], self.matches[:10] + [changed] + self.matches[12:])
+        self.assertEqual(diff.summary(), {"added": len(self.matches) - 150, "changed": 1, "removed": 1})
+
+        inc.apply_diff(diff)
+        self.assertEqual(inc.count, len(self.matches) - 1)
+        self.assertEqual(inc.top_games[0]["Punkty Basket Hills"], 200)
+        self.assertEqual(inc.verify(), [])
+
+        # same nowe mecze - dopisanie bez przeliczania od zera
+        inc = IncrementalAnalysis("Basket Hills", self.matches[:150])
+        with patch.object(IncrementalAnalysis, "_reset") as reset:
+            inc.apply_diff(diff_matches(self.matches[:150], self.matches))
+            reset.assert_not_called()
+        self.assertEqual(inc.count, len(self.matches))
+        self.assertEqual(inc.verify(), [])
+
+    def test_invalid_rows_are_skipped(self):
+        inc = IncrementalAnalysis("Basket Hills", self.matches[:3])
+        bad = dict(self.matches[3], **{"Data i godzina meczu": "brak daty"})
+        self.assertEqual(inc.append([bad]), 0)
+        self.assertEqual(inc.count, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
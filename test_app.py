@@ -0,0 +1,73 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import streamlit as st
+from streamlit import runtime
+from streamlit.testing.v1 import AppTest
+from shared_cache import SharedCache
+
+TEAM_URL = "https://rozgrywki.pzkosz.pl/liga/4/druzyny/d/4119/basket-hills-bielsko-biala/terminarz.html"
+
+
+MATCHES = [
+    {"Data i godzina meczu": "01.10.2025 18:00", "Przeciwnik": "Team A", "Punkty Basket Hills": 80,
+     "Punkty przeciwnika": 70, "Wynik meczu": "Wygrana", "Miejsce meczu": "U siebie"},
+    {"Data i godzina meczu": "08.10.2025 18:00", "Przeciwnik": "Team B", "Punkty Basket Hills": 65,
+     "Punkty przeciwnika": 75, "Wynik meczu": "Porażka", "Miejsce meczu": "Na wyjeździe"},
+]
+
+
+# Testy aplikacji Streamlit - każda strona pobiera dane i liczy tylko zadeklarowane metryki
+# (pomijane przy uruchamianiu z zakładki "Testy jednostkowe", bo czyszczą cache działającej aplikacji)
+@unittest.skipIf(runtime.exists(), "test uruchomiony wewnątrz aplikacji Streamlit")
+class TestPageScopedComputation(unittest.TestCase):
+
+    def setUp(self):
+        fetcher = patch("data_fetcher.MatchDataFetcher")
+        store = patch("storage.MatchStore")
+        self.fetcher = fetcher.start().return_value
+        self.fetcher.fetch_matches.return_value = (MATCHES, 0.01)
+        self.fetcher.cache_hit = False
+        store.start()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.shared_path = os.path.join(tmp.name, "shared.db")
+        patch.dict(os.environ, {"BASKET_SHARED_CACHE": self.shared_path}).start()
+        self.addCleanup(patch.stopall)
+
+        st.cache_data.clear()  # cache Streamlit jest wspólny dla testów w jednym procesie
+        st.cache_resource.clear()
+        self.at = AppTest.from_file("app.py", default_timeout=60)
+        self.at.run()
+
+    def open(self, page):
+        self.at.sidebar.radio[0].set_value(page).run()
+        self.assertFalse(self.at.exception)
+
+    def test_home_page_does_not_fetch(self):
+        self.open("Strona główna")
+        self.open("Testy jednostkowe")
+        self.fetcher.fetch_matches.assert_not_called()
+
+    def test_analysis_page_fetches_once(self):
+        self.open("Analiza drużyny")
+        self.open("Wykresy")
+        self.open("Analiza drużyny")
+        self.fetcher.fetch_matches.assert_called_once()
+        self.assertEqual(self.at.metric[0].value, "72.5")
+        self.assertIn("Dane sprzed 0 min", self.at.sidebar.caption[0].value)
+
+    # dane pobrane przez inny proces 30 min temu - wiek liczony od pobrania, nie od odczytu z cache
+    def test_data_age_counts_from_scrape(self):
+        cache = SharedCache(self.shared_path)
+        cache.set(f"fetch:{TEAM_URL}", (MATCHES, 0.01, False, time.time() - 1800), ttl=3600)
+        cache.close()
+        self.open("Analiza drużyny")
+        self.fetcher.fetch_matches.assert_not_called()
+        self.assertIn("Dane sprzed 30 min", self.at.sidebar.caption[0].value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from archive import HtmlArchive
+from fixtures import TEAM_NAME, make_schedule_html
+from data_fetcher import LeagueDataFetcher, MatchDataFetcher
+
+
+# lokalny serwer z terminarzem; treść można podmienić w trakcie testu
+class PageHandler(BaseHTTPRequestHandler):
+    body = make_schedule_html(80, seed=4)
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        payload = self.body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+# Testy archiwum stron HTML (nagrywanie / odtwarzanie)
+class TestHtmlArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = type("Handler", (PageHandler,), {"hits": 0})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f"http://127.0.0.1:{server.server_port}/terminarz.html"
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def test_record_then_replay_without_network(self):
+        recorded, _ = MatchDataFetcher(self.url, TEAM_NAME, archive=HtmlArchive(self.dir, "record")).fetch_matches()
+        self.assertEqual(self.handler.hits, 1)
+
+        replay = MatchDataFetcher(self.url, TEAM_NAME, archive=HtmlArchive(self.dir, "replay"))
+        with patch("requests.get", side_effect=AssertionError("zapytanie HTTP w trybie odtwarzania")):
+            replayed, download_time = replay.fetch_matches()
+        self.assertEqual(replayed, recorded)
+        self.assertIsNotNone(download_time)
+        self.assertEqual(self.handler.hits, 1)
+
+    def test_content_addressed_and_compressed(self):
+        archive = HtmlArchive(self.dir, "record")
+        first = archive.record("http://a/terminarz.html", PageHandler.body)
+        second = archive.record("http://b/terminarz.html", PageHandler.body)
+        archive.record("http://a/terminarz.html", PageHandler.body)
+
+        self.assertEqual(first, second)
+        stats = archive.stats()
+        self.assertEqual((stats["urls"], stats["objects"]), (2, 1))
+        self.assertLess(stats["disk_bytes"] * 3, stats["raw_bytes"])
+        self.assertEqual(len(archive.versions("http://a/terminarz.html")), 1)
+
+    def test_history_of_versions(self):
+        archive = HtmlArchive(self.dir, "record")
+        MatchDataFetcher(self.url, TEAM_NAME, archive=archive).fetch_matches()
+        self.handler.body = make_schedule_html(81, seed=4)
+        MatchDataFetcher(self.url, TEAM_NAME, archive=archive).fetch_matches()
+
+        replay = HtmlArchive(self.dir)
+        old, new = replay.versions(self.url)
+        self.assertEqual(replay.load(self.url), self.handler.body)
+        self.assertEqual(replay.load(self.url, old["sha256"]), PageHandler.body)
+        # ponowne sparsowanie starej wersji strony
+        fetcher = MatchDataFetcher(self.url, TEAM_NAME, parser="lxml-iter")
+        self.assertEqual(fetcher.parse_matches(replay.read(old["sha256"])), fetcher.parse_matches(PageHandler.body))
+        self.assertEqual(new["size"], len(self.handler.body.encode("utf-8")))
+
+    def test_league_fetcher_replay(self):
+        teams = [(self.url, TEAM_NAME)]
+        recorded = LeagueDataFetcher(teams, archive=HtmlArchive(self.dir, "record")).fetch_all()
+        replayed = LeagueDataFetcher(teams, archive=HtmlArchive(self.dir, "replay")).fetch_all()
+        self.assertEqual(replayed[TEAM_NAME][0], recorded[TEAM_NAME][0])
+        self.assertEqual(self.handler.hits, 1)
+
+    def test_missing_page_in_replay(self):
+        fetcher = MatchDataFetcher(self.url, TEAM_NAME, archive=HtmlArchive(self.dir, "replay"))
+        with self.assertRaises(KeyError):
+            fetcher.fetch_matches()
+        self.assertEqual(self.handler.hits, 0)
+
+    def test_truncated_index_line_is_ignored(self):
+        archive = HtmlArchive(self.dir, "record")
+        archive.record(self.url, "<html></html>")
+        with open(os.path.join(self.dir, "index.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"url": "http://x", "sha')
+        self.assertEqual(HtmlArchive(self.dir).urls(), [self.url])
+
+        # kolejny zapis po urwanym wpisie trafia do osobnej linii
+        archive = HtmlArchive(self.dir, "record")
+        archive.record("http://b/terminarz.html", "<html>b</html>")
+        replay = HtmlArchive(self.dir)
+        self.assertEqual(replay.urls(), sorted(["http://b/terminarz.html", self.url]))
+        self.assertEqual(replay.load("http://b/terminarz.html"), "<html>b</html>")
+
+    def test_record_updates_index_in_memory(self):
+        archive = HtmlArchive(self.dir, "record")
+        archive.record("http://a/terminarz.html", "<html>a</html>")
+        with patch("builtins.open", wraps=open) as opened:
+            for i in range(5):
+                archive.record(f"http://{i}/terminarz.html", f"<html>{i}</html>")
+        reads = [c for c in opened.call_args_list if c.args[0].endswith("index.jsonl") and c.args[1:] != ("a+b",)]
+        self.assertEqual(reads, [])
+        self.assertEqual(len(archive.urls()), 6)
+        self.assertEqual(HtmlArchive(self.dir).urls(), archive.urls())
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            HtmlArchive(self.dir, "rewind")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from analysis import BasketAnalysis
+from batch import BatchAnalysis
+from fixtures import parse_schedule
+from models import BasketballTeam
+from storage import season_of
+
+
+# Testy jednostkowe dla analizy wielu drużyn (BatchAnalysis)
+class TestBatchAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.teams = [BasketballTeam(f"Team {i}", parse_schedule(150, seed=i)) for i in range(3)]
+
+    def test_summary_matches_single_team_analysis(self):
+        summary = BatchAnalysis(self.teams, by_season=False).summary().set_index("Drużyna")
+        for team in self.teams:
+            results = BasketAnalysis(team).run()
+            row = summary.loc[team.get_name()]
+            with self.subTest(team=team.get_name()):
+                self.assertEqual(row["wins"], results["wins_losses"]["Wygrana"])
+                self.assertEqual(row["losses"], results["wins_losses"]["Porażka"])
+                self.assertEqual(row["avg_scored"], results["avg_scored"])
+                self.assertEqual(row["avg_conceded"], results["avg_conceded"])
+                self.assertAlmostEqual(row["avg_home"], results["avg_home_away"]["U siebie"])
+                self.assertEqual(row["away_losses"], results["win_loss_home_away"].loc["Na wyjeździe", "Porażka"])
+                self.assertEqual((row["longest_win_streak"], row["longest_loss_streak"]), results["streaks"])
+
+    def test_long_frame_input_groups_by_team_and_season(self):
+        frame = pd.concat(
+            [pd.DataFrame(t.get_matches()).assign(club=t.get_name()) for t in self.teams],
+            ignore_index=True,
+        )
+        summary = BatchAnalysis(frame=frame, team_col="club").summary()
+        self.assertEqual(list(summary.columns[:2]), ["Drużyna", "Sezon"])
+        self.assertEqual(summary["matches"].sum(), sum(len(t.get_matches()) for t in self.teams))
+
+    def test_seasons_follow_storage(self):
+        df = BatchAnalysis(self.teams).df
+        self.assertEqual(list(df["Sezon"]), [season_of(d) for d in df["Data i godzina meczu"]])
+
+    def test_empty_team_list(self):
+        results = BatchAnalysis([]).run()
+        self.assertTrue(results["summary"].empty)
+        self.assertEqual(list(results["summary"].columns[:2]), ["Drużyna", "Sezon"])
+        self.assertTrue(results["point_diff"].empty)
+
+    # małe dane - bez uruchamiania puli procesów
+    def test_small_detail_skips_process_pool(self):
+        with patch("batch.ProcessPoolExecutor") as pool:
+            BatchAnalysis(self.teams).detail(max_workers=2)
+        pool.assert_not_called()
+
+    def test_detail_process_pool_matches_in_process(self):
+        batch = BatchAnalysis(self.teams)
+        batch.min_parallel_rows = 0
+        local = batch.detail(max_workers=0)
+        pooled = batch.detail(max_workers=2)
+        for name in ("point_diff", "top_games", "bottom_games"):
+            pd.testing.assert_frame_equal(local[name], pooled[name])
+        self.assertEqual(set(local["top_games"]["Drużyna"]), {"Team 0", "Team 1", "Team 2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import benchmarks
+import plots_matplotlib
+from analysis import BasketAnalysis
+from fixtures import make_matches
+from models import BasketballTeam
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+
+def result(case, seconds, rows=10, benchmark="analysis"):
+    return {"benchmark": benchmark, "case": case, "rows": rows, "seconds": seconds}
+
+
+# Testy jednostkowe dla porównania z wynikami bazowymi (compare_to_baseline, kod wyjścia main)
+class TestCompareToBaseline(unittest.TestCase):
+
+    def test_regression_above_tolerance(self):
+        baseline = [result("run", 0.100), result("construct", 0.100)]
+        regressions = benchmarks.compare_to_baseline([result("run", 0.130), result("construct", 0.120)], baseline)
+        self.assertEqual([r["case"] for r in regressions], ["run"])
+        self.assertAlmostEqual(regressions[0]["ratio"], 1.3)
+        self.assertEqual(regressions[0]["baseline_seconds"], 0.100)
+
+    # krótkie pomiary: dwukrotne spowolnienie o 1 ms to jeszcze szum
+    def test_small_absolute_delta_ignored(self):
+        regressions = benchmarks.compare_to_baseline([result("run", 0.002)], [result("run", 0.001)])
+        self.assertEqual(regressions, [])
+
+    # przypadki bez wyniku bazowego (inny rozmiar, nowy przypadek) nie są porównywane
+    def test_unmatched_cases_skipped(self):
+        results = [result("run", 1.0, rows=1_000), result("new_case", 1.0)]
+        self.assertEqual(benchmarks.compare_to_baseline(results, [result("run", 0.001)]), [])
+        self.assertNotIn("ratio", results[0])
+
+    def test_committed_baseline_covers_default_suites(self):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        self.assertEqual({r["benchmark"] for r in baseline}, {"fetch_matches", "analysis", "plot"})
+        self.assertEqual({r["rows"] for r in baseline}, set(benchmarks.DEFAULT_SIZES))
+
+    def _main(self, baseline_seconds):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            with open(baseline, "w", encoding="utf-8") as f:
+                json.dump({"results": [result(case, baseline_seconds) for case in ("construct", "run")]}, f)
+            output = os.path.join(tmp, "results.json")
+            with patch("builtins.print"):
+                code = benchmarks.main(["--suite", "analysis", "--sizes", "10", "--repeat", "1",
+                                        "--baseline", baseline, "--output", output])
+            with open(output, encoding="utf-8") as f:
+                return code, json.load(f)
+
+    def test_exit_code_on_regression(self):
+        code, report = self._main(baseline_seconds=1e-9)
+        self.assertEqual(code, 1)
+        self.assertEqual(report["regressions"], 2)
+
+    def test_exit_code_without_regression(self):
+        code, report = self._main(baseline_seconds=60.0)
+        self.assertEqual(code, 0)
+        self.assertEqual(report["regressions"], 0)
+
+
+# Testy jednostkowe dla kopii analizy bez wyników pośrednich (_without_cache)
+class TestWithoutCache(unittest.TestCase):
+
+    def test_drops_every_cached_property(self):
+        analysis = BasketAnalysis(BasketballTeam("X", make_matches(50)))
+        analysis.run(fused=True)
+        for name in ("point_diff", "top_bottom", "streaks"):
+            getattr(analysis, name)
+        names = benchmarks._cached_properties(BasketAnalysis)
+        self.assertTrue({"point_diff", "top_bottom", "streaks", "fused_metrics"} <= names)
+
+        fresh = benchmarks._without_cache(analysis)
+        self.assertEqual(names & set(vars(fresh)), {"df"})
+        self.assertIs(fresh.df, analysis.df)
+        self.assertEqual(fresh.run()["avg_scored"], analysis.run()["avg_scored"])
+
+
+# Testy jednostkowe dla testu długotrwałego (soak_figures)
+@unittest.skipIf(benchmarks._heap_in_use_kb() is None, "brak glibc mallinfo2")
+class TestSoakFigures(unittest.TestCase):
+    # kilkaset renderów z niskim dpi; porównywane są dwie ostatnie próbki (po wczesnych oknach)
+    RENDERS = 300
+    EVERY = 50
+
+    def soak(self):
+        samples = benchmarks.soak_figures(renders=self.RENDERS, warmup=30, every=self.EVERY, dpi=10, trace=False)
+        self.assertEqual([s["renders"] for s in samples], list(range(self.EVERY, self.RENDERS + 1, self.EVERY)))
+        return samples
+
+    def test_memory_flat_in_late_windows(self):
+        samples = self.soak()
+        self.assertLess(benchmarks.late_growth(samples, "heap_kb"), 0.5)
+        self.assertLess(benchmarks.late_growth(samples, "blocks"), 5)
+
+    # wyciek 4 KiB na render (np. zatrzymany bufor PNG) - wielokrotnie powyżej progu
+    def test_detects_small_leak(self):
+        kept = []
+
+        def serialize(self, fig):
+            kept.append(bytes(4096))
+            return b""
+
+        with patch.object(plots_matplotlib.MatplotlibPlot, "serialize", serialize):
+            samples = self.soak()
+        self.assertGreater(benchmarks.late_growth(samples, "heap_kb"), 2)
+
+    # figury trzymane po renderze - przyrost liczby żywych bloków
+    def test_detects_accumulated_figures(self):
+        kept = []
+        with patch.object(plots_matplotlib.MatplotlibPlot, "reuse_figure", False), \
+                patch.object(plots_matplotlib.MatplotlibPlot, "release", lambda self, fig: kept.append(fig)):
+            samples = benchmarks.soak_figures(renders=20, warmup=2, every=10, dpi=10, trace=False)
+        self.assertGreater(benchmarks.late_growth(samples, "blocks"), 100)
+
+    # tracemalloc (tryb --soak w CLI): próbki z pamięcią zaalokowaną przez Pythona
+    def test_traced_memory_sample(self):
+        samples = benchmarks.soak_figures(renders=4, warmup=2, every=2, dpi=10)
+        self.assertEqual([s["renders"] for s in samples], [2, 4])
+        self.assertTrue(all("traced_kb" in s for s in samples))
+
+
+if __name__ == "__main__":
+    unittest.main()
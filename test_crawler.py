@@ -0,0 +1,253 @@
+import _thread
+import os
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fixtures import TEAM_NAME, make_schedule_html
+from data_fetcher import MatchDataFetcher
+from decorators import TRACER
+from crawler import BackfillCrawler, CrawlCheckpoint, RateLimiter
+from main import EXIT_OK, EXIT_PARTIAL, main
+from storage import MatchStore
+
+# nagrane strony: dwa sezony, w każdym liga z dwiema drużynami
+TEAMS = {
+    "2023/2024": [(101, "alfa-basket", "Alfa Basket"), (102, "beta-team", "Beta Team")],
+    "2024/2025": [(201, "alfa-basket", "Alfa Basket"), (202, "gamma-kosz", "Gamma Kosz")],
+}
+ROWS = 30
+
+
+def league_page(season):
+    links = "".join(f'<li><a href="/liga/4/druzyny/d/{team_id}/{slug}.html">{name}</a></li>'
+                    for team_id, slug, name in TEAMS[season])
+    return f"<html><body><a href='/regulamin.html'>Regulamin</a><ul>{links}</ul></body></html>"
+
+
+PAGES = {}
+for _i, _season in enumerate(TEAMS):
+    PAGES[f"/liga/{_i}/tabela.html"] = league_page(_season)
+    for _team_id, _slug, _name in TEAMS[_season]:
+        PAGES[f"/liga/4/druzyny/d/{_team_id}/{_slug}/terminarz.html"] = \
+            make_schedule_html(ROWS, seed=_team_id).replace(TEAM_NAME, _name)
+
+
+# liczba różnych meczów na stronie drużyny (klucz bazy: data + przeciwnik)
+def unique_rows(team_id, name):
+    path = next(p for p in PAGES if f"/d/{team_id}/" in p)
+    matches = MatchDataFetcher("http://example.com", name).parse_matches(PAGES[path])
+    return len({(m["Data i godzina meczu"], m["Przeciwnik"]) for m in matches})
+
+
+# lokalny serwer z nagranymi stronami; liczy zapytania i opcjonalnie zwraca 500 dla wybranych ścieżek
+class RecordedHandler(BaseHTTPRequestHandler):
+    hits = Counter()
+    failing = set()
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+    delay = 0.0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits[self.path] += 1
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(cls.delay)
+            if self.path in cls.failing:
+                self.send_error(500)
+                return
+            if self.path not in PAGES:
+                self.send_error(404)
+                return
+            body = PAGES[self.path].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+# Testy pobierania historii wielu sezonów (crawler.BackfillCrawler)
+class TestBackfillCrawler(unittest.TestCase):
+
+    def setUp(self):
+        RecordedHandler.hits = Counter()
+        RecordedHandler.failing = set()
+        RecordedHandler.active = RecordedHandler.max_active = 0
+        RecordedHandler.delay = 0.0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RecordedHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base = f"http://127.0.0.1:{server.server_port}"
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = os.path.join(tmp.name, "matches.db")
+        self.seasons = {season: [f"{self.base}/liga/{i}/tabela.html"] for i, season in enumerate(TEAMS)}
+
+    def crawler(self, **kwargs):
+        kwargs.setdefault("rate", 1000)
+        return BackfillCrawler(self.db, self.seasons, **kwargs)
+
+    def test_discover_teams(self):
+        teams = BackfillCrawler.discover_teams(league_page("2023/2024"), self.base + "/liga/0/tabela.html")
+        self.assertEqual(teams, {
+            f"{self.base}/liga/4/druzyny/d/101/alfa-basket/terminarz.html": "Alfa Basket",
+            f"{self.base}/liga/4/druzyny/d/102/beta-team/terminarz.html": "Beta Team",
+        })
+
+    def test_crawl_stores_all_seasons(self):
+        counts = self.crawler().run()
+
+        self.assertEqual(counts, {"done": 6})
+        store = MatchStore(self.db)
+        self.assertEqual(store.teams(), ["Alfa Basket", "Beta Team", "Gamma Kosz"])
+        self.assertEqual(store.seasons("Alfa Basket"), ["2023/2024", "2024/2025"])
+        self.assertEqual(len(store.load("Beta Team", season="2023/2024")), unique_rows(102, "Beta Team"))
+        self.assertEqual(len(store.load("Gamma Kosz", season="2024/2025")), unique_rows(202, "Gamma Kosz"))
+        self.assertNotIn("/regulamin.html", RecordedHandler.hits)
+
+    def test_worker_spans_belong_to_callers_run(self):
+        run = TRACER.start_run()
+        self.crawler().run()
+        paths = Counter(s.path for s in TRACER.run_spans(run))
+        self.assertEqual((paths["crawl:league"], paths["crawl:team"]), (2, 4))
+
+    def test_failed_pages_are_retried_on_resume(self):
+        failing = "/liga/4/druzyny/d/202/gamma-kosz/terminarz.html"
+        RecordedHandler.failing = {failing}
+        counts = self.crawler().run()
+        self.assertEqual(counts, {"done": 5, "failed": 1})
+        self.assertEqual(MatchStore(self.db).teams(), ["Alfa Basket", "Beta Team"])
+
+        # wznowienie: pobierana jest tylko strona, która się nie udała
+        RecordedHandler.failing = set()
+        RecordedHandler.hits = Counter()
+        counts = self.crawler().run()
+        self.assertEqual(counts, {"done": 6})
+        self.assertEqual(dict(RecordedHandler.hits), {failing: 1})
+        self.assertEqual(len(MatchStore(self.db).load("Gamma Kosz")), unique_rows(202, "Gamma Kosz"))
+
+    def test_gives_up_after_max_attempts(self):
+        failing = "/liga/4/druzyny/d/101/alfa-basket/terminarz.html"
+        RecordedHandler.failing = {failing}
+        for _ in range(3):
+            self.crawler(max_attempts=2).run()
+        self.assertEqual(RecordedHandler.hits[failing], 2)
+
+    def test_interrupted_crawl_resumes(self):
+        crawler = self.crawler(max_workers=1)
+        done = []
+        original = crawler._crawl_team
+
+        # przerwanie po zapisaniu pierwszej drużyny
+        def crawl_team(*task):
+            original(*task)
+            done.append(task)
+            crawler.stop()
+
+        crawler._crawl_team = crawl_team
+        counts = crawler.run()
+        self.assertEqual(len(done), 1)
+        self.assertEqual(counts, {"done": 3, "pending": 3})
+
+        RecordedHandler.hits = Counter()
+        self.assertEqual(self.crawler().run(), {"done": 6})
+        self.assertEqual(len(RecordedHandler.hits), 3)
+        self.assertNotIn(done[0][0].removeprefix(self.base), RecordedHandler.hits)
+        self.assertTrue(all(hits == 1 for hits in RecordedHandler.hits.values()))
+
+    def test_bounded_concurrency(self):
+        RecordedHandler.delay = 0.05
+        self.crawler(max_workers=2).run()
+        self.assertLessEqual(RecordedHandler.max_active, 2)
+
+    def test_checkpoint_shares_store_database(self):
+        crawler = self.crawler()
+        crawler.run()
+        self.assertEqual(CrawlCheckpoint(self.db).counts(), {"done": 6})
+        self.assertEqual(crawler.checkpoint.path, self.db)
+
+    def test_cli_backfill(self):
+        args = ["backfill", "--db", self.db, "--rate", "1000"]
+        for season, urls in self.seasons.items():
+            args += ["--league", f"{season}={urls[0]}"]
+        self.assertEqual(main(args), EXIT_OK)
+        self.assertEqual(len(MatchStore(self.db).teams()), 3)
+
+    # Ctrl-C w trakcie pobierania: zadania w kolejce nie są wykonywane, kolejne uruchomienie je dokańcza
+    def test_cli_keyboard_interrupt_stops_crawl(self):
+        RecordedHandler.delay = 0.3
+        args = ["backfill", "--db", self.db, "--rate", "1000", "--workers", "1"]
+        for season, urls in self.seasons.items():
+            args += ["--league", f"{season}={urls[0]}"]
+
+        timer = threading.Timer(0.9, _thread.interrupt_main)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertEqual(main(args), EXIT_PARTIAL)
+        self.assertLess(sum(RecordedHandler.hits.values()), 6)
+        self.assertIn("pending", CrawlCheckpoint(self.db).counts())
+
+        RecordedHandler.delay = 0.0
+        self.assertEqual(main(args), EXIT_OK)
+        self.assertEqual(CrawlCheckpoint(self.db).counts(), {"done": 6})
+        self.assertTrue(all(hits == 1 for hits in RecordedHandler.hits.values()))
+
+    def test_same_league_url_in_two_seasons(self):
+        url = self.seasons["2023/2024"][0]
+        counts = BackfillCrawler(self.db, {"2022/2023": [url], "2023/2024": [url]}, rate=1000).run()
+        # strona ligi i terminarze pobrane osobno dla każdego sezonu
+        self.assertEqual(counts, {"done": 6})
+        self.assertEqual(RecordedHandler.hits["/liga/0/tabela.html"], 2)
+        self.assertEqual(RecordedHandler.hits["/liga/4/druzyny/d/102/beta-team/terminarz.html"], 2)
+
+    # domyślna sesja: pula połączeń na host równa liczbie wątków
+    def test_default_session_pool_matches_workers(self):
+        adapter = self.crawler(max_workers=3).session.get_adapter(self.base)
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=0)
+        with self.assertRaises(SystemExit):
+            main(["backfill", "--db", self.db, "--rate", "0", "--league", f"2023/2024={self.base}/liga/0/tabela.html"])
+
+
+# Testy ogranicznika tempa zapytań
+class TestRateLimiter(unittest.TestCase):
+
+    def test_spacing(self):
+        limiter = RateLimiter(rate=50)
+        start = time.perf_counter()
+        for _ in range(6):
+            limiter.wait()
+        # pierwsze zapytanie od razu, kolejne co 1/50 s
+        self.assertGreaterEqual(time.perf_counter() - start, 5 / 50 * 0.9)
+
+    def test_shared_between_threads(self):
+        limiter = RateLimiter(rate=100, burst=2)
+        start = time.perf_counter()
+        threads = [threading.Thread(target=lambda: [limiter.wait() for _ in range(3)]) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertGreaterEqual(time.perf_counter() - start, 10 / 100 * 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
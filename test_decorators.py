@@ -0,0 +1,72 @@
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from decorators import Tracer, TRACER, log_call
+
+
+# Testy jednostkowe dla pomiarów czasu (Tracer, log_call)
+class TestTracer(unittest.TestCase):
+
+    def test_nested_spans_have_paths(self):
+        tracer = Tracer()
+        run = tracer.start_run()
+        with tracer.span("fetch"):
+            with tracer.span("download"):
+                pass
+            with tracer.span("parse"):
+                pass
+
+        paths = [s.path for s in tracer.run_spans(run)]
+        self.assertEqual(paths, ["fetch/download", "fetch/parse", "fetch"])
+
+    def test_stats_percentiles(self):
+        tracer = Tracer()
+        for ms in range(1, 101):
+            with tracer.span("render") as s:
+                pass
+            s.duration = ms / 1000
+        row = tracer.stats()[0]
+        self.assertEqual(row["count"], 100)
+        self.assertAlmostEqual(row["p50_ms"], 50)
+        self.assertAlmostEqual(row["p95_ms"], 95)
+
+    def test_jsonl_export(self):
+        tracer = Tracer()
+        tracer.start_run()
+        with tracer.span("analysis"):
+            pass
+        lines = tracer.to_jsonl().splitlines()
+        self.assertEqual(json.loads(lines[0])["path"], "analysis")
+
+    # wątek roboczy przejmuje przebieg wątku, który zlecił pracę; jego własny przebieg nie jest nadpisany
+    def test_bind_passes_run_to_worker_thread(self):
+        tracer = Tracer()
+        run = tracer.start_run()
+
+        def work():
+            with tracer.span("download"):
+                return tracer.current_run()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(pool.submit(tracer.bind(work)).result(), run)
+            self.assertIsNone(pool.submit(work).result())
+        self.assertEqual([s.run for s in tracer.spans], [run, None])
+        self.assertEqual(tracer.current_run(), run)
+
+    def test_log_call_sets_download_time_and_records_span(self):
+        class Fetcher:
+            download_time = None
+
+            @log_call(name="download")
+            def download(self):
+                return "html"
+
+        run = TRACER.start_run()
+        f = Fetcher()
+        self.assertEqual(f.download(), "html")
+        self.assertIsNotNone(f.download_time)
+        self.assertEqual([s.name for s in TRACER.run_spans(run)], ["download"])
+
+
+if __name__ == "__main__":
+    unittest.main()
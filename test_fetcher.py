@@ -1,6 +1,14 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, Mock
-from data_fetcher import MatchDataFetcher
+from data_fetcher import MatchDataFetcher, LeagueDataFetcher, ROW_PARSERS, diff_matches
+from decorators import TRACER
+from http_cache import ResponseCache
+from fixtures import make_schedule_html
 
 
 class TestMatchDataFetcher(unittest.TestCase):
@@ -93,5 +101,317 @@ class TestMatchDataFetcher(unittest.TestCase):
         self.assertEqual(data, [])  
 
 
+class TestLeagueDataFetcher(unittest.TestCase):
+    HTML = """
+    <html><body>
+    <table><tbody>
+      <tr>
+        <td>1</td>
+        <td>{home}</td>
+        <td>80:70</td>
+        <td>{away}</td>
+        <td>01.01.2024</td>
+      </tr>
+    </tbody></table>
+    </body></html>
+    """
+
+    def _session(self, delay=0.0):
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fake_get(url, headers=None, timeout=None):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(delay)
+            with lock:
+                state["active"] -= 1
+            if "broken" in url:
+                raise ConnectionError("brak połączenia")
+            resp = Mock()
+            resp.text = self.HTML.format(home=url.rsplit("/", 1)[-1], away="Team Z")
+            resp.raise_for_status = Mock()
+            return resp
+
+        session = Mock()
+        session.get.side_effect = fake_get
+        return session, state
+
+    def test_fetch_all_returns_results_per_team(self):
+        session, _ = self._session()
+        teams = [("http://example.com/Team A", "Team A"),
+                 ("http://example.com/Team B", "Team B")]
+        data = LeagueDataFetcher(teams, session=session).fetch_all()
+
+        self.assertEqual(set(data), {"Team A", "Team B"})
+        matches, download_time = data["Team B"]
+        self.assertEqual(matches[0]["Przeciwnik"], "Team Z")
+        self.assertEqual(matches[0]["Miejsce meczu"], "U siebie")
+        self.assertGreaterEqual(download_time, 0)
+
+    def test_fetch_all_limits_requests_per_host(self):
+        session, state = self._session(delay=0.05)
+        teams = [(f"http://example.com/Team {i}", f"Team {i}") for i in range(8)]
+        fetcher = LeagueDataFetcher(teams, max_workers=8, max_per_host=2, session=session)
+        data = fetcher.fetch_all()
+
+        self.assertEqual(len(data), 8)
+        self.assertLessEqual(state["peak"], 2)
+
+    def test_fetch_all_collects_errors(self):
+        session, _ = self._session()
+        teams = [("http://example.com/Team A", "Team A"),
+                 ("http://example.com/broken", "Team B")]
+        fetcher = LeagueDataFetcher(teams, session=session)
+        data = fetcher.fetch_all()
+
+        self.assertIn("Team A", data)
+        self.assertIn("Team B", fetcher.errors)
+
+    # wyniki kluczowane nazwą - ta sama nazwa pod dwoma adresami nadpisałaby wynik
+    def test_duplicate_team_names_rejected(self):
+        teams = [("http://example.com/a", "Team A"), ("http://example.com/b", "Team A"),
+                 ("http://example.com/c", "Team C")]
+        with self.assertRaisesRegex(ValueError, "Team A"):
+            LeagueDataFetcher(teams, session=Mock())
+
+    def test_worker_spans_belong_to_callers_run(self):
+        session, _ = self._session()
+        teams = [(f"http://example.com/Team {i}", f"Team {i}") for i in range(4)]
+        run = TRACER.start_run()
+        LeagueDataFetcher(teams, session=session).fetch_all()
+        self.assertEqual(sum(s.path == "fetch" for s in TRACER.run_spans(run)), 4)
+
+
+class TestParserBackends(unittest.TestCase):
+    def _parse(self, html, parser):
+        f = MatchDataFetcher("http://example.com", "Basket Hills Bielsko-Biała", parser=parser)
+        return f.parse_matches(html)
+
+    def test_all_backends_return_identical_records(self):
+        html = make_schedule_html(300, seed=7)
+        reference = self._parse(html, "html.parser")
+        self.assertGreater(len(reference), 0)
+        for parser in ROW_PARSERS:
+            with self.subTest(parser=parser):
+                self.assertEqual(self._parse(html, parser), reference)
+
+    def test_backends_ignore_rows_outside_table_body(self):
+        html = """
+        <html><body>
+        <table><thead><tr><td>1</td><td>Basket Hills Bielsko-Biała</td><td>1:0</td><td>X</td><td>d</td></tr></thead>
+        <tbody>
+          <tr><td>2</td><td> Team <b>B</b> </td><td>65:75</td><td>Basket Hills Bielsko-Biała</td><td>05.01.2024</td></tr>
+        </tbody></table>
+        </body></html>
+        """
+        for parser in ROW_PARSERS:
+            with self.subTest(parser=parser):
+                data = self._parse(html, parser)
+                self.assertEqual(len(data), 1)
+                self.assertEqual(data[0]["Przeciwnik"], "TeamB")
+
+    # skrypty, style, szablony i komentarze w komórce nie trafiają do rekordu w żadnym parserze
+    def test_backends_skip_script_and_comments_in_cells(self):
+        html = """
+        <html><body><table><tbody>
+          <tr><td>2</td><td><script>var a=1;</script>Team <!-- x --><b>B</b><style>.b{}</style><template>t</template></td>
+              <td>65:75</td><td>Basket Hills Bielsko-Biała</td><td>05.01.2024</td></tr>
+        </tbody></table></body></html>
+        """
+        reference = self._parse(html, "html.parser")
+        self.assertEqual(reference[0]["Przeciwnik"], "TeamB")
+        for parser in ROW_PARSERS:
+            with self.subTest(parser=parser):
+                self.assertEqual(self._parse(html, parser), reference)
+
+    def test_unknown_parser_raises(self):
+        with self.assertRaises(ValueError):
+            MatchDataFetcher("http://example.com", "Basket Hills", parser="regex")
+
+
+# lokalny serwer HTTP udający stronę PZKosz (z ETag lub bez)
+class StubHandler(BaseHTTPRequestHandler):
+    body = """
+    <html><body>
+    <table><tbody>
+      <tr>
+        <td>1</td>
+        <td>Basket Hills Bielsko-Biała</td>
+        <td>80:70</td>
+        <td>Team A</td>
+        <td>01.01.2024</td>
+      </tr>
+    </tbody></table>
+    </body></html>
+    """
+    use_etag = True
+    requests_seen = []
+
+    def do_GET(self):
+        etag = '"v1"'
+        self.requests_seen.append(dict(self.headers))
+        if self.use_etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        payload = self.body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        if self.use_etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+# Testy wykrywania zmian w wierszach terminarza (odciski wierszy, MatchDiff)
+class TestRowFingerprints(unittest.TestCase):
+    TEAM = "Basket Hills Bielsko-Biała"
+
+    def setUp(self):
+        self.html = make_schedule_html(100, seed=7)
+        self.fetcher = MatchDataFetcher("http://example.com", self.TEAM, parser="lxml-iter")
+
+    def _fetch(self, html, advance=True):
+        resp = Mock(status_code=200, text=html)
+        with patch("data_fetcher.requests.get", return_value=resp):
+            return self.fetcher.fetch_matches(advance=advance)[0]
+
+    # strona po zmianach: poprawiony wynik jednego rozegranego meczu drużyny, usunięty drugi
+    # rozegrany mecz drużyny, nowy mecz na końcu
+    def _edited(self):
+        rows = self.html.split("\n")
+        played = [i for i in range(1, len(rows) - 1) if self.TEAM in rows[i] and "-:-" not in rows[i]]
+        changed_i, removed_i = played[:2]
+        old_row = rows[changed_i]
+        rows[changed_i] = old_row.replace(old_row.split("<td>")[3], "111:50</td>")
+        del rows[removed_i]
+        rows.insert(-1, f'<tr><td>101</td><td><a href="#">{self.TEAM}</a></td><td>90:80</td>'
+                        f'<td><a href="#">Nowy Klub</a></td><td>01.06.2030 18:00</td></tr>')
+        return "\n".join(rows), old_row
+
+    def test_first_fetch_adds_all_matches(self):
+        data = self._fetch(self.html)
+        self.assertEqual(self.fetcher.last_diff.added, data)
+        self.assertFalse(self.fetcher.last_diff.changed or self.fetcher.last_diff.removed)
+        self.assertEqual(self.fetcher.rows_parsed, 100)
+
+    def test_unchanged_page_skips_row_parsing(self):
+        first = self._fetch(self.html)
+        with patch.object(MatchDataFetcher, "_parse_row") as parse_row:
+            second = self._fetch(self.html)
+            parse_row.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertFalse(self.fetcher.last_diff)
+        self.assertEqual(self.fetcher.rows_parsed, 0)
+
+    def test_diff_of_edited_page(self):
+        self._fetch(self.html)
+        html, old_row = self._edited()
+        data = self._fetch(html)
+
+        self.assertEqual(self.fetcher.rows_parsed, 2)
+        self.assertEqual(data, MatchDataFetcher("http://example.com", self.TEAM).parse_matches(html))
+        diff = self.fetcher.last_diff
+        self.assertEqual([m["Przeciwnik"] for m in diff.added], ["Nowy Klub"])
+        self.assertEqual(len(diff.changed), 1)
+        old, new = diff.changed[0]
+        self.assertIn(old["Data i godzina meczu"], old_row)
+        self.assertEqual(111, max(new["Punkty Basket Hills"], new["Punkty przeciwnika"]))
+        self.assertEqual(len(diff.removed), 1)
+        self.assertEqual(diff.upserts, diff.added + [new])
+
+    # pobranie bez przesunięcia punktu odniesienia (np. nieudany zapis) - zmiany widoczne ponownie
+    def test_baseline_advances_only_when_committed(self):
+        self._fetch(self.html)
+        html, _ = self._edited()
+        self._fetch(html, advance=False)
+        first = self.fetcher.last_diff.summary()
+        self._fetch(html)
+        self.assertEqual(self.fetcher.last_diff.summary(), first)
+        self._fetch(html)
+        self.assertFalse(self.fetcher.last_diff)
+
+    def test_returned_matches_are_independent_copies(self):
+        data = self._fetch(self.html)
+        data[0]["Przeciwnik"] = "zmieniony"
+        self.assertNotEqual(self._fetch(self.html)[0]["Przeciwnik"], "zmieniony")
+
+    def test_diff_matches(self):
+        a = {"Data i godzina meczu": "01.01.2024", "Przeciwnik": "A", "Punkty Basket Hills": 80}
+        b = {"Data i godzina meczu": "02.01.2024", "Przeciwnik": "B", "Punkty Basket Hills": 70}
+        diff = diff_matches([a, b], [dict(a, **{"Punkty Basket Hills": 81})])
+        self.assertEqual(diff.summary(), {"added": 0, "changed": 1, "removed": 1})
+        self.assertEqual(diff.removed, [b])
+
+
+class TestResponseCache(unittest.TestCase):
+    def _start_server(self, use_etag):
+        handler = type("Handler", (StubHandler,), {"use_etag": use_etag, "requests_seen": []})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}/terminarz.html", handler
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ResponseCache(tmp.name)
+
+    def test_not_modified_skips_parsing(self):
+        url, handler = self._start_server(use_etag=True)
+
+        first = MatchDataFetcher(url, "Basket Hills Bielsko-Biała", cache=self.cache)
+        data, _ = first.fetch_matches()
+        self.assertFalse(first.cache_hit)
+
+        second = MatchDataFetcher(url, "Basket Hills Bielsko-Biała", cache=self.cache)
+        with patch.object(MatchDataFetcher, "parse_matches") as parse:
+            cached, download_time = second.fetch_matches()
+            parse.assert_not_called()
+
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(cached, data)
+        self.assertIsNotNone(download_time)
+        self.assertEqual(handler.requests_seen[-1].get("If-None-Match"), '"v1"')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    # 304 bez treści na dysku - ponowne pobranie; jedno zapytanie = jedno chybienie, treść zapisana znowu
+    def test_not_modified_without_stored_body_counts_one_miss(self):
+        url, handler = self._start_server(use_etag=True)
+        MatchDataFetcher(url, "Basket Hills Bielsko-Biała", cache=self.cache).fetch_matches()
+        os.remove(self.cache._path(url, ".html"))
+
+        second = MatchDataFetcher(url, "Basket Hills Bielsko-Biała", cache=self.cache)
+        with patch.object(self.cache, "conditional_headers", return_value={"If-None-Match": '"v1"'}):
+            data, _ = second.fetch_matches()
+
+        self.assertFalse(second.cache_hit)
+        self.assertEqual(data[0]["Przeciwnik"], "Team A")
+        self.assertEqual(len(handler.requests_seen), 3)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+        self.assertIsNotNone(self.cache.load_body(url))
+
+    def test_unchanged_hash_without_etag_skips_parsing(self):
+        url, _ = self._start_server(use_etag=False)
+
+        MatchDataFetcher(url, "Basket Hills Bielsko-Biała", cache=self.cache).fetch_matches()
+
+        second = MatchDataFetcher(url, "Basket Hills Bielsko-Biała", cache=self.cache)
+        with patch.object(MatchDataFetcher, "parse_matches") as parse:
+            data, _ = second.fetch_matches()
+            parse.assert_not_called()
+
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(data[0]["Przeciwnik"], "Team A")
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
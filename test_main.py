@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fixtures import make_schedule_html
+from main import EXIT_OK, EXIT_PARTIAL, main, run_report, slugify, unique_slugs
+
+
+# lokalny serwer z terminarzem (ścieżka /missing zwraca 404)
+class ScheduleHandler(BaseHTTPRequestHandler):
+    body = make_schedule_html(60, seed=2).encode("utf-8")
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Testy trybu raportu bez serwera Streamlit (main.py report)
+class TestHeadlessReport(unittest.TestCase):
+    TEAM = "Basket Hills Bielsko-Biała"
+
+    def setUp(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ScheduleHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f"http://127.0.0.1:{server.server_port}"
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out = tmp.name
+
+    def test_report_writes_outputs(self):
+        summary = run_report({self.TEAM: self.url + "/terminarz.html"}, self.out,
+                             libraries=["Matplotlib", "Plotly"], max_workers=2, log=lambda *_: None)
+
+        self.assertEqual(summary["status"], EXIT_OK)
+        team_dir = os.path.join(self.out, slugify(self.TEAM))
+        self.assertEqual(slugify(self.TEAM), "basket-hills-bielsko-biala")
+        names = sorted(os.listdir(team_dir))
+        self.assertIn("PointsPlot_Matplotlib.png", names)
+        self.assertIn("TopBottomPlot_Plotly.html", names)
+        self.assertEqual(len(summary["files"]), 8)
+        with open(os.path.join(team_dir, "PointsPlot_Matplotlib.png"), "rb") as f:
+            self.assertEqual(f.read(4), b"\x89PNG")
+
+        with open(os.path.join(team_dir, "metrics.json"), encoding="utf-8") as f:
+            metrics = json.load(f)
+        self.assertGreater(metrics["matches"], 0)
+        self.assertEqual(sum(metrics["metrics"]["wins_losses"].values()), metrics["matches"])
+        self.assertEqual(set(summary["timings"]), {"fetch", "analysis", "plots", "total"})
+
+    # nazwy dające ten sam katalog - każda drużyna dostaje własny raport
+    def test_colliding_slugs_get_suffix(self):
+        self.assertEqual(unique_slugs(["Łódź", "Lodz", "lodz-2", "LODZ!"]),
+                         {"Łódź": "lodz", "Lodz": "lodz-2", "lodz-2": "lodz-2-2", "LODZ!": "lodz-3"})
+
+        teams = {"Łódź": self.url + "/terminarz.html", "Lodz": self.url + "/terminarz.html"}
+        summary = run_report(teams, self.out, max_workers=0, log=lambda *_: None)
+        self.assertEqual(summary["status"], EXIT_OK)
+        for name, slug in (("Łódź", "lodz"), ("Lodz", "lodz-2")):
+            with open(os.path.join(self.out, slug, "metrics.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["team"], name)
+
+    def test_partial_failure_exit_code(self):
+        summary = run_report({self.TEAM: self.url + "/terminarz.html", "Team X": self.url + "/missing"},
+                             self.out, max_workers=0, log=lambda *_: None)
+        self.assertEqual(summary["status"], EXIT_PARTIAL)
+        self.assertIn("Team X", summary["errors"])
+        with open(os.path.join(self.out, "summary.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["teams"], [self.TEAM])
+
+    def test_cli_runs_without_streamlit(self):
+        code = (
+            "import sys, main\n"
+            f"status = main.main(['report', '--team', {self.TEAM + '=' + self.url + '/t.html'!r}, "
+            f"'--output-dir', {self.out!r}, '--cache-dir', '', '--workers', '0'])\n"
+            "print(status, 'streamlit' in sys.modules)\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertTrue(proc.stdout.strip().endswith("0 False"), proc.stdout)
+        self.assertIn("total", proc.stdout)
+
+    def test_invalid_team_argument(self):
+        with self.assertRaises(SystemExit):
+            main(["report", "--team", "bez-adresu"])
+
+
+if __name__ == "__main__":
+    unittest.main()
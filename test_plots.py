@@ -0,0 +1,252 @@
+import subprocess
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from analysis import BasketAnalysis
+from models import BasketballTeam
+from downsampling import downsample_indices, lttb_indices, minmax_indices, tick_positions
+from plot_cache import FigureCache, data_fingerprint
+from plots_matplotlib import AvgHomeAwayPlotMatplotlib, PointsPlotMatplotlib
+from plots_plotly import AvgHomeAwayPlotPlotly, PointDiffPlotPlotly, PointsPlotPlotly
+from plots_seaborn import AvgHomeAwayPlotSeaborn, TopBottomPlotSeaborn
+import plotly.graph_objects as go
+
+
+# Testy jednostkowe dla cache wyrenderowanych wykresów
+class TestFigureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.data = pd.Series([82.5, 74.0], index=pd.Index(["U siebie", "Na wyjeździe"], name="Miejsce meczu"),
+                              name="Punkty Basket Hills")
+
+    @patch("streamlit.image")
+    def test_matplotlib_draw_renders_once(self, mock_image):
+        cache = FigureCache()
+        plot = AvgHomeAwayPlotMatplotlib("Średnia punktów", cache=cache)
+        with patch.object(AvgHomeAwayPlotMatplotlib, "render", wraps=plot.render) as render:
+            plot.draw(self.data)
+            plot.draw(self.data.copy())
+            self.assertEqual(render.call_count, 1)
+
+        png = mock_image.call_args_list[0].args[0]
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertEqual(mock_image.call_args_list[1].args[0], png)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    @patch("streamlit.plotly_chart")
+    def test_plotly_cache_key_depends_on_data_and_title(self, mock_chart):
+        cache = FigureCache()
+        AvgHomeAwayPlotPlotly("A", cache=cache).draw(self.data)
+        AvgHomeAwayPlotPlotly("B", cache=cache).draw(self.data)
+        AvgHomeAwayPlotPlotly("A", cache=cache).draw(self.data + 1)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(mock_chart.call_count, 3)
+
+    def test_fingerprint(self):
+        self.assertEqual(data_fingerprint({"top": self.data}), data_fingerprint({"top": self.data.copy()}))
+        self.assertNotEqual(data_fingerprint(self.data), data_fingerprint(self.data.rename("inna")))
+
+    def test_lru_eviction(self):
+        cache = FigureCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1")
+
+        small = FigureCache(max_bytes=4)
+        small.put("a", b"123")
+        small.put("b", b"45")
+        self.assertEqual(len(small), 1)
+
+    # JSON Plotly (str) - limit w bajtach po zakodowaniu, nie w znakach
+    def test_text_payload_size_in_bytes(self):
+        cache = FigureCache(max_bytes=8)
+        cache.put("a", "żółć")  # 4 znaki, 8 bajtów UTF-8
+        cache.put("b", "ą")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "ą")
+        cache.put("c", "żółćż")  # 5 znaków, 10 bajtów - więcej niż cały limit
+        self.assertIsNone(cache.get("c"))
+
+
+# Testy zarządzania cyklem życia figur Matplotlib
+class TestFigureLifecycle(unittest.TestCase):
+
+    def setUp(self):
+        self.data = pd.Series([82.5, 74.0], index=pd.Index(["U siebie", "Na wyjeździe"], name="Miejsce meczu"),
+                              name="Punkty Basket Hills")
+
+    def test_render_does_not_use_pyplot_manager(self):
+        before = plt.get_fignums()
+        for cls in (AvgHomeAwayPlotMatplotlib, AvgHomeAwayPlotSeaborn):
+            cls("Średnia", cache=None).render_payload(self.data)
+        self.assertEqual(plt.get_fignums(), before)
+
+    def test_figure_is_reused_and_cleared(self):
+        plot = AvgHomeAwayPlotMatplotlib("Średnia", cache=None)
+        first = plot.render(self.data)
+        plot.release(first)
+        self.assertEqual(first.axes, [])
+        second = plot.render(self.data)
+        self.assertIs(first, second)
+        self.assertEqual(len(second.axes), 1)
+
+    def test_figures_are_not_shared_between_threads(self):
+        plot = AvgHomeAwayPlotMatplotlib("Średnia", cache=None)
+        figures = []
+        thread = threading.Thread(target=lambda: figures.append(plot.render(self.data)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(plot.render(self.data), figures[0])
+
+
+# Testy zmniejszania liczby punktów na wykresach szeregów czasowych
+# Wykres najlepszych / najsłabszych meczów ze schematu "optimized" (przeciwnik jako kategoria)
+class TestTopBottomOptimized(unittest.TestCase):
+
+    def setUp(self):
+        points = [60, 65, 70, 75, 80, 85, 88, 90, 95, 100, 105, 110]
+        self.matches = [
+            {"Data i godzina meczu": f"{i + 1:02d}.01.2024 18:00",
+             "Przeciwnik": "GKS Tychy II" if pts == 85 else f"Team {chr(ord('A') + i)}",
+             "Punkty Basket Hills": pts, "Punkty przeciwnika": 80,
+             "Wynik meczu": "Wygrana" if pts > 80 else "Porażka", "Miejsce meczu": "U siebie"}
+            for i, pts in enumerate(points)
+        ]
+
+    def test_seaborn_axis_has_only_shown_opponents(self):
+        analysis = BasketAnalysis(BasketballTeam("X", self.matches), schema="optimized")
+        for fused in (False, True):
+            results = analysis.run(fused=fused)
+            data = {"top": results["top_games"], "bottom": results["bottom_games"]}
+            fig = TopBottomPlotSeaborn("Mecze", cache=None).render(data)
+            labels = [t.get_text() for t in fig.axes[0].get_xticklabels()]
+            with self.subTest(fused=fused):
+                expected = list(data["top"]["Przeciwnik"]) + list(data["bottom"]["Przeciwnik"])
+                self.assertEqual(labels, expected)
+                self.assertNotIn("GKS Tychy II", labels)
+
+
+class TestDownsampling(unittest.TestCase):
+
+    def setUp(self):
+        rnd = np.random.default_rng(0)
+        self.y = rnd.integers(50, 110, size=10_000).astype(float)
+        self.y[4321] = 200  # wyraźny szczyt musi zostać zachowany
+
+    def test_lttb_keeps_budget_ends_and_peak(self):
+        idx = lttb_indices(self.y, 300)
+        self.assertEqual(len(idx), 300)
+        self.assertEqual((idx[0], idx[-1]), (0, 9_999))
+        self.assertIn(4321, idx)
+        self.assertTrue(np.all(np.diff(idx) > 0))
+
+    def test_minmax_keeps_extremes(self):
+        idx = minmax_indices(self.y, 200)
+        self.assertLessEqual(len(idx), 200)
+        self.assertIn(4321, idx)
+        self.assertIn(int(np.argmin(self.y)), idx)
+
+    def test_small_series_is_untouched(self):
+        self.assertEqual(downsample_indices(self.y[:50], 500).tolist(), list(range(50)))
+        self.assertEqual(len(tick_positions(1_000, 30)), 30)
+
+    def test_long_series_plots(self):
+        dates = pd.date_range("2000-01-01", periods=10_000, freq="3D")
+        df = pd.DataFrame({"Data i godzina meczu": dates, "Punkty Basket Hills": self.y,
+                           "Punkty przeciwnika": self.y[::-1], "Różnica punktów": self.y - self.y[::-1]})
+
+        fig = PointsPlotMatplotlib("Punkty", cache=None, max_points=400, max_ticks=20).render(df)
+        ax = fig.axes[0]
+        self.assertLessEqual(len(ax.get_xticks()), 20)
+        self.assertTrue(all(len(line.get_xdata()) <= 400 for line in ax.lines))
+
+        plotly_fig = PointDiffPlotPlotly("Różnica", cache=None, max_points=400).render(df)
+        self.assertLessEqual(len(plotly_fig.data[0].y), 400)
+        self.assertEqual(plotly_fig.layout.xaxis.nticks, 30)
+
+
+# Testy ścieżki Plotly dla dużych serii (WebGL, gotowy JSON)
+class TestPlotlyHighVolume(unittest.TestCase):
+
+    def _frame(self, n):
+        dates = pd.date_range("2000-01-01", periods=n, freq="3D")
+        pts = np.arange(n) % 60 + 50
+        return pd.DataFrame({"Data i godzina meczu": dates, "Punkty Basket Hills": pts,
+                             "Punkty przeciwnika": pts[::-1]})
+
+    def test_trace_type_depends_on_threshold(self):
+        small = PointsPlotPlotly("Punkty", cache=None).render(self._frame(50))
+        self.assertEqual([t.type for t in small.data], ["scatter", "scatter"])
+
+        plot = PointsPlotPlotly("Punkty", cache=None, max_points=10_000)
+        plot.webgl_threshold = 1000
+        large = plot.render(self._frame(5000))
+        self.assertEqual([t.type for t in large.data], ["scattergl", "scattergl"])
+        self.assertEqual(len(large.data[0].y), 5000)
+
+    # domyślne ustawienia: duża seria ograniczona do max_points, ale nadal rysowana przez WebGL
+    def test_default_settings_use_webgl_for_large_series(self):
+        fig = PointsPlotPlotly("Punkty", cache=None).render(self._frame(5000))
+        self.assertEqual([t.type for t in fig.data], ["scattergl", "scattergl"])
+        self.assertLessEqual(len(fig.data[0].y), PointsPlotPlotly.max_points)
+
+        df = self._frame(5000)
+        df["Różnica punktów"] = df["Punkty Basket Hills"] - df["Punkty przeciwnika"]
+        self.assertEqual(PointDiffPlotPlotly("Różnica", cache=None).render(df).data[0].type, "scattergl")
+
+    @patch("streamlit.plotly_chart")
+    def test_cached_json_is_shown_without_rerender(self, mock_chart):
+        cache = FigureCache()
+        plot = PointsPlotPlotly("Punkty", cache=cache)
+        plot.draw(self._frame(50))
+        with patch.object(PointsPlotPlotly, "render") as render:
+            plot.draw(self._frame(50))
+            render.assert_not_called()
+
+        shown = mock_chart.call_args.args[0]
+        self.assertIsInstance(shown, go.Figure)
+        self.assertEqual(shown.layout.title.text, "Punkty")
+
+
+# Testy leniwego importu backendów - start aplikacji nie może ładować bibliotek wykresów
+class TestLazyBackends(unittest.TestCase):
+    MODULES = "plots, analysis, data_fetcher, storage"
+    BUDGET_US = 5_000_000
+
+    def _run(self, *args):
+        return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+    def test_plots_import_skips_plotting_libraries(self):
+        out = self._run("-c", f"import sys, {self.MODULES}; "
+                              "print(sorted(m for m in ('matplotlib', 'seaborn', 'plotly', 'streamlit') "
+                              "if m in sys.modules))")
+        self.assertEqual(out.stdout.strip(), "[]")
+
+    def test_import_time_budget(self):
+        out = self._run("-X", "importtime", "-c", f"import {self.MODULES}")
+        cumulative = {}
+        for line in out.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                cumulative[parts[2].strip()] = int(parts[1])
+        self.assertNotIn("matplotlib", cumulative)
+        self.assertLess(sum(cumulative[m.strip()] for m in self.MODULES.split(",")), self.BUDGET_US)
+
+    def test_load_backend_resolves_classes(self):
+        import plots
+        backend = plots.load_backend("Plotly")
+        self.assertIs(backend.PointsPlotPlotly, PointsPlotPlotly)
+        self.assertIs(plots.PointsPlotPlotly, PointsPlotPlotly)
+        with self.assertRaises(ValueError):
+            plots.load_backend("Bokeh")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+from analysis import BasketAnalysis, METRICS
+from fixtures import make_matches, make_schedule_html
+from data_fetcher import MatchDataFetcher
+from models import BasketballTeam
+from records import Location, MatchBatch, MatchRecord, Result
+
+
+# Testy jednostkowe dla zwartych rekordów meczów (MatchRecord, MatchBatch)
+class TestMatchBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.matches = make_matches(500, seed=3)
+        self.batch = MatchBatch.from_dicts(self.matches)
+
+    def test_compact_dtypes(self):
+        self.assertEqual(self.batch.points.dtype, np.int16)
+        self.assertEqual(self.batch.opponent_points.dtype, np.int16)
+        self.assertEqual(self.batch.result.dtype, np.int8)
+        self.assertEqual(self.batch.location.dtype, np.int8)
+        self.assertEqual(self.batch.played_at.dtype, np.dtype("datetime64[ns]"))
+
+    def test_records_roundtrip(self):
+        record = self.batch[0]
+        self.assertIsInstance(record, MatchRecord)
+        self.assertEqual(record.opponent, self.matches[0]["Przeciwnik"])
+        self.assertEqual(record.result, Result.WIN if record.points > record.opponent_points else Result.LOSS)
+
+        first = self.batch.to_dicts()[0]
+        expected = dict(self.matches[0])
+        expected["Data i godzina meczu"] = pd.Timestamp(record.played_at).to_pydatetime()
+        self.assertEqual(first, expected)
+        self.assertEqual(pd.Timestamp(first["Data i godzina meczu"]),
+                         pd.to_datetime(self.matches[0]["Data i godzina meczu"], dayfirst=True))
+
+    def test_to_frame_shares_memory(self):
+        df = self.batch.to_frame()
+        self.assertTrue(np.shares_memory(df["Punkty Basket Hills"].to_numpy(), self.batch.points))
+        self.assertTrue(np.shares_memory(df["Data i godzina meczu"].to_numpy(), self.batch.played_at))
+        self.assertTrue(np.shares_memory(df["Wynik meczu"].array.codes, self.batch.result))
+        self.assertTrue(np.shares_memory(df["Przeciwnik"].array.codes, self.batch.opponent_codes))
+
+    def test_smaller_than_dicts(self):
+        dict_bytes = sum(sys.getsizeof(m) + sum(sys.getsizeof(v) for v in m.values()) for m in self.matches)
+        self.assertLess(self.batch.nbytes * 10, dict_bytes)
+
+    # wyniki analizy z paczki kolumnowej takie same jak ze słowników (obie ścieżki run())
+    def assertSameAsDictPath(self, matches):
+        expected = BasketAnalysis(BasketballTeam("X", matches)).run()
+        for fused in (False, True):
+            results = BasketAnalysis(BasketballTeam("X", MatchBatch.from_dicts(matches))).run(fused=fused)
+            for key in METRICS:
+                with self.subTest(key=key, fused=fused):
+                    a, b = expected[key], results[key]
+                    # kolumny kategoryczne i int16 - porównujemy wartości, nie typy
+                    if isinstance(a, pd.DataFrame):
+                        pd.testing.assert_frame_equal(a, b, check_dtype=False, check_categorical=False,
+                                                      check_index_type=False, check_column_type=False)
+                    elif isinstance(a, pd.Series):
+                        pd.testing.assert_series_equal(a, b, check_dtype=False, check_categorical=False,
+                                                       check_index_type=False)
+                    else:
+                        np.testing.assert_equal(a, b)  # NaN == NaN (np. brak serii porażek)
+
+    def test_analysis_matches_dict_path(self):
+        self.assertSameAsDictPath(self.matches)
+
+    # brak porażek / meczów wyjazdowych - bez zerowych wierszy dla nieobecnych kategorii
+    def test_single_category_slices_match_dict_path(self):
+        wins = [m for m in self.matches if m["Wynik meczu"] == "Wygrana"][:25]
+        home = [m for m in self.matches if m["Miejsce meczu"] == "U siebie"][:25]
+        self.assertSameAsDictPath(wins)
+        self.assertSameAsDictPath(home)
+
+        results = BasketAnalysis(BasketballTeam("X", MatchBatch.from_dicts(wins))).run()
+        self.assertEqual(dict(results["wins_losses"]), {"Wygrana": 25})
+        self.assertEqual(len(results["home_away"]), 2)
+
+    def test_unsorted_batch_is_sorted_in_analysis(self):
+        batch = MatchBatch.from_dicts(self.matches[::-1])
+        df = BasketAnalysis(BasketballTeam("X", batch)).df
+        self.assertTrue(df["Data i godzina meczu"].is_monotonic_increasing)
+
+    def test_fetcher_parse_batch_matches_parse_matches(self):
+        html = make_schedule_html(200, seed=5)
+        fetcher = MatchDataFetcher("http://example.com", "Basket Hills Bielsko-Biała")
+        batch = fetcher.parse_batch(html)
+        matches = fetcher.parse_matches(html)
+        self.assertEqual(len(batch), len(matches))
+        self.assertEqual([r.opponent for r in batch], [m["Przeciwnik"] for m in matches])
+        self.assertEqual([r.location.label for r in batch], [m["Miejsce meczu"] for m in matches])
+        self.assertEqual([r.result.label for r in batch], [m["Wynik meczu"] for m in matches])
+        self.assertIn(batch[0].location, (Location.HOME, Location.AWAY))
+
+    def test_empty_batch(self):
+        batch = MatchDataFetcher("http://example.com", "X").parse_batch("<html></html>")
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(len(batch.to_frame()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import threading
+import time
+import unittest
+from refresh import BackgroundRefresher
+
+
+# Testy jednostkowe dla odświeżania danych w tle (BackgroundRefresher)
+class TestBackgroundRefresher(unittest.TestCase):
+
+    def make_loader(self, gate=None):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            if gate is not None:
+                gate.wait(5)
+            if isinstance(self.next_value, Exception):
+                raise self.next_value
+            return self.next_value
+
+        return loader, calls
+
+    def setUp(self):
+        self.next_value = "v1"
+
+    def test_first_get_loads_once_for_concurrent_callers(self):
+        gate = threading.Event()
+        loader, calls = self.make_loader(gate)
+        refresher = BackgroundRefresher(loader, interval=60)
+
+        values = []
+        threads = [threading.Thread(target=lambda: values.append(refresher.get().value)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(values, ["v1"] * 8)
+
+    def test_stale_data_is_served_while_refreshing(self):
+        gate = threading.Event()
+        loader, calls = self.make_loader(gate)
+        refresher = BackgroundRefresher(loader, interval=0)
+        gate.set()
+        first = refresher.get()
+
+        gate.clear()
+        self.next_value = "v2"
+        stale = refresher.get()  # startuje odświeżanie w tle i nie czeka na nie
+        self.assertEqual(stale.value, "v1")
+        refresher.get()  # odświeżanie już trwa - brak drugiego pobrania
+        self.assertEqual(len(calls), 2)
+
+        gate.set()
+        refresher.refresh(wait=True)
+        self.assertEqual(refresher.snapshot.value, "v2")
+        self.assertEqual(refresher.snapshot.version, first.version + 1)
+
+    def test_failed_refresh_keeps_last_good_data(self):
+        loader, _ = self.make_loader()
+        refresher = BackgroundRefresher(loader, interval=60)
+        refresher.get()
+
+        self.next_value = ConnectionError("offline")
+        refresher.refresh(wait=True)
+        self.assertEqual(refresher.get().value, "v1")
+        self.assertIsInstance(refresher.last_error, ConnectionError)
+
+    def test_first_load_error_is_raised(self):
+        self.next_value = ConnectionError("offline")
+        loader, _ = self.make_loader()
+        with self.assertRaises(ConnectionError):
+            BackgroundRefresher(loader).get()
+
+    # pierwsze wczytanie przerwane w innym wątku wyjątkiem spoza Exception - bez last_error
+    def test_first_load_interrupted_in_other_thread(self):
+        started, release = threading.Event(), threading.Event()
+
+        def loader():
+            started.set()
+            release.wait()
+            raise SystemExit
+
+        def lead():
+            with self.assertRaises(SystemExit):
+                refresher.refresh(wait=True)
+
+        refresher = BackgroundRefresher(loader)
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait()
+        threading.Timer(0.05, release.set).start()
+        with self.assertRaises(RuntimeError):
+            refresher.get()
+        leader.join()
+        self.assertIsNone(refresher.last_error)
+
+    def test_scheduler_refreshes_periodically(self):
+        loader, calls = self.make_loader()
+        refresher = BackgroundRefresher(loader, interval=0.01).start()
+        time.sleep(0.2)
+        refresher.stop()
+        self.assertGreaterEqual(len(calls), 2)
+        self.assertEqual(refresher.snapshot.value, "v1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from shared_cache import SharedCache
+
+
+# funkcja dla procesów potomnych - każde wywołanie compute dopisuje linię do pliku
+def _compute_in_process(path, log_path):
+    def compute():
+        with open(log_path, "a") as f:
+            f.write("x\n")
+        time.sleep(0.3)
+        return {"matches": 42}
+
+    return SharedCache(path).get_or_compute("fetch", compute)
+
+
+# Testy jednostkowe dla cache współdzielonego przez procesy (SharedCache)
+class TestSharedCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.path = os.path.join(tmp.name, "shared.db")
+        self.cache = SharedCache(self.path, ttl=60)
+        self.addCleanup(self.cache.close)
+
+    def test_set_and_get_roundtrip(self):
+        self.cache.set("a", {"x": [1, 2]})
+        self.assertEqual(self.cache.get("a"), {"x": [1, 2]})
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_expired_entry_is_a_miss(self):
+        self.cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.touch_interval = 0
+        self.cache.max_entries = 2
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(len(self.cache), 2)
+
+    def test_expired_entries_evicted_first(self):
+        self.cache.max_entries = 2
+        self.cache.set("a", 1)
+        self.cache.set("old", 0, ttl=0.01)
+        time.sleep(0.02)
+        self.cache.set("b", 2)
+        self.assertEqual((self.cache.get("a"), self.cache.get("b")), (1, 2))
+        self.assertEqual(len(self.cache), 2)
+
+    # wygasły wpis nie jest usuwany przy zapisie innych kluczy (limit nieprzekroczony)
+    def test_expired_entry_kept_as_stale(self):
+        self.cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        self.cache.set("b", 2)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 2)
+
+    # odczyty w ciągu touch_interval nie zapisują do bazy
+    def test_hits_do_not_write(self):
+        self.cache.set("a", 1)
+        conn = self.cache._conn
+        before = conn.total_changes
+        for _ in range(20):
+            self.cache.get("a")
+        self.assertEqual(conn.total_changes, before)
+
+    def test_evicts_by_size(self):
+        self.cache.max_bytes = 5000
+        for key in "abcd":
+            self.cache.set(key, b"x" * 2000)
+        self.assertLessEqual(self.cache.total_bytes(), 5000)
+        self.assertIsNotNone(self.cache.get("d"))
+
+    def test_single_flight_across_threads(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "wynik"
+
+        results = []
+
+        def worker():
+            cache = SharedCache(self.path)
+            results.append(cache.get_or_compute("k", compute))
+            cache.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["wynik"] * 5)
+
+    def test_single_flight_across_processes(self):
+        log_path = os.path.join(self.dir, "calls.log")
+        with ProcessPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(_compute_in_process, [self.path] * 3, [log_path] * 3))
+
+        self.assertEqual(results, [{"matches": 42}] * 3)
+        with open(log_path) as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_failed_refresh_raises_for_lease_owner(self):
+        self.cache.set("k", "stary", ttl=0.01)
+        time.sleep(0.02)
+
+        def failing():
+            raise ConnectionError("offline")
+
+        with self.assertRaises(ConnectionError):
+            self.cache.get_or_compute("k", failing)
+        self.assertEqual(self.cache.get_or_compute("k", lambda: "nowy"), "nowy")
+
+    # oczekujący na cudze odświeżenie, które się nie udało, dostaje starszą wartość
+    def test_waiter_falls_back_to_stale_value(self):
+        self.cache.set("k", "stary", ttl=0.01)
+        time.sleep(0.02)
+        self.cache.set("inny", 1)  # zapis innego klucza nie usuwa wygasłego wpisu
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.3)
+            raise ConnectionError("offline")
+
+        def owner():
+            cache = SharedCache(self.path)
+            with self.assertRaises(ConnectionError):
+                cache.get_or_compute("k", failing)
+            cache.close()
+
+        thread = threading.Thread(target=owner)
+        thread.start()
+        started.wait(5)
+        compute = []
+        self.assertEqual(self.cache.get_or_compute("k", lambda: compute.append(1) or "nowy"), "stary")
+        thread.join()
+        self.assertEqual(compute, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import math
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from analysis import BasketAnalysis
+from storage import MatchStore, season_of
+
+
+class TestMatchStore(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = MatchStore(os.path.join(tmp.name, "matches.db"))
+        self.matches = [
+            {
+                "Data i godzina meczu": "05.10.2023 18:00",
+                "Przeciwnik": "Team A",
+                "Punkty Basket Hills": 80,
+                "Punkty przeciwnika": 70,
+                "Wynik meczu": "Wygrana",
+                "Miejsce meczu": "U siebie"
+            },
+            {
+                "Data i godzina meczu": "01.01.2024",
+                "Przeciwnik": "Team B",
+                "Punkty Basket Hills": 65,
+                "Punkty przeciwnika": 75,
+                "Wynik meczu": "Porażka",
+                "Miejsce meczu": "Na wyjeździe"
+            },
+            {
+                "Data i godzina meczu": "10.11.2024",
+                "Przeciwnik": "Team C",
+                "Punkty Basket Hills": 90,
+                "Punkty przeciwnika": 85,
+                "Wynik meczu": "Wygrana",
+                "Miejsce meczu": "U siebie"
+            },
+        ]
+        self.store.upsert("Basket Hills", self.matches)
+
+    def test_season_of(self):
+        from datetime import date
+        self.assertEqual(season_of(date(2024, 1, 1)), "2023/2024")
+        self.assertEqual(season_of(date(2024, 10, 1)), "2024/2025")
+
+    def test_upsert_does_not_duplicate(self):
+        self.store.upsert("Basket Hills", self.matches)
+        self.assertEqual(len(self.store.load("Basket Hills")), 3)
+
+    def test_upsert_updates_existing_match(self):
+        changed = dict(self.matches[0], **{"Punkty przeciwnika": 82, "Wynik meczu": "Porażka"})
+        self.store.upsert("Basket Hills", [changed])
+        first = self.store.load("Basket Hills")[0]
+        self.assertEqual(first["Punkty przeciwnika"], 82)
+        self.assertEqual(first["Wynik meczu"], "Porażka")
+
+    def test_load_season_and_date_range(self):
+        self.assertEqual(self.store.seasons("Basket Hills"), ["2023/2024", "2024/2025"])
+        season = self.store.load("Basket Hills", season="2023/2024")
+        self.assertEqual([m["Przeciwnik"] for m in season], ["Team A", "Team B"])
+        window = self.store.load("Basket Hills", start="2023-12-01", end="2024-12-31")
+        self.assertEqual([m["Przeciwnik"] for m in window], ["Team B", "Team C"])
+
+    # koniec zakresu jako sama data - mecze z godziną tego dnia też należą do wycinka
+    def test_load_end_date_covers_whole_day(self):
+        for end in ("2023-10-05", date(2023, 10, 5)):
+            with self.subTest(end=end):
+                self.assertEqual([m["Przeciwnik"] for m in self.store.load("Basket Hills", end=end)], ["Team A"])
+        self.assertEqual(self.store.load("Basket Hills", end=datetime(2023, 10, 5)), [])
+        self.assertEqual(len(self.store.load("Basket Hills", end="2023-10-05 18:00")), 1)
+
+    def test_analysis_from_empty_slice(self):
+        results = BasketAnalysis.from_store(self.store, "Basket Hills", season="2030/2031").run()
+        self.assertTrue(results["df"].empty)
+        self.assertTrue(results["wins_losses"].empty)
+        self.assertTrue(math.isnan(results["avg_scored"]))
+
+    def test_analysis_from_store(self):
+        analysis = BasketAnalysis.from_store(self.store, "Basket Hills", season="2023/2024")
+        results = analysis.run()
+        self.assertEqual(len(results["df"]), 2)
+        self.assertEqual(results["avg_scored"], round((80 + 65) / 2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()